@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import dumps as to_json, loads
+from logging import getLogger
+from time import time
+import transaction
+from zope.cachedescriptors.property import Lazy
+from zope.component import getMultiAdapter
+from zope.formlib import form as formlib
+from gs.content.form.api.json import GroupEndpoint
+from .interface import IBatchInvite
+from .metrics import record_invite
+log = getLogger('gs.group.member.invite.csv.batchinvite')
+
+#: The status of a row that could not be invited because of an error
+PROBLEM = -1
+
+
+class RowInviter(object):
+    '''Invite one person, using the single-invitation JSON page
+
+:param context: The group.
+:param request: The current request.
+
+The page from ``gs.group.member.invite.json`` is called with the form
+replaced by the data for one row, so each row is checked and invited in the
+same way as if the browser had posted it.'''
+    pageName = 'gs-group-member-invite-json.html'
+
+    def __init__(self, context, request):
+        self.context = context
+        self.request = request
+
+    def invite(self, profile, subject, message, fromAddr, delivery):
+        '''Invite one person
+
+:param dict profile: The profile data from one row of the CSV file.
+:param str subject: The subject of the invitation.
+:param str message: The message in the invitation.
+:param str fromAddr: The address the invitation is from.
+:param str delivery: The delivery setting for the new member.
+:returns: The response from the invitation page, with a ``status`` of 1 or
+          2 for invited, 3 for an existing member, or anything else for a
+          problem.
+:rtype: dict'''
+        form = dict(profile)
+        # The invite code is actually expecting a toAddr field, rather than
+        # email, so rename the property.
+        form['toAddr'] = form.pop('email', '')
+        form['subject'] = subject
+        form['message'] = message
+        form['fromAddr'] = fromAddr
+        form['delivery'] = delivery
+        # The ID of the button that was "clicked", for zope.formlib
+        form['submit'] = 'submit'
+
+        oldForm = self.request.form
+        self.request.form = form
+        try:
+            page = getMultiAdapter((self.context, self.request), name=self.pageName)
+            retval = loads(page())
+        finally:
+            self.request.form = oldForm
+        return retval
+
+
+class BatchInvite(GroupEndpoint):
+    '''Invite several people, from several rows of a CSV file, at once
+
+This is not registered as a page. It checks the rows for the background
+job (:class:`.jobinvite.SubmitInviteJob`), which is what the JavaScript
+uses.'''
+    label = 'POST rows of profile data to this URL to invite the people.'
+    #: The maximum number of rows that can be sent in one request
+    maxRows = 100
+
+    def __init__(self, group, request):
+        super(BatchInvite, self).__init__(group, request)
+
+    @Lazy
+    def form_fields(self):
+        retval = formlib.Fields(IBatchInvite, render_context=False)
+        assert retval
+        return retval
+
+    @Lazy
+    def inviter(self):
+        retval = RowInviter(self.context, self.request)
+        return retval
+
+    @formlib.action(label='Submit', prefix='', failure='process_failure')
+    def process_success(self, action, data):
+        return self.actual_process(data)
+
+    def actual_process(self, data):
+        try:
+            profiles = loads(data['rows'])
+        except ValueError as e:
+            m = {'status': -2, 'message': ['The rows are not valid JSON.', str(e)]}
+            retval = to_json(m)
+        else:
+            if ((not isinstance(profiles, list))
+                    or not all(isinstance(p, dict) for p in profiles)):
+                m = {'status': -2, 'message': ['The rows are not a list of objects.']}
+                retval = to_json(m)
+            elif len(profiles) > self.maxRows:
+                msg = 'Too many rows: {0} were sent, but the maximum is {1}.'
+                m = {'status': -3,
+                     'message': [msg.format(len(profiles), self.maxRows)]}
+                retval = to_json(m)
+            else:
+                retval = self.process_rows(profiles, data)
+        return retval
+
+    def process_rows(self, profiles, data):
+        '''Invite the people
+
+:param list profiles: The checked profile data, one dictionary per row.
+:param dict data: The data from the form.
+:returns: The result for each row, as a JSON list.'''
+        results = [self.invite_row(p, data) for p in profiles]
+        retval = to_json(results)
+        return retval
+
+    def invite_row(self, profile, data):
+        '''Invite the person in one row, isolating any problem to that row
+
+:returns: The status of the row.
+:rtype: dict'''
+        # A savepoint per row means a row that fails is rolled back, without
+        # losing the people already invited by this request.
+        savepoint = transaction.savepoint()
+        t = time()
+        try:
+            retval = self.inviter.invite(profile, data['subject'], data['message'],
+                                         data['fromAddr'], data['delivery'])
+        except Exception as e:
+            savepoint.rollback()
+            log.exception('Problem inviting %s', profile.get('email', ''))
+            retval = {'status': PROBLEM,
+                      'message': ['Could not invite {0}: {1}'.format(
+                                  profile.get('email', ''), e)]}
+        record_invite(time() - t, retval.get('status'))
+        return retval
+
+    def process_failure(self, action, data, errors):
+        retval = self.build_error_response(action, data, errors)
+        return retval
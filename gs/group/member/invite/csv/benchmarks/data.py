@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+
+#: The names used in the rows, for each kind of text
+NAMES = {
+    'ascii': ('Michael JasonSmith', 'A. Person', 'Dirk Dinsdale', 'Member'),
+    'utf-8': ('Mémbér \U0001f604', 'Dirk “Box Crusher” Dinsdale',
+              'My God… it is full of stars ✨', '张伟'),
+    'latin-1': ('Mémbér', 'Renée François', 'Jürgen Müller',
+                'Señor Peña'),
+}
+
+
+def synthetic_csv(rows, encoding='ascii', delimiter=',', quoted=False):
+    '''Generate a CSV file of people to invite
+
+:param int rows: The number of people, not counting the header.
+:param str encoding: The encoding of the file: ``ascii``, ``utf-8`` (with
+                     emoji) or ``latin-1``.
+:param str delimiter: The delimiter between the fields.
+:param bool quoted: If ``True`` every field is quoted, and some names have
+                    a delimiter, a quote, or a line-feed in them.
+:returns: The bytes of the file.'''
+    names = NAMES[encoding]
+    if quoted:
+        names = names + ('Person{0} the "first"'.format(delimiter), 'Over\ntwo lines')
+        q = '"'
+    else:
+        q = ''
+    line = '{q}{{0}}{q}{d}{q}{{1}}{q}{d}{q}{{2}}{q}\n'.format(q=q, d=delimiter)
+    lines = [line.format('Name', 'Email', 'Age')]
+    for i in range(rows):
+        name = names[i % len(names)].replace('"', '""') if quoted else names[i % len(names)]
+        lines.append(line.format(name, 'person{0}@example.com'.format(i), 20 + (i % 60)))
+    retval = ''.join(lines).encode(encoding)
+    return retval
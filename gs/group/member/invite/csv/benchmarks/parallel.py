@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+'''Compare the parallel parser with the sequential parser
+
+Run with ``python -m gs.group.member.invite.csv.benchmarks.parallel``.'''
+from __future__ import absolute_import, unicode_literals, print_function
+from argparse import ArgumentParser
+from multiprocessing import cpu_count
+from time import time
+from ..parallel import ParallelParser
+from ..unicodereader import UnicodeDictReader
+from .data import synthetic_csv
+
+COLUMNS = ['fn', 'email', 'age']
+
+
+def time_sequential(buf):
+    t = time()
+    reader = UnicodeDictReader(buf, COLUMNS)
+    rows = list(reader.iter_values())
+    retval = (time() - t, rows)
+    return retval
+
+
+def time_parallel(buf, workers, chunkSize):
+    parser = ParallelParser(workers, chunkSize)
+    try:
+        parser.pool  # Start the workers before the clock
+        t = time()
+        reader = UnicodeDictReader(buf, COLUMNS)
+        rows = list(parser.iter_values(buf, reader.encoding, reader.dialect, len(COLUMNS)))
+        retval = (time() - t, rows)
+    finally:
+        parser.close()
+    return retval
+
+
+def main():
+    p = ArgumentParser(description=__doc__.split('\n')[0])
+    p.add_argument('--rows', type=int, default=100000)
+    p.add_argument('--encoding', default='utf-8', choices=['ascii', 'utf-8', 'latin-1'])
+    p.add_argument('--quoted', action='store_true')
+    p.add_argument('--chunk-size', type=int, default=ParallelParser.chunkSize)
+    p.add_argument('--workers', type=int, nargs='*',
+                   default=sorted(set([1, 2, 4, cpu_count()])))
+    args = p.parse_args()
+
+    buf = synthetic_csv(args.rows, args.encoding, quoted=args.quoted)
+    print('{0} rows, {1:.1f} MiB, {2} cores'.format(args.rows, len(buf) / 1048576.0,
+                                                    cpu_count()))
+    sequential, expected = time_sequential(buf)
+    print('sequential   {0:7.3f}s'.format(sequential))
+    for workers in args.workers:
+        t, rows = time_parallel(buf, workers, args.chunk_size)
+        assert rows == expected, 'The parallel rows are different'
+        print('{0:2d} workers   {1:7.3f}s  {2:5.2f}x'.format(workers, t, sequential / t))
+
+
+if __name__ == '__main__':
+    main()
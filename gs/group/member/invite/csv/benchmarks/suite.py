@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+'''Time the parsing of synthetic CSV files, and record the peak memory
+
+Run with ``python -m gs.group.member.invite.csv.benchmarks.suite``, and
+compare two runs with ``python -m gs.group.member.invite.csv.benchmarks.suite
+--compare old.json new.json``.'''
+from __future__ import absolute_import, unicode_literals, print_function
+from argparse import ArgumentParser
+from datetime import datetime
+from io import BytesIO
+from itertools import product
+from json import dump, load
+from multiprocessing import Process, Queue, cpu_count
+import os
+import platform
+from resource import getrusage, RUSAGE_SELF
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+from pkg_resources import get_distribution
+from ..cache import ParseCache
+from ..unicodereader import UnicodeDictReader
+from .data import synthetic_csv
+
+ROWS = (1000, 10000, 100000, 1000000)
+ENCODINGS = ('ascii', 'utf-8', 'latin-1')
+DELIMITERS = (',', '\t')
+QUOTING = (False, True)
+COLUMNS = ['fn', 'email', 'age']
+#: The phases that are timed, in order
+PHASES = ('guess_encoding', 'guess_dialect', 'iterate', 'actual_process')
+
+
+class BenchmarkResponse(object):
+    '''The response, which throws away what is written'''
+    def setHeader(self, name, value):
+        pass
+
+    def write(self, data):
+        pass
+
+
+class BenchmarkRequest(object):
+    '''Just enough of a request for :class:`.csv2json.CSV2JSON`'''
+    def __init__(self):
+        self.response = BenchmarkResponse()
+
+    def getHeader(self, name, default=None):
+        return default
+
+
+def best_of(repeat, f, *args):
+    '''The shortest time, in seconds, to call ``f`` with ``args``'''
+    retval = None
+    for i in range(repeat):
+        t = time()
+        f(*args)
+        t = time() - t
+        retval = t if retval is None else min(retval, t)
+    return retval
+
+
+def iterate(buf):
+    reader = UnicodeDictReader(buf, COLUMNS)
+    for row in reader.iter_values():
+        pass
+
+
+def process(parser, buf):
+    csv2json = parser(None, BenchmarkRequest())
+    csv2json.cache = ParseCache(maxEntryBytes=0)  # Always parse
+    # The limits are for the people uploading files, not the benchmarks.
+    csv2json.maxRows = csv2json.maxBytes = len(buf)
+    csv2json.actual_process({'csv': buf, 'columns': COLUMNS, 'format': 'columns'})
+
+
+def max_rss():
+    '''The peak resident-set size of this process, in KiB (on Linux)'''
+    retval = getrusage(RUSAGE_SELF).ru_maxrss
+    return retval
+
+
+def run_case(fileName, repeat, queue):
+    '''Time the phases for one file, in a process of its own
+
+The peak memory is the peak resident-set size while the phases run, less
+the size after the file has been read, so it is the memory used to parse
+the file.'''
+    # Imported here, before the clock starts, because the parser needs Zope
+    # and the other phases do not.
+    from ..csv2json import CSV2JSON
+    with open(fileName, 'rb') as f:
+        buf = f.read()
+    before = max_rss()
+    retval = {
+        'guess_encoding': best_of(repeat, UnicodeDictReader.guess_encoding, BytesIO(buf)),
+        'guess_dialect': best_of(repeat, UnicodeDictReader.guess_dialect, BytesIO(buf)),
+        'iterate': best_of(repeat, iterate, buf),
+        'actual_process': best_of(repeat, process, CSV2JSON, buf), }
+    retval['peakMemoryKiB'] = max_rss() - before
+    queue.put(retval)
+
+
+def run(rowCounts, encodings, delimiters, quoting, repeat=1):
+    '''Run the benchmarks
+
+:returns: The results for each case.
+:rtype: list'''
+    tmpDir = mkdtemp(prefix='gs-group-member-invite-csv-benchmark-')
+    retval = []
+    try:
+        for rows, encoding, delimiter, quoted in product(rowCounts, encodings, delimiters,
+                                                         quoting):
+            fileName = os.path.join(tmpDir, 'benchmark.csv')
+            buf = synthetic_csv(rows, encoding, delimiter, quoted)
+            with open(fileName, 'wb') as f:
+                f.write(buf)
+            case = {'rows': rows, 'encoding': encoding, 'delimiter': delimiter,
+                    'quoted': quoted, 'bytes': len(buf)}
+            del buf
+            # Each case runs in a new process, so the peak memory is its own
+            queue = Queue()
+            proc = Process(target=run_case, args=(fileName, repeat, queue))
+            proc.start()
+            case.update(queue.get())
+            proc.join()
+            retval.append(case)
+            print('{rows:>8} {encoding:<8} {0:<5} {1:<6}'.format(
+                  'tab' if delimiter == '\t' else 'comma', 'quoted' if quoted else 'plain',
+                  **case),
+                  ' '.join('{0}={1:.3f}s'.format(p, case[p]) for p in PHASES),
+                  'peak={0}KiB'.format(case['peakMemoryKiB']))
+    finally:
+        rmtree(tmpDir)
+    return retval
+
+
+def environment():
+    '''The version of the product, and the machine the benchmarks ran on'''
+    retval = {
+        'version': get_distribution('gs.group.member.invite.csv').version,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': cpu_count(),
+        'date': datetime.utcnow().isoformat(), }
+    return retval
+
+
+def case_key(case):
+    retval = (case['rows'], case['encoding'], case['delimiter'], case['quoted'])
+    return retval
+
+
+def compare(oldFileName, newFileName, threshold=1.1):
+    '''Compare the results of two runs, and show the regressions
+
+:param float threshold: The ratio of the new time to the old time that is a
+                        regression.
+:returns: The number of regressions.'''
+    with open(oldFileName) as f:
+        old = dict((case_key(c), c) for c in load(f)['results'])
+    with open(newFileName) as f:
+        new = load(f)['results']
+    retval = 0
+    for case in new:
+        oldCase = old.get(case_key(case))
+        if oldCase is None:
+            continue
+        for p in PHASES + ('peakMemoryKiB', ):
+            ratio = (case[p] / float(oldCase[p])) if oldCase[p] else 1.0
+            if ratio > threshold:
+                retval += 1
+                print('{0} {1}: {2} -> {3} ({4:.2f}x)'.format(
+                      case_key(case), p, oldCase[p], case[p], ratio))
+    return retval
+
+
+def main():
+    p = ArgumentParser(description=__doc__.split('\n')[0])
+    p.add_argument('--rows', type=int, nargs='*', default=ROWS)
+    p.add_argument('--encodings', nargs='*', default=ENCODINGS, choices=ENCODINGS)
+    p.add_argument('--repeat', type=int, default=1,
+                   help='The number of times to run each phase, taking the fastest')
+    p.add_argument('--output', default='benchmark.json',
+                   help='The file to write the results to, as JSON')
+    p.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                   help='Compare two files of results, rather than running')
+    args = p.parse_args()
+
+    if args.compare:
+        raise SystemExit(compare(*args.compare))
+    results = run(args.rows, args.encodings, DELIMITERS, QUOTING, args.repeat)
+    with open(args.output, 'w') as f:
+        dump({'environment': environment(), 'results': results}, f, indent=1,
+             sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -213,25 +213,88 @@ function GSInviteByCSVTemplateGenerator(attributes) {
 
 
 function GSInviteByCSVParserAJAX (attributes, formSelector, feedbackSelector,
-                                  checkingSelector, parserURL) {
-    var form=null, feedback=null, checking=null,
+                                  checkingSelector, parserURL, chunkURL,
+                                  chunkSize) {
+    var form=null, feedback=null, checking=null, csvFile=null,
+        uploadId=null, retries=0, CHUNK_SIZE=1048576,
+        CHUNK_TIMEOUT=120000, MAX_RETRIES=5, RETRY_DELAY=1000,
         PARSE_SUCCESS='parse_success', PARSE_FAIL='parse_fail';
 
+    function parse_failed(status) {
+        var e=null, issue=null, list=null;
+        checking.find('.alert-error').addClass('in');
+        issue = checking.find('.alert-error .issue');
+        issue.text(status.message[0]);
+        if (status.errors) {
+            // Every bad row is reported, rather than just the first, so
+            // the file only has to be fixed once.
+            list = jQuery('<ul class="errors"></ul>');
+            jQuery.each(status.message.slice(1), function(i, m) {
+                list.append(jQuery('<li></li>').text(m));
+            });
+            issue.append(list);
+        }
+        e = jQuery.Event(PARSE_FAIL);
+        checking.trigger(e);
+    }
+
+    function show_duplicates(data) {
+        var m=null;
+        checking.find('.duplicates').remove();
+        if (data.duplicateCount) {
+            m = data.duplicateCount.toString() + ' rows were skipped ' +
+                'because they repeat an earlier email address: row ' +
+                data.duplicates.join(', ') + '.';
+            checking.append(jQuery('<p class="muted duplicates"></p>').text(m));
+        }
+    }
+
+    function rows_to_profiles(columns, rows) {
+        // Turn the compact "columns" format back into a list of
+        // profile-objects, which is what the inviter expects.
+        var retval=null;
+        retval = jQuery.map(rows, function(row, i) {
+            var profile={}, j=0;
+            for (j = 0; j < columns.length; j++) {
+                profile[columns[j]] = row[j];
+            }
+            return profile;
+        });
+        return retval;
+    }
+
     function success (data, textStatus, jqXHR) {
-        var e=null, json=null, icon=null;;
+        var e=null, json=null, icon=null, rows=null, tail=null,
+            rowNumbers=null, duplicates=0;
         icon = checking.find('[data-icon]')
         icon.removeClass('loading')
+        rows = data.rows ? data.rows : data;
+        if (rows.length) {
+            // A problem found after the parser started streaming the
+            // profiles is the last item in the list.
+            tail = rows[rows.length - 1];
+        }
         if (data.status) {
             icon.attr('data-icon', '\u2717');
-            checking.find('.alert-error').addClass('in');
-            checking.find('.alert-error .issue').text(data.message[0]);
-            e = jQuery.Event(PARSE_FAIL);
-            checking.trigger(e);
+            parse_failed(data);
+        } else if (tail && tail.status) {
+            icon.attr('data-icon', '\u2717');
+            parse_failed(tail);
         } else {
             checking.find('.alert-error').hide();
             icon.attr('data-icon', '\u2713');
+            show_duplicates(data);
+            if (data.columns) {
+                json = rows_to_profiles(data.columns, data.rows);
+                // The rows that repeat an address are dropped, so the
+                // number of each row in the file is sent as well.
+                rowNumbers = data.rowNumbers || null;
+                duplicates = data.duplicateCount || 0;
+            } else {
+                json = data;
+            }
             e = jQuery.Event(PARSE_SUCCESS);
-            checking.trigger(e, [data]);
+            checking.trigger(e, [json, rowNumbers, duplicates]);
         }
     }
 
@@ -239,43 +302,45 @@ function GSInviteByCSVParserAJAX (attributes, formSelector, feedbackSelector,
         // FIXME
     }
 
-    function show_feedback() {
-        var csvFile=null, name=null;
-
-        form.removeClass('in');
-        form.addClass('hide');
-        feedback.addClass('in');
-
-        csvFile = document.getElementById('form.file').files[0];
-        name = csvFile.name;
-        feedback.find('.filename').text(name);
-
-        checking.addClass('in');
+    function upload_failed(textStatus) {
+        checking.find('[data-icon]')
+            .removeClass('loading')
+            .attr('data-icon', '\u2717');
+        parse_failed({'status': -9,
+                      'message': ['The file could not be uploaded (' +
+                                  textStatus + '). Please try again.']});
     }
 
-    function send_request() {
-        var attributeIds=null, d=null, csvFile=null, settings=null;
-        // To be able to submit a file (sanely) using AJAX we have to
-        // use a FormData object and a File object. Because of this the
-        // page requires HTML5: Chrome 13, Firefox 7, IE 10, Opera 16, and
-        // Safari 6
-        // <https://developer.mozilla.org/en-US/docs/Web/API/FormData>
-        // <https://developer.mozilla.org/en-US/docs/Web/API/File>
-        d = new FormData();
-        csvFile = document.getElementById('form.file').files[0];
-        d.append('csv', csvFile);
-
+    function append_options(d) {
+        var attributeIds=null;
         attributeIds = attributes.get_properties();
         jQuery.each(attributeIds, function(i, attr) {
             // 'columns' is appended multiple times because it is a list.
             d.append('columns', attr);
         });
 
+        // Ask the parser to stream the profiles back, so large files do
+        // not have to be held in memory on the server.
+        d.append('stream', 'on');
+        // Ask for the compact format: the column names once, and then a
+        // list of values for each row.
+        d.append('format', 'columns');
+        // Report all the rows with problems, not just the first.
+        d.append('allErrors', 'on');
+        // Check the values against the profile, so the rows with bad
+        // email addresses (say) are found before anyone is invited.
+        d.append('validate', 'on');
+        // Only invite each email address once.
+        d.append('dedupe', 'on');
+
         // The ID of the button that was "clicked", for zope.formlib
         d.append('submit', '');
+    }
 
+    function post(url, d, onSuccess, onError, timeout) {
         // The following is *mostly* a jQuery.post call:
         // jQuery.post(URL, d, success, 'application/json');
+        var settings=null;
         settings = {
             accepts: 'application/json',
             async: true,
@@ -284,22 +349,124 @@ function GSInviteByCSVParserAJAX (attributes, formSelector, feedbackSelector,
             crossDomain: false,
             data: d,
             dataType: 'json',
-            error: error,
+            error: onError,
             headers: {},
             processData: false,  // No jQuery, put the data down.
-            success: success,
+            success: onSuccess,
             traditional: true,
-            // timeout: TODO, What is the sane timeout?
             type: 'POST',
-            url: parserURL,
+            url: url,
         };
+        if (timeout) {
+            settings.timeout = timeout;
+        }
         jQuery.ajax(settings);
     }
 
+    function new_upload_id() {
+        // Random, so two uploads never share the same file on the server
+        var retval='', i=0, digits='0123456789abcdef';
+        for (i = 0; i < 32; i++) {
+            retval += digits.charAt(Math.floor(Math.random() * 16));
+        }
+        return retval;
+    }
+
+    function send_chunk(offset, query) {
+        // Send the chunk of the file that starts at the offset. If this
+        // is a query then no chunk is sent, and the server says how much
+        // of the file it has (or, if it has all of it, responds with the
+        // parsed file, so a lost response to the last chunk is recovered).
+        var d=null, end=0, timeout=null;
+        d = new FormData();
+        d.append('uploadId', uploadId);
+        d.append('offset', offset.toString());
+        d.append('total', csvFile.size.toString());
+        end = Math.min(offset + chunkSize, csvFile.size);
+        if (!query && (end > offset)) {
+            d.append('csv', csvFile.slice(offset, end), csvFile.name);
+        }
+        append_options(d);
+        if (!query && (end < csvFile.size)) {
+            // The last chunk is parsed before the server responds, which
+            // takes as long as it takes.
+            timeout = CHUNK_TIMEOUT;
+        }
+        post(chunkURL, d, chunk_sent, chunk_failed, timeout);
+    }
+
+    function chunk_sent(data, textStatus, jqXHR) {
+        retries = 0;
+        if ((data.uploadId == uploadId) && (data.received !== undefined)) {
+            // There is more of the file to send. The server says how much
+            // it has, which is where the next chunk starts.
+            send_chunk(data.received, false);
+        } else {
+            // The file is complete, and this is the response from the
+            // parser (or there was a problem with the upload).
+            success(data, textStatus, jqXHR);
+        }
+    }
+
+    function chunk_failed(jqXHR, textStatus, errorThrown) {
+        // The connection dropped, or the request timed out. After a pause
+        // (which doubles each time) the server is asked how much of the
+        // file it has, and the upload carries on from there, so the
+        // chunks that it has are not sent again.
+        retries++;
+        if (retries > MAX_RETRIES) {
+            upload_failed(textStatus);
+        } else {
+            setTimeout(function() { send_chunk(0, true); },
+                       RETRY_DELAY * Math.pow(2, retries - 1));
+        }
+    }
+
+    function show_feedback() {
+        var name=null;
+
+        form.removeClass('in');
+        form.addClass('hide');
+        feedback.addClass('in');
+
+        csvFile = document.getElementById('form.file').files[0];
+        name = csvFile.name;
+        feedback.find('.filename').text(name);
+
+        checking.addClass('in');
+    }
+
+    function send_request() {
+        var d=null;
+        // To be able to submit a file (sanely) using AJAX we have to
+        // use a FormData object and a File object. Because of this the
+        // page requires HTML5: Chrome 13, Firefox 7, IE 10, Opera 16, and
+        // Safari 6
+        // <https://developer.mozilla.org/en-US/docs/Web/API/FormData>
+        // <https://developer.mozilla.org/en-US/docs/Web/API/File>
+        csvFile = document.getElementById('form.file').files[0];
+        if (chunkURL && csvFile.slice) {
+            // The file is sent in chunks, so a dropped connection only
+            // loses the chunk that was being sent.
+            // <https://developer.mozilla.org/en-US/docs/Web/API/Blob/slice>
+            uploadId = new_upload_id();
+            retries = 0;
+            send_chunk(0, false);
+        } else {
+            d = new FormData();
+            d.append('csv', csvFile);
+            append_options(d);
+            post(parserURL, d, success, error, null);
+        }
+    }
+
     function init() {
         form = jQuery(formSelector);
         feedback = jQuery(feedbackSelector);
         checking = jQuery(checkingSelector);
+        if (!chunkSize) {
+            chunkSize = CHUNK_SIZE;
+        }
     }
     init();  // Note: automatic execution
 
@@ -315,11 +482,26 @@ function GSInviteByCSVParserAJAX (attributes, formSelector, feedbackSelector,
 
 
 function GSInviteByCSVInviterAJAX (invitingBlockSelector, deliverySelector,
-                                   messageSelector, inviteURL) {
+                                   messageSelector, jobURL, statusURL,
+                                   pollInterval, resolveURL) {
     var invitingBlock=null, progressBar=null, currN=null, total=null,
         success=null, ignored=null, problems=null, email=null,
-        delivery=null, message=null, json=null, membersToInvite=null,
-        totalRows=0, currRow=0;
+        delivery=null, message=null, json=null, totalRows=0, jobId=null,
+        reported=0, jobRows=null, rowNumbers=null, members=0,
+        fileRows=null, duplicates=0,
+        POLL_INTERVAL=1000, FIRST_ROW=2, EXISTING_MEMBER='member';
+
+    function row_number(i) {
+        // The number of the row in the CSV file for the profile at i. The
+        // parser numbers the rows after the header from 1.
+        var retval=0;
+        if (fileRows) {
+            retval = fileRows[i] + FIRST_ROW - 1;
+        } else {
+            retval = FIRST_ROW + i;
+        }
+        return retval;
+    }
 
     function show_inviting() {
         invitingBlock.addClass('in');
@@ -333,15 +515,13 @@ function GSInviteByCSVInviterAJAX (invitingBlockSelector, deliverySelector,
         problems.removeClass('in');
     }
 
-    function error (jqXHR, textStatus, errorThrown) {
-        var info=null;
-        console.log('Issues');
-        console.log(textStatus);
-        console.error(errorThrown);
-        info = '<li>Problem with row ' + currRow.toString() + ': '
-            + textStatus + '</li>';
-        log_feedback(info, problems);
-        next();
+    function show_progress(doneRows) {
+        var pc=0;
+        currN.text(doneRows.toString());
+        // The "+ 1" is so the progress bar is incomplete until done() is
+        // called.
+        pc = (doneRows / (totalRows + 1.0)) * 100;
+        progressBar.css('width', pc.toString()+'%')
     }
 
     function log_feedback(info, area) {
@@ -351,64 +531,22 @@ function GSInviteByCSVInviterAJAX (invitingBlockSelector, deliverySelector,
         }
     }
 
-    function next() {
-        if (membersToInvite.length == 0) {
-            done();
-        } else {
-            invite_member();
-        }
-    }
-
-    function invite_success (data, textStatus, jqXHR) {
+    function log_result(result, rowNumber) {
         var info='';
-        // "Success" is broadly defined as "not an AJAX error".
-        info = '<li>' + data.message[0] + '</li>';
-        if (data.status == 3) { // Existing member
+        info = '<li>' + result.message[0] + '</li>';
+        if (result.status == 3) { // Existing member
             log_feedback(info, ignored);
-        } else if ((data.status == 2) || (data.status == 1)) {
+        } else if ((result.status == 2) || (result.status == 1)) {
             log_feedback(info, success);
         } else { // Assume it is a problem
             info = jQuery(info);
-            info.prepend('<strong>Row ' + currRow.toString() + ': </strong>');
+            info.prepend('<strong>Row ' + rowNumber.toString() + ': </strong>');
             log_feedback(info, problems);
         }
-        next();
-    }
-    function invite_member() {
-        // SIDE EFFECT: Reduces the length of membersToInvite by one
-        var pc=0, memberToInvite=null, settings=null, selectedDelivery=null,
-            txt=null, d=null, attr=null;
-
-        currRow++;
-        currN.text(currRow.toString());
-        // The "+ 1" is so the progress bar is incomplete when processing the
-        // final row.
-        pc = (currRow / (totalRows + 1.0)) * 100;
-        progressBar.css('width', pc.toString()+'%')
-
-        memberToInvite = membersToInvite.pop();
-        email.text(memberToInvite.email);  // Email must exist
-        // The invite code is actually expecting a toAddr field, rather than
-        // email, so rename the property.
-        memberToInvite['toAddr'] = memberToInvite.email;
-        delete memberToInvite.email ;
-
-        d = new FormData();
-        for (attr in memberToInvite) {
-            d.append(attr, memberToInvite[attr])
-        }
-        txt = message.find('.subject').text();
-        d.append('subject', txt);
-        txt = message.find('.message').text();
-        d.append('message', txt);
-        txt = message.find('.email').text();
-        d.append('fromAddr', txt);
-        selectedDelivery = delivery.val();
-        d.append('delivery', selectedDelivery);
-        // The ID of the button that was "clicked", for zope.formlib
-        d.append('submit', 'submit');
+    }
 
-        settings = {
+    function post(url, d, successFn, errorFn) {
+        var settings = {
             accepts: 'application/json',
             async: true,
             cache: false,
@@ -416,18 +554,141 @@ function GSInviteByCSVInviterAJAX (invitingBlockSelector, deliverySelector,
             crossDomain: false,
             data: d,
             dataType: 'json',
-            error: error,
+            error: errorFn,
             headers: {},
             processData: false,
-            success: invite_success,
+            success: successFn,
             traditional: true,
             // timeout: TODO, What is the sane timeout?
             type: 'POST',
-            url: inviteURL,
+            url: url,
         };
         jQuery.ajax(settings);
     }
 
+    function resolve() {
+        var d=null, emails=null;
+        // Find the people that are already members before inviting
+        // anyone, so they can be skipped rather than sent to the inviter.
+        emails = jQuery.map(json, function(profile, i) {
+            return profile.email;
+        });
+        d = new FormData();
+        d.append('emails', JSON.stringify(emails));
+        d.append('submit', 'submit');
+        post(resolveURL, d, resolved, resolve_failed);
+    }
+
+    function resolved(data, textStatus, jqXHR) {
+        var i=0, profile=null, result=null;
+        if (data.status) {  // Invite everyone, and let the inviter sort it
+            resolve_failed(jqXHR, data.message[0], null);
+            return;
+        }
+        jobRows = [];
+        rowNumbers = [];
+        for (i = 0; i < json.length; i++) {
+            profile = json[i];
+            if (data.tags[i] == EXISTING_MEMBER) {
+                result = {'status': 3,
+                          'message': [profile.email + ' is already a member.']};
+                log_result(result, row_number(i));
+                members++;
+            } else {
+                jobRows.push(profile);
+                rowNumbers.push(row_number(i));
+            }
+        }
+        show_progress(members);
+        if (jobRows.length) {
+            submit_job();
+        } else {
+            done();
+        }
+    }
+
+    function resolve_failed(jqXHR, textStatus, errorThrown) {
+        console.log('Could not find the existing members');
+        console.log(textStatus);
+        submit_job();
+    }
+
+    function submit_job() {
+        var d=null, txt=null;
+        d = new FormData();
+        d.append('rows', JSON.stringify(jobRows));
+        txt = message.find('.subject').text();
+        d.append('subject', txt);
+        txt = message.find('.message').text();
+        d.append('message', txt);
+        txt = message.find('.email').text();
+        d.append('fromAddr', txt);
+        d.append('delivery', delivery.val());
+        // The ID of the button that was "clicked", for zope.formlib
+        d.append('submit', 'submit');
+        post(jobURL, d, job_submitted, job_failed);
+    }
+
+    function job_submitted(data, textStatus, jqXHR) {
+        // "Success" is broadly defined as "not an AJAX error".
+        if (data.status) {  // The entire job was rejected.
+            log_result(data, rowNumbers[0]);
+            done();
+        } else {
+            jobId = data.jobId;
+            job_progress(data);
+        }
+    }
+
+    function job_failed(jqXHR, textStatus, errorThrown) {
+        console.log('Issues');
+        console.log(textStatus);
+        console.error(errorThrown);
+        log_result({'status': -1, 'message': [textStatus]}, rowNumbers[0]);
+        done();
+    }
+
+    function poll() {
+        var d=null;
+        d = new FormData();
+        d.append('jobId', jobId);
+        d.append('start', reported.toString());
+        d.append('submit', 'submit');
+        post(statusURL, d, job_progress, poll_failed);
+    }
+
+    function poll_failed(jqXHR, textStatus, errorThrown) {
+        // The job carries on running on the server, so a failure to get
+        // the progress is not fatal: try again later.
+        console.log('Issues');
+        console.log(textStatus);
+        console.error(errorThrown);
+        setTimeout(poll, pollInterval);
+    }
+
+    function job_progress(data, textStatus, jqXHR) {
+        if (data.status) {  // The job is unknown
+            log_result(data, rowNumbers[Math.min(reported, jobRows.length - 1)]);
+            done();
+            return;
+        }
+        // The results start at the first row that has yet to be
+        // reported, and are in the same order as the rows in the CSV.
+        jQuery.each(data.results, function(i, result) {
+            log_result(result, rowNumbers[data.start + i]);
+        });
+        reported = data.start + data.results.length;
+        if (reported > 0) {
+            email.text(jobRows[reported - 1].email);
+        }
+        show_progress(members + data.done);
+        if ((data.state == 'finished') && (reported >= jobRows.length)) {
+            done();
+        } else {
+            setTimeout(poll, pollInterval);
+        }
+    }
+
     function done () {
         var m=null;
         progressBar.css('width', '100%');
@@ -435,8 +696,12 @@ function GSInviteByCSVInviterAJAX (invitingBlockSelector, deliverySelector,
             .removeClass('loading')
             .attr('data-icon', '\u2713');
         m = 'Processed ' + totalRows.toString() + ' people in '+
-            (totalRows + 1).toString() + ' rows. ' +
+            (totalRows + duplicates + 1).toString() + ' rows. ' +
             '(The first row was presumed to be a header and ignored.)'
+        if (duplicates) {
+            m = m + ' ' + duplicates.toString() + ' rows repeated an ' +
+                'earlier email address, and were skipped.';
+        }
         invitingBlock.find('.current-operation').text(m);
 
         invitingBlock.find('.buttons').addClass('in');
@@ -453,24 +718,30 @@ function GSInviteByCSVInviterAJAX (invitingBlockSelector, deliverySelector,
         success = invitingBlock.find('.success');
         ignored = invitingBlock.find('.ignored');
         problems = invitingBlock.find('.problems');
+        pollInterval = parseInt(pollInterval) || POLL_INTERVAL;
     }
     init();  // Note: automatic execution.
 
-    function set_member_data(jsonData) {
+    function set_member_data(jsonData, jsonRowNumbers, duplicateCount) {
         json = jsonData;
-        // Because pop() pops from the end we reverse the list so
-        // people are processed in the same order as the CSV.
-        json.reverse();
-        membersToInvite = json.slice(0);  // Copy the list
+        fileRows = jsonRowNumbers || null;
+        duplicates = duplicateCount || 0;
         totalRows = json.length;
-        currRow = 1;  // Due to skipping the header.
+        jobId = null;
+        reported = 0;
+        members = 0;
+        // Until the existing members are known everyone is invited.
+        jobRows = json;
+        rowNumbers = jQuery.map(json, function(profile, i) {
+            return row_number(i);
+        });
     }
 
     return {
-        invite: function (e, jsonData) {
-            set_member_data(jsonData)
+        invite: function (e, jsonData, jsonRowNumbers, duplicateCount) {
+            set_member_data(jsonData, jsonRowNumbers, duplicateCount);
             show_inviting();
-            invite_member();
+            resolve();
         }
     } // return
 }
@@ -495,12 +766,17 @@ function gs_group_member_invite_csv () {
     parser = GSInviteByCSVParserAJAX(attributes, scriptElement.data('form'),
                                      scriptElement.data('feedback'),
                                      scriptElement.data('checking'),
-                                     scriptElement.data('parser-url'));
+                                     scriptElement.data('parser-url'),
+                                     scriptElement.data('chunk-url'),
+                                     scriptElement.data('chunk-size'));
     // The actual inviting: Inviter
     inviter = GSInviteByCSVInviterAJAX(scriptElement.data('inviting'),
                                        scriptElement.data('delivery'),
                                        scriptElement.data('invitation'),
-                                       scriptElement.data('invite-url'));
+                                       scriptElement.data('job-url'),
+                                       scriptElement.data('status-url'),
+                                       scriptElement.data('poll-interval'),
+                                       scriptElement.data('resolve-url'));
 
     // Connect the Invite button up to the parser
     jQuery(scriptElement.data('invite-button')).click(parser.parse);
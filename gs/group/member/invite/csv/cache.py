@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from collections import OrderedDict
+from hashlib import sha1
+from threading import Lock
+from time import time
+
+
+def parse_key(buf, columns, *options):
+    '''The key for the result of parsing a CSV file
+
+:param buf: The bytes of the CSV file.
+:param list columns: The profile-attribute identifiers.
+:param options: Anything else that changes the result, such as the format.
+:returns: The SHA-1 of the bytes, the columns, and the options.
+:rtype: tuple'''
+    retval = (sha1(buf).hexdigest(), tuple(columns)) + options
+    return retval
+
+
+class ParseCache(object):
+    '''A least-recently-used cache of the responses from the parser
+
+:param int maxBytes: The maximum total size of the responses in the cache.
+:param int maxEntries: The maximum number of responses in the cache.
+:param int maxAge: The number of seconds a response is kept for.
+:param int maxEntryBytes: The largest response that will be cached.
+
+The cache is keyed by the content of the file, rather than its name, so the
+same file uploaded again is answered from the cache. The least recently used
+responses are evicted when the cache is too big, and responses that are too
+old are dropped when they are next looked up.'''
+    maxBytes = 64 * 1024 * 1024
+    maxEntries = 64
+    maxAge = 60 * 60
+    maxEntryBytes = 8 * 1024 * 1024
+    #: The clock, which is replaced in the tests
+    clock = staticmethod(time)
+
+    def __init__(self, maxBytes=None, maxEntries=None, maxAge=None, maxEntryBytes=None):
+        if maxBytes is not None:
+            self.maxBytes = maxBytes
+        if maxEntries is not None:
+            self.maxEntries = maxEntries
+        if maxAge is not None:
+            self.maxAge = maxAge
+        if maxEntryBytes is not None:
+            self.maxEntryBytes = maxEntryBytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = Lock()
+
+    def get(self, key):
+        '''Get a response
+
+:param key: The key, from :func:`parse_key`.
+:returns: The response, or ``None`` if it is not in the cache.
+:rtype: bytes'''
+        now = self.clock()
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if (entry is not None) and ((now - entry[1]) > self.maxAge):
+                self.size -= len(entry[0])
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                retval = None
+            else:
+                self.hits += 1
+                self.entries[key] = entry  # Now the most recently used
+                retval = entry[0]
+        return retval
+
+    def set(self, key, value):
+        '''Add a response
+
+:param key: The key, from :func:`parse_key`.
+:param bytes value: The response.
+:returns: ``True`` if the response was added, ``False`` if it was too big.'''
+        retval = len(value) <= self.maxEntryBytes
+        if retval:
+            with self.lock:
+                old = self.entries.pop(key, None)
+                if old is not None:
+                    self.size -= len(old[0])
+                self.entries[key] = (value, self.clock())
+                self.size += len(value)
+                while (self.size > self.maxBytes) or (len(self.entries) > self.maxEntries):
+                    oldKey, oldEntry = self.entries.popitem(last=False)
+                    self.size -= len(oldEntry[0])
+                    self.evictions += 1
+        return retval
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        '''The counters for the cache
+
+:returns: The ``hits``, ``misses``, ``evictions``, the number of
+          ``entries``, and the ``size`` of the responses.
+:rtype: dict'''
+        with self.lock:
+            retval = {'hits': self.hits, 'misses': self.misses,
+                      'evictions': self.evictions, 'entries': len(self.entries),
+                      'size': self.size, }
+        return retval
+
+
+#: The cache of the responses from the parser
+parseCache = ParseCache()
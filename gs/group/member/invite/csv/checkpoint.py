@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from hashlib import sha1
+from json import dumps as to_json
+from threading import Lock
+
+#: The outcome of a row that is yet to be invited
+PENDING = '-'
+#: The outcome of a row that could not be invited
+FAILED = 'x'
+#: The outcomes of the rows that are complete, and the status that is
+#: reported for them. Rows that failed are not complete, so they are tried
+#: again when the run is resumed.
+COMPLETED = {'1': 1, '2': 2, '3': 3}
+
+
+def run_id(owner, profiles):
+    '''The identifier for a run
+
+:param str owner: The path to the group.
+:param list profiles: The profile data, one dictionary per row.
+:returns: The SHA-1 of the owner and the rows, so the same rows sent to the
+          same group are the same run.
+:rtype: str'''
+    h = sha1(owner.encode('utf-8'))
+    h.update(b'\0')
+    h.update(to_json(profiles, sort_keys=True).encode('utf-8'))
+    retval = h.hexdigest()
+    return retval
+
+
+class Checkpoint(object):
+    '''How far a run has got
+
+:param str runId: The identifier for the run.
+:param int total: The number of rows.
+:param str outcomes: The outcome of each row, as one character per row. If
+                     ``None`` every row is pending.
+:param int lastRow: The index of the last row to be committed.
+:param store: Where the outcomes are stored, such as the
+              :class:`.queries.CheckpointQuery`. If ``None`` the outcomes
+              are only kept in memory.
+:param str owner: The path to the group.
+:param str unsaved: ``new`` if the run is yet to be stored, ``restart`` if
+                    it is stored but has been started again, or ``None``.'''
+    def __init__(self, runId, total, outcomes=None, lastRow=-1, store=None, owner='',
+                 unsaved=None):
+        self.runId = runId
+        self.owner = owner
+        self.unsaved = unsaved
+        self.outcomes = bytearray((outcomes or PENDING * total).encode('ascii'))
+        if len(self.outcomes) != total:
+            m = 'The checkpoint for {0} has {1} rows, rather than {2}'
+            raise ValueError(m.format(runId, len(self.outcomes), total))
+        self.lastRow = lastRow
+        self.store = store
+        self.lock = Lock()
+        self.saveLock = Lock()
+
+    def outcome(self, i):
+        return chr(self.outcomes[i])
+
+    def __contains__(self, i):
+        'Is the row complete?'
+        return self.outcome(i) in COMPLETED
+
+    @property
+    def completed(self):
+        retval = sum(1 for c in bytes(self.outcomes) if c in COMPLETED)
+        return retval
+
+    @property
+    def finished(self):
+        'Is every row complete?'
+        retval = self.completed == len(self.outcomes)
+        return retval
+
+    def record(self, i, status):
+        '''Record the outcome of a row
+
+:param int i: The index of the row.
+:param int status: The status from inviting the person in the row.'''
+        outcome = '{0}'.format(status) if status in COMPLETED.values() else FAILED
+        with self.lock:
+            self.outcomes[i] = ord(outcome)
+            self.lastRow = max(self.lastRow, i)
+        if self.store is not None:
+            self.save()
+            self.store.set_outcome(self.runId, i, outcome)
+
+    def save(self):
+        '''Store the run, if it is new or has been started again
+
+This is called by the worker threads, with the first outcome, rather than
+when the run is loaded. That way the run is written in the transaction of
+the worker, and the transaction of the request that submitted the job is
+left alone. The other workers wait until the run has been stored.'''
+        with self.saveLock:
+            pending = PENDING * len(self.outcomes)
+            if self.unsaved == 'new':
+                self.store.create(self.runId, self.owner, pending)
+            elif self.unsaved == 'restart':
+                self.store.restart(self.runId, pending)
+            self.unsaved = None
+
+    def result(self, i, profile):
+        '''The result of a row that was completed by an earlier attempt
+
+:param int i: The index of the row.
+:param dict profile: The profile data for the row.
+:rtype: dict'''
+        m = '{0} was processed by an earlier attempt.'
+        retval = {'status': COMPLETED[self.outcome(i)],
+                  'message': [m.format(profile.get('email', ''))]}
+        return retval
+
+    @classmethod
+    def load(cls, store, runId, owner, total):
+        '''Get the checkpoint for a run, starting the run if it is new
+
+:param store: Where the outcomes are stored.
+:param str runId: The identifier for the run.
+:param str owner: The path to the group.
+:param int total: The number of rows.
+:rtype: Checkpoint
+
+A run that is finished (because every row is complete) is started again,
+so sending the same file after a run has finished invites everyone again.
+The run is only read here. A new run, or a run that is started again, is
+stored by the first worker to record an outcome (see :meth:`save`).'''
+        d = store.load(runId)
+        if d is None:
+            retval = cls(runId, total, store=store, owner=owner, unsaved='new')
+        else:
+            retval = cls(runId, total, d['outcomes'], d['last_row'], store, owner)
+            if retval.finished:
+                retval = cls(runId, total, store=store, owner=owner, unsaved='restart')
+        return retval
+
+
+class LocalCheckpointStore(object):
+    '''An in-memory stand-in for the :class:`.queries.CheckpointQuery`'''
+    def __init__(self):
+        self.runs = {}
+        self.lock = Lock()
+
+    def load(self, runId):
+        with self.lock:
+            run = self.runs.get(runId)
+            retval = dict(run) if run else None
+        return retval
+
+    def create(self, runId, owner, outcomes):
+        with self.lock:
+            self.runs[runId] = {'owner': owner, 'outcomes': outcomes, 'last_row': -1}
+
+    def restart(self, runId, outcomes):
+        with self.lock:
+            self.runs[runId].update({'outcomes': outcomes, 'last_row': -1})
+
+    def set_outcome(self, runId, i, outcome):
+        with self.lock:
+            run = self.runs[runId]
+            run['outcomes'] = run['outcomes'][:i] + outcome + run['outcomes'][i + 1:]
+            run['last_row'] = max(run['last_row'], i)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import dumps as to_json
+from zope.cachedescriptors.property import Lazy
+from zope.formlib import form as formlib
+from gs.content.form.base import multi_check_box_widget
+from .csv2json import CSV2JSON
+from .interface import ICsvChunk
+from .staging import ChunkOffsetError, uploadStaging
+from .upload import MappedFileWidget, close_upload, read_upload
+
+
+class ChunkedCSV2JSON(CSV2JSON):
+    '''Upload a CSV file in chunks, and parse it once the last chunk arrives
+
+Each chunk is appended to the file in the :attr:`staging` area for the
+upload. Until the file is complete the response is the ``uploadId``, the
+number of bytes ``received``, and the ``total``. The chunk that completes
+the file is answered by the parser, with the same options as
+:class:`.csv2json.CSV2JSON` (which are sent with every chunk).
+
+A chunk that overlaps the bytes that have already been received is
+trimmed, so a request can be sent again safely. A chunk that starts after
+the end of the bytes that have been received gets the ``-9`` status, along
+with the number of bytes ``received``, so the browser can carry on from
+there. A request without a chunk just returns the number of bytes
+``received``, or the response from the parser if the file is complete.
+
+The file is kept in the :attr:`staging` area once it has been parsed, so
+if the response to the last chunk is lost the browser can ask again, and
+the response comes from the cache (or the file is parsed again). The files
+are removed by :meth:`.staging.UploadStaging.clean` when another upload
+starts, six hours after they were last written to.'''
+    label = 'POST the chunks of a CSV file to this URL to parse it.'
+    #: The files that are being uploaded
+    staging = uploadStaging
+
+    @Lazy
+    def form_fields(self):
+        retval = formlib.Fields(ICsvChunk, render_context=False)
+        retval['columns'].custom_widget = multi_check_box_widget
+        retval['csv'].custom_widget = MappedFileWidget
+        assert retval
+        return retval
+
+    @Lazy
+    def owner(self):
+        'The path to the group or site, which the uploads are kept apart by'
+        retval = '/'.join(self.context.getPhysicalPath())
+        return retval
+
+    def actual_process(self, data):
+        self.request.response.setHeader(b'Vary', b'Accept-Encoding')
+        chunk = data.get('csv') or b''
+        try:
+            m = self.receive(data['uploadId'], data['offset'], data['total'], chunk)
+        finally:
+            close_upload(chunk)
+        if m is not None:
+            retval = to_json(m)
+        else:
+            with self.staging.open(self.owner, data['uploadId']) as f:
+                data['csv'] = read_upload(f)
+            retval = super(ChunkedCSV2JSON, self).actual_process(data)
+        return retval
+
+    def receive(self, uploadId, offset, total, chunk):
+        '''Add a chunk to the upload
+
+:returns: ``None`` if the file is complete; otherwise the progress of the
+          upload, or the status if there was a problem.
+:rtype: dict'''
+        progress = {'uploadId': uploadId, 'total': total}
+        if total > self.maxBytes:
+            msg = 'The file is too large: it has {0} bytes, but the maximum is {1}. '\
+                  'Please split the file up.'
+            retval = {'status': -7, 'message': [msg.format(total, self.maxBytes), 'too-large']}
+        elif (offset + len(chunk)) > total:
+            msg = 'The chunk ends at {0}, after the end of the file at {1}.'
+            retval = {'status': -9, 'message': [msg.format(offset + len(chunk), total),
+                                                'too-long']}
+        else:
+            if offset == 0:
+                self.staging.clean()  # The start of an upload
+            try:
+                progress['received'] = self.staging.append(self.owner, uploadId, offset, chunk)
+            except ChunkOffsetError as e:
+                progress.update({'status': -9, 'message': [str(e), 'offset'],
+                                 'received': e.received})
+            retval = None if (progress.get('received') == total) else progress
+        return retval
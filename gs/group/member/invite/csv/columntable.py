@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from collections import namedtuple
+from os.path import dirname, join as path_join
+from threading import Lock
+from weakref import WeakKeyDictionary
+from zope.pagetemplate.pagetemplatefile import PageTemplateFile
+
+#: A required column in the table on the Invite by CSV page
+#:
+#: ``token``
+#:     The profile-attribute identifier.
+#: ``label``
+#:     The spreadsheet-style label for the column: ``A``, ``B``, ``C``...
+#: ``title``
+#:     The title of the profile attribute.
+#: ``example``
+#:     The example value.
+#: ``exampleClass``
+#:     The HTML class of the example cell.
+#: ``exampleIsCode``
+#:     ``True`` if the example is shown as code (the email address).
+Column = namedtuple('Column', ['token', 'label', 'title', 'example', 'exampleClass',
+                               'exampleIsCode'])
+
+#: An optional profile attribute, in the menu of the table
+MenuItem = namedtuple('MenuItem', ['token', 'title'])
+
+#: The example values for the well-known columns, and the class of the
+#: example cell
+EXAMPLES = {
+    'email': ('a.person@example.com', 'col-eg'),
+    'fn': ('A. Person', 'col-eg fn'),
+}
+
+
+def column_label(i):
+    '''The spreadsheet-style label for the column with the index ``i``'''
+    retval = chr(ord('A') + i)
+    return retval
+
+
+class ColumnTable(object):
+    '''The table of columns on the Invite by CSV page
+
+:param profileSchema: The :class:`.profilelist.ProfileSchema`.
+
+The table is the same for every group that has the same profile schema, so
+it is built once per schema (see :func:`get_column_table`).'''
+    template = PageTemplateFile(path_join(dirname(__file__), 'browser', 'templates',
+                                          'columns.pt'))
+
+    def __init__(self, profileSchema):
+        self.required = tuple(self.column(i, term)
+                              for i, term in enumerate(profileSchema.required))
+        self.menu = tuple(MenuItem(t.token, t.title) for t in profileSchema.optional)
+        self.lock = Lock()
+        self._html = None
+
+    @staticmethod
+    def column(i, term):
+        if term.token in EXAMPLES:
+            example, exampleClass = EXAMPLES[term.token]
+        else:
+            example = 'Example {0}'.format(term.title)
+            exampleClass = 'col-eg {0}'.format(term.token)
+        retval = Column(term.token, column_label(i), term.title, example, exampleClass,
+                        term.token == 'email')
+        return retval
+
+    @property
+    def html(self):
+        '''The table, rendered as HTML, which is rendered once and kept'''
+        if self._html is None:
+            with self.lock:
+                if self._html is None:
+                    self._html = self.template(table=self)
+        return self._html
+
+
+#: The column tables, by profile schema. When a schema is replaced its table
+#: is dropped.
+columnTableCache = WeakKeyDictionary()
+columnTableLock = Lock()
+
+
+def get_column_table(profileSchema):
+    '''Get the table of columns for a profile schema
+
+:param profileSchema: The :class:`.profilelist.ProfileSchema`.
+:rtype: ColumnTable'''
+    with columnTableLock:
+        retval = columnTableCache.get(profileSchema)
+        if retval is None:
+            retval = ColumnTable(profileSchema)
+            columnTableCache[profileSchema] = retval
+    return retval
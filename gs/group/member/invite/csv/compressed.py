@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from io import BytesIO
+from tempfile import TemporaryFile
+from zipfile import BadZipfile, ZipFile
+import zlib
+from .error import CompressionError
+from .upload import BLOCK_SIZE, MAP_THRESHOLD, map_file
+
+#: The first bytes of a gzip file
+GZIP_MAGIC = b'\x1f\x8b'
+#: The first bytes of a zip file
+ZIP_MAGIC = b'PK\x03\x04'
+#: The largest ratio of the decompressed size to the compressed size
+MAX_RATIO = 100
+#: The size a file can decompress to before the ratio is checked, because a
+#: small file can have a large ratio without being a problem
+RATIO_FLOOR = 1024 * 1024
+#: The size of the responses that are compressed with gzip
+GZIP_THRESHOLD = 4 * 1024
+#: The level of compression for the responses (the zlib default)
+GZIP_LEVEL = 6
+
+
+def compression(buf):
+    '''The compression of an uploaded file, from its first bytes
+
+:param buf: The bytes of the file, or a memory map of the file.
+:returns: ``gzip``, ``zip``, or ``None`` if the file is not compressed.'''
+    start = buf[:4]
+    if start[:2] == GZIP_MAGIC:
+        retval = 'gzip'
+    elif start == ZIP_MAGIC:
+        retval = 'zip'
+    else:
+        retval = None
+    return retval
+
+
+class Inflater(object):
+    '''Write decompressed blocks to a temporary file, checking the size
+
+:param int compressedSize: The size of the compressed file.
+:param int maxBytes: The largest the decompressed file can be.
+:param int maxRatio: The largest ratio of the decompressed size to the
+                     compressed size.'''
+    def __init__(self, compressedSize, maxBytes, maxRatio=MAX_RATIO):
+        self.maxBytes = maxBytes
+        self.maxSize = max(compressedSize * maxRatio, RATIO_FLOOR)
+        self.size = 0
+        self.outFile = TemporaryFile(prefix='gs-group-member-invite-csv-')
+
+    def write(self, block):
+        self.size += len(block)
+        if self.size > self.maxBytes:
+            raise CompressionError('too-large')
+        if self.size > self.maxSize:
+            # A zip bomb, or something like one
+            raise CompressionError('compression-ratio')
+        self.outFile.write(block)
+
+    def result(self, threshold=MAP_THRESHOLD):
+        '''The decompressed file, as bytes or a memory map'''
+        self.outFile.flush()
+        if self.size <= threshold:
+            self.outFile.seek(0)
+            retval = self.outFile.read()
+        else:
+            retval = map_file(self.outFile)
+        self.outFile.close()  # The map stays open
+        return retval
+
+
+def gunzip(buf, inflater, blockSize=BLOCK_SIZE):
+    '''Decompress a gzip file, a block at a time
+
+Each call to the decompressor is given at most a block of the compressed
+file, and returns at most a block of the decompressed file, so only a few
+blocks are held in memory no matter the ratio. A file with more than one
+gzip member (such as two files that were concatenated) is decompressed as
+one file.'''
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for start in range(0, len(buf), blockSize):
+        data = buf[start:start + blockSize]
+        while data:
+            inflater.write(d.decompress(data, blockSize))
+            data = d.unconsumed_tail
+            if d.unused_data:  # The start of the next member
+                data = d.unused_data
+                inflater.write(d.flush())
+                d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if not stream_ended(d):
+        raise EOFError('The gzip file ended before the end of the compressed data')
+    inflater.write(d.flush())
+
+
+def stream_ended(d):
+    '''Whether a decompressor has seen the end of its stream
+
+A decompressor that is at the end of its stream puts any more data in its
+``unused_data``, rather than decompressing it. A copy is checked, so the
+decompressor itself is left as it is (and it must not have been flushed).'''
+    probe = d.copy()
+    try:
+        probe.decompress(b'\0')
+    except zlib.error:
+        return False
+    retval = bool(probe.unused_data)
+    return retval
+
+
+def unzip(buf, inflater, blockSize=BLOCK_SIZE):
+    '''Decompress the one file in a zip file, a block at a time
+
+The directories, and the resource forks that the Mac adds (in
+``__MACOSX/``), are skipped. The size of the file in the zip is not
+trusted: the blocks are counted as they are decompressed.'''
+    z = ZipFile(buf if hasattr(buf, 'seek') else BytesIO(buf))
+    entries = [i for i in z.infolist()
+               if not (i.filename.endswith('/') or i.filename.startswith('__MACOSX/'))]
+    if len(entries) != 1:
+        raise CompressionError('zip-entries')
+    f = z.open(entries[0])
+    block = f.read(blockSize)
+    while block:
+        inflater.write(block)
+        block = f.read(blockSize)
+
+
+def decompress(buf, maxBytes, maxRatio=MAX_RATIO, threshold=MAP_THRESHOLD):
+    '''Decompress an uploaded file, if it is compressed
+
+:param buf: The bytes of the file, or a memory map of the file.
+:param int maxBytes: The largest the decompressed file can be.
+:param int maxRatio: The largest ratio of the decompressed size to the
+                     compressed size.
+:param int threshold: The size of the decompressed files that are mapped.
+:returns: The file, as it was if it is not compressed, or the decompressed
+          file as bytes or (if it is larger than the threshold) a memory
+          map.
+:raises CompressionError: The file is too large once decompressed, it
+                          decompresses too well, it is not a valid archive,
+                          or a zip file does not have one file in it.
+
+The file is decompressed to a temporary file on disk, which is mapped, so
+the decompressed file is never held in memory.'''
+    c = compression(buf)
+    if c is None:
+        return buf
+    inflater = Inflater(len(buf), maxBytes, maxRatio)
+    try:
+        if c == 'gzip':
+            gunzip(buf, inflater)
+        else:
+            unzip(buf, inflater)
+    except (zlib.error, BadZipfile, RuntimeError, EOFError, IOError) as e:
+        # RuntimeError is raised for an encrypted zip file
+        inflater.outFile.close()
+        raise CompressionError('bad-archive', e)
+    except CompressionError:
+        inflater.outFile.close()
+        raise
+    retval = inflater.result(threshold)
+    return retval
+
+
+def accepts_gzip(request):
+    '''Whether the client accepts a response compressed with gzip
+
+:param request: The request, with the ``Accept-Encoding`` header.
+:rtype: bool'''
+    header = request.getHeader('Accept-Encoding', '') or ''
+    codings = {}
+    for coding in header.split(','):
+        parts = coding.split(';')
+        q = 1.0
+        for param in parts[1:]:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[parts[0].strip().lower()] = q
+    q = codings.get('gzip', codings.get('x-gzip', codings.get('*', 0.0)))
+    retval = q > 0
+    return retval
+
+
+def gzip_compressor(level=GZIP_LEVEL):
+    '''A compressor that writes the gzip format, incrementally'''
+    retval = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return retval
+
+
+def gzip_bytes(data, level=GZIP_LEVEL):
+    '''Compress bytes with gzip'''
+    c = gzip_compressor(level)
+    retval = c.compress(data) + c.flush()
+    return retval
+
+
+class GzipWriter(object):
+    '''Write a response in chunks, compressing it once it is large enough
+
+:param response: The response to write to.
+:param bool compress: ``True`` if the client accepts gzip.
+:param int threshold: The size of the responses that are compressed.
+:param int level: The level of compression.
+
+The chunks are held back until there are ``threshold`` bytes of them, and
+then the ``Content-Encoding`` header is set and everything is compressed
+as it is written. A response that ends before then is written as it is,
+because it is too small to be worth compressing. The compressor writes its
+output as its buffer fills, so only a little of the response is held in
+memory at a time. Call :meth:`close` at the end, to write the rest.
+
+The ``Vary`` header is set when the writer is created, because the response
+depends on the ``Accept-Encoding`` header even when it is not compressed.'''
+    def __init__(self, response, compress, threshold=GZIP_THRESHOLD, level=GZIP_LEVEL):
+        self.response = response
+        self.response.setHeader(b'Vary', b'Accept-Encoding')
+        self.compressor = gzip_compressor(level) if compress else None
+        self.threshold = threshold
+        self.pending = []
+        self.pendingSize = 0
+        self.started = not compress
+
+    def start(self):
+        if self.compressor is not None:
+            self.response.setHeader(b'Content-Encoding', b'gzip')
+        self.started = True
+        self.send(b''.join(self.pending))
+        self.pending = None
+
+    def send(self, data):
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+        if data:
+            self.response.write(data)
+
+    def write(self, data):
+        if self.started:
+            self.send(data)
+        else:
+            self.pending.append(data)
+            self.pendingSize += len(data)
+            if self.pendingSize >= self.threshold:
+                self.start()
+
+    def close(self):
+        '''Write the end of the response'''
+        if not self.started:
+            self.compressor = None  # Too small to compress
+            self.start()
+        elif self.compressor is not None:
+            self.response.write(self.compressor.flush())
+
+    @property
+    def compressed(self):
+        return self.compressor is not None
@@ -13,20 +13,59 @@
 #
 ############################################################################
 from __future__ import absolute_import, unicode_literals
-from io import BytesIO
+from itertools import islice
 from json import dumps as to_json
 from zope.cachedescriptors.property import Lazy
 from zope.contenttype import guess_content_type
 from zope.formlib import form as formlib
 from gs.content.form.api.json import SiteEndpoint
 from gs.content.form.base import multi_check_box_widget
-from .interface import ICsv
+from .cache import parseCache, parse_key
+from .compressed import (GZIP_LEVEL, GZIP_THRESHOLD, MAX_RATIO, GzipWriter, accepts_gzip,
+                         compression, decompress, gzip_bytes)
+from .dedup import Deduplicator
+from .error import (
+    ColumnCountError, CompressionError, InvalidRowError, RowErrors, TooManyRowsError)
+from .interface import ICsv, FORMAT_COLUMNS, FORMAT_OBJECTS
+from .jsonstream import StreamTail
+from .limits import max_rows
+from .parallel import parallelParser
+from .profilelist import ProfileList
+from .rows import ProfileRows, iter_rows_json
+from .timing import ParseTimings, report as report_timings
 from .unicodereader import UnicodeDictReader
+from .upload import MappedFileWidget, close_upload, count_lines
+from .validation import RowValidator
 
 
 class CSV2JSON(SiteEndpoint):
     label = 'POST CSV data to this URL to parse it, and transform it ' \
             'into a JSON object.'
+    #: The maximum number of bad rows to report when ``allErrors`` is set
+    maxErrors = 100
+    #: The maximum length of the excerpt from a bad row
+    excerptLength = 80
+    #: The cache of the responses, keyed by the content of the file
+    cache = parseCache
+    #: The largest file that will be parsed, in bytes
+    maxBytes = 256 * 1024 * 1024
+    #: The number of lines allowed for each row when the lines are counted,
+    #: before the file is parsed, as a cell can have more than one line
+    linesPerRow = 4
+    #: The largest ratio of the decompressed size to the compressed size,
+    #: for gzip and zip files
+    maxRatio = MAX_RATIO
+    #: The size of the responses that are compressed, if the client accepts gzip
+    gzipThreshold = GZIP_THRESHOLD
+    #: The level of the gzip compression
+    gzipLevel = GZIP_LEVEL
+    #: The parser for the large files
+    parallelParser = parallelParser
+    #: The size of the files that are parsed by the :attr:`parallelParser`.
+    #: Sending the chunks to the workers, and the rows back, costs about a third
+    #: as much as parsing, and the last chunk can keep everyone waiting, so the
+    #: workers only win for files of about 8MiB or more (see the README).
+    parallelThreshold = 8 * 1024 * 1024
 
     def __init__(self, site, request):
         super(CSV2JSON, self).__init__(site, request)
@@ -35,24 +74,251 @@ class CSV2JSON(SiteEndpoint):
     def form_fields(self):
         retval = formlib.Fields(ICsv, render_context=False)
         retval['columns'].custom_widget = multi_check_box_widget
+        # Large files are mapped into memory, rather than read.
+        retval['csv'].custom_widget = MappedFileWidget
         assert retval
         return retval
 
+    @Lazy
+    def timings(self):
+        '''The time taken by each phase of the request'''
+        retval = ParseTimings()
+        return retval
+
+    @Lazy
+    def maxRows(self):
+        '''The maximum number of rows in a file, not counting the header
+
+See :func:`.limits.max_rows`.'''
+        retval = max_rows(self.context)
+        return retval
+
+    @Lazy
+    def profileList(self):
+        retval = ProfileList(self.context)
+        return retval
+
+    def row_validator(self, cols):
+        '''The validator for the rows, with one check per column
+
+:param list cols: The column identifiers.
+:rtype: RowValidator'''
+        retval = RowValidator(self.profileList.properties, cols, self.context)
+        return retval
+
+    def iter_values(self, reader):
+        '''Iterate the rows after the header, as tuples
+
+:param reader: The CSV reader, after the header has been read.
+
+Large files are parsed by the :attr:`parallelParser`, which gives the same
+rows as the reader, if the file can be split before it is decoded and there
+is more than one worker.'''
+        parallel = ((len(reader.buf) >= self.parallelThreshold) and reader.native
+                    and (self.parallelParser.workers > 1))
+        self.timings.decisions['parallel'] = parallel
+        if parallel:
+            rows = self.parallelParser.iter_values(reader.buf, reader.encoding,
+                                                   reader.dialect, len(reader.cols))
+            retval = islice(rows, 1, None)  # Skip the header, which has been read
+        else:
+            retval = reader.iter_values()
+        return retval
+
+    def validation_key(self, data):
+        '''The part of the cache key for checking the values
+
+:returns: ``None`` if the values are not checked, or the name of the profile
+          schema and the path to the site if they are.
+
+The values are checked against the profile schema for the site, with each
+field bound to the site, so the same file can give a different response
+on each site.'''
+        retval = None
+        if data.get('validate'):
+            retval = (self.profileList.profileSchemaName,
+                      '/'.join(self.context.getPhysicalPath()))
+        return retval
+
+    def deduplicator(self, cols):
+        '''The check for the rows that repeat an email address
+
+:param list cols: The column identifiers.
+:returns: The check, or ``None`` if there is no ``email`` column.
+:rtype: Deduplicator'''
+        retval = Deduplicator(cols.index('email'), self.maxErrors) if 'email' in cols else None
+        return retval
+
+    def validate(self, action, data):
+        # The form is validated before the action is called, which includes
+        # reading (or mapping) the upload.
+        with self.timings.phase('validate'):
+            retval = super(CSV2JSON, self).validate(action, data)
+        return retval
+
     @formlib.action(label='Submit', prefix='', failure='process_failure')
     def process_success(self, action, data):
         return self.actual_process(data)
 
     def actual_process(self, data):
+        '''Parse the CSV file, or get the response from the cache
+
+The same file, with the same columns and options, always gives the same
+response, so a file that is uploaded again is answered from the cache,
+without detecting the encoding or parsing the rows again.
+
+Files that are too large are rejected before they are hashed or parsed.
+
+The time taken by each phase is recorded in :attr:`timings`, which is
+reported once the response is ready (see :meth:`finish_timings`).
+
+Any response may be compressed, depending on the ``Accept-Encoding`` header
+of the request, so every response has the ``Vary`` header, whether it is
+compressed or not.'''
+        self.request.response.setHeader(b'Vary', b'Accept-Encoding')
+        timings = self.timings
+        timings.bytesIn = len(data['csv'])
+        try:
+            timings.decisions['compression'] = compression(data['csv'])
+            if timings.decisions['compression']:
+                with timings.phase('decompress'):
+                    m = self.decompress(data)
+                if m is not None:
+                    return to_json(m)
+            with timings.phase('limits'):
+                m = self.size_status(data['csv'])
+            if m is not None:
+                return to_json(m)
+            with timings.phase('hash'):
+                key = parse_key(data['csv'], data['columns'], self.is_compact(data),
+                                bool(data.get('allErrors')), self.validation_key(data),
+                                bool(data.get('dedupe')), bool(data.get('stream')))
+            retval = self.cache.get(key)
+            timings.decisions['cached'] = retval is not None
+            if retval is None:
+                retval = self.parse(data, key)
+                if retval:  # Streamed responses are cached as they are written
+                    if not isinstance(retval, bytes):
+                        retval = retval.encode('utf-8')
+                    self.cache.set(key, retval)
+            elif data.get('stream'):
+                self.request.response.setHeader(b'Content-Type', b'application/json')
+            if retval:
+                retval = self.compress_response(retval)
+        finally:
+            close_upload(data['csv'])
+            self.finish_timings()
+        return retval
+
+    def compress_response(self, body):
+        '''Compress the response with gzip, if the client accepts it
+
+:param bytes body: The JSON response.
+:returns: The response, compressed if it is at least :attr:`gzipThreshold`
+          bytes and the client accepts gzip; otherwise as it was.'''
+        retval = body
+        if (len(body) >= self.gzipThreshold) and accepts_gzip(self.request):
+            with self.timings.phase('gzip'):
+                if not isinstance(body, bytes):
+                    body = body.encode('utf-8')
+                retval = gzip_bytes(body, self.gzipLevel)
+            response = self.request.response
+            response.setHeader(b'Content-Type', b'application/json')
+            response.setHeader(b'Content-Encoding', b'gzip')
+            self.timings.decisions['gzip'] = True
+        return retval
+
+    def finish_timings(self):
+        '''Report the timings
+
+The timings are added to the response as a ``Server-Timing`` header, logged,
+and passed to the hooks (see :func:`.timing.report`). The header of a
+streamed response is written before the rows, so it only has the phases up
+to the start of the stream.'''
+        self.timings.finish()
+        if not self.timings.decisions.get('streamed'):
+            self.request.response.setHeader(b'Server-Timing', self.timings.server_timing())
+        report_timings(self.timings)
+
+    def decompress(self, data):
+        '''Decompress the upload, if it is a gzip or zip file
+
+:param dict data: The data from the form. The ``csv`` is replaced by the
+                  decompressed file.
+:returns: The status if the file could not be decompressed; otherwise
+          ``None``.
+
+The file is decompressed a block at a time (see
+:func:`.compressed.decompress`). It is rejected if it is larger than
+:attr:`maxBytes` once decompressed, or if it decompresses more than
+:attr:`maxRatio` times (which is a zip bomb, or something like it).'''
+        buf = data['csv']
+        retval = None
+        try:
+            data['csv'] = decompress(buf, self.maxBytes, self.maxRatio)
+        except CompressionError as e:
+            if e.reason == 'too-large':
+                msg = 'The file is too large once it is decompressed: the maximum is {0} '\
+                      'bytes. Please split the file up.'
+                retval = {'status': -7, 'message': [msg.format(self.maxBytes), e.reason]}
+            elif e.reason == 'compression-ratio':
+                msg = 'The file decompresses to more than {0} times its size. Please '\
+                      'upload the CSV file without compressing it.'
+                retval = {'status': -7, 'message': [msg.format(self.maxRatio), e.reason]}
+            else:
+                msg = 'The compressed file could not be read. Please check that it is a '\
+                      'gzip file, or a zip file with one CSV file in it.'
+                retval = {'status': -8, 'message': [msg, e.reason, str(e)]}
+        else:
+            close_upload(buf)
+        return retval
+
+    def size_status(self, buf):
+        '''Check the size of the file, without parsing it
+
+:param buf: The bytes of the CSV file, or a memory map of the file.
+:returns: The status if the file has more than :attr:`maxBytes` bytes, or
+          far too many lines; otherwise ``None``.
+
+The lines are counted (see :func:`.upload.count_lines`), which stops once
+there are too many. A cell can have more than one line, so the count is
+only a quick check that allows :attr:`linesPerRow` lines for each row. The
+rows themselves are counted as they are parsed (see :meth:`checked_rows`).'''
+        retval = None
+        if len(buf) > self.maxBytes:
+            msg = 'The file is too large: it has {0} bytes, but the maximum is {1}. '\
+                  'Please split the file up.'
+            retval = {'status': -7,
+                      'message': [msg.format(len(buf), self.maxBytes), 'too-large']}
+        elif count_lines(buf, self.maxLines) > self.maxLines:
+            msg = 'The file has too many lines: the maximum is {0}. Please split the file up.'
+            retval = {'status': -7,
+                      'message': [msg.format(self.maxLines), 'too-many-lines']}
+        return retval
+
+    @property
+    def maxLines(self):
+        '''The maximum number of lines in a file, including the header'''
+        retval = (self.maxRows + 1) * self.linesPerRow
+        return retval
+
+    def parse(self, data, cacheKey=None):
+        '''Parse the CSV file
+
+:param dict data: The data from the form.
+:param cacheKey: The key for the cache, for the streamed responses.
+:returns: The JSON response, or an empty string if it was streamed.'''
         # TODO: Delivery?
         cols = data['columns']
-        csv = BytesIO(data['csv'])  # The file is Bytes, encoded.
-        reader = UnicodeDictReader(csv, cols)
+        # The file is Bytes, encoded. The reader works on the bytes
+        # directly, rather than on a copy in a BytesIO.
+        reader = UnicodeDictReader(data['csv'], cols, timings=self.timings)
         profiles = []
         retval = None
         try:
             next(reader)  # Skip the first row (the header)
         except UnicodeDecodeError as e:
-            t = guess_content_type(body=data['csv'])[0]
+            t = guess_content_type(body=data['csv'][:1024])[0]
             msg = 'The file is different from what is required. (It '\
                   'appears to be a {0} file.) Please check that  you '\
                   'selected the correct CSV file.'
@@ -65,36 +331,259 @@ class CSV2JSON(SiteEndpoint):
             m = {'status': -5, 'message': [msg, 'no-rows']}
             retval = to_json(m)
         else:
-            rowCount = 0
+            compact = self.is_compact(data)
+            # Either stop at the first bad row, or carry on and collect them
+            errors = RowErrors(self.maxErrors) if data.get('allErrors') else None
+            # The rows with values that the profile fields reject are always
+            # collected, so they can all be fixed at once.
+            invalid = RowErrors(self.maxErrors) if data.get('validate') else None
+            validator = self.row_validator(cols) if data.get('validate') else None
+            # The duplicates, and the numbers of the rows that are kept, can
+            # only be reported in the compact format, so the list of objects
+            # is never de-duplicated.
+            dedup = self.deduplicator(cols) if (data.get('dedupe') and compact) else None
+            if data.get('stream'):
+                return self.stream_profiles(reader, cols, compact, errors, cacheKey,
+                                            validator, invalid, dedup)
+            # The rows are kept as tuples that share the list of columns,
+            # and only turned into dictionaries as the JSON is written.
+            profiles = ProfileRows(reader.cols)
+            try:
+                with self.timings.phase('rows'):
+                    for values in self.checked_rows(self.iter_values(reader), cols, errors,
+                                                    validator, invalid, dedup):
+                        profiles.append(values)
+            except ColumnCountError as e:
+                retval = to_json(self.column_count_status(e))
+                profiles = []
+            except TooManyRowsError:
+                retval = to_json(self.too_many_rows_status())
+                profiles = []
+            else:
+                if errors or invalid:
+                    m = self.row_errors_status(errors, profiles.to_data(compact), invalid,
+                                               dedup)
+                    retval = to_json(m)
+        if profiles and (not retval):
+            with self.timings.phase('json'):
+                retval = profiles.to_json(compact, dedup.status() if dedup else None)
+        elif (not profiles) and not(retval):
+            retval = to_json(self.no_rows_status())
+        assert retval, 'No retval'
+        return retval
+
+    def is_compact(self, data):
+        '''Should the compact JSON format be used?
+
+The format is taken from the ``format`` form field, or from the ``format``
+parameter of the ``Accept`` header: ``application/json; format=columns``.'''
+        fmt = data.get('format')
+        if not fmt:
+            accept = self.request.getHeader('Accept', '')
+            fmt = FORMAT_COLUMNS if ('format=' + FORMAT_COLUMNS) in accept.replace(' ', '') \
+                else FORMAT_OBJECTS
+        retval = (fmt == FORMAT_COLUMNS)
+        return retval
+
+    def checked_rows(self, reader, cols, errors=None, validator=None, invalid=None,
+                     dedup=None):
+        '''Iterate the rows of the CSV, checking the number of columns
+
+:param reader: The rows from the CSV reader, after the header has been read.
+               Each row is a tuple of values.
+:param list cols: The column identifiers.
+:param RowErrors errors: Where to collect the bad rows. If ``None`` the first
+                         bad row raises an error.
+:param RowValidator validator: The check for the values in each row. If
+                               ``None`` the values are not checked.
+:param RowErrors invalid: Where to collect the rows with bad values.
+:param Deduplicator dedup: The check for rows that repeat an earlier email
+                           address, which are dropped. If ``None`` every row
+                           is kept.
+:raises ColumnCountError: A row has the wrong number of columns, and
+                          ``errors`` is ``None``.
+:raises TooManyRowsError: There are more than :attr:`maxRows` rows.'''
+        rowCount = kept = 0
+        try:
             for row in reader:
                 rowCount += 1
+                if rowCount > self.maxRows:
+                    raise TooManyRowsError(self.maxRows)
                 if len(row) != len(cols):
                     # *Technically* the number of columns in CSV rows can be
                     # arbitary. However, I am enforcing a strict
                     # interpretation for sanity's sake.
-                    msg = 'Row {0} had {1} columns, rather than {2}. ' \
-                          'Please check the file.'
-                    # Name hack.
-                    m = {'status': -3,
-                         'message': [msg.format(rowCount, len(row),
-                                     len(cols))]}
-                    retval = to_json(m)
-                    profiles = []
-                    # --=mpj17=-- I think this is the first time I have used
-                    # break in actual code. Wow.
-                    break
-                profiles.append(row)
-        if profiles and (not retval):
-            retval = to_json(profiles)
-        elif (not profiles) and not(retval):
-            msg = 'No rows were found in the CSV file. '\
-                  'Please check that  you selected the correct CSV file.'
-            m = {'status': -4,
-                 'message': [msg, 'no-rows']}
+                    e = ColumnCountError(rowCount, len(row), len(cols), self.excerpt(row))
+                    if errors is None:
+                        raise e
+                    errors.append(e)
+                    continue
+                if validator is not None:
+                    problems = validator(row)
+                    if problems:
+                        invalid.append(InvalidRowError(rowCount, problems, self.excerpt(row)))
+                        continue
+                if (dedup is not None) and dedup(rowCount, row):
+                    continue
+                kept += 1
+                yield row
+        finally:
+            self.timings.rowsIn = rowCount
+            self.timings.rowsOut = kept
+
+    def excerpt(self, row):
+        retval = ','.join(v for v in row if v is not None)[:self.excerptLength]
+        return retval
+
+    @staticmethod
+    def column_count_message(e):
+        msg = 'Row {0} had {1} columns, rather than {2}. ' \
+              'Please check the file.'
+        retval = msg.format(e.rowNumber, e.found, e.expected)
+        return retval
+
+    def column_count_status(self, e):
+        retval = {'status': -3,
+                  'message': [self.column_count_message(e)]}
+        return retval
+
+    def row_errors_status(self, errors, profiles=None, invalid=None, dedup=None):
+        '''The status for all the bad rows in the file
+
+:param RowErrors errors: The rows with the wrong number of columns.
+:param profiles: The good rows, if they are to be included.
+:param RowErrors invalid: The rows with values the profile fields reject.
+:param Deduplicator dedup: The check for duplicate rows, to report the rows
+                           that were dropped.
+:returns: The status, with the first message summarising the problems and
+          the rest of the messages listing the bad rows. The status is ``-3``
+          if any row has the wrong number of columns, and ``-6`` if the only
+          problems are with the values.'''
+        messages = []
+        retval = {'errors': [], 'errorCount': 0}
+        if errors:
+            msg = '{0} rows had the wrong number of columns. Please check the file.'
+            messages.append(msg.format(len(errors)))
+            messages.extend([self.column_count_message(e) for e in errors])
+            retval['errors'] = [{'row': e.rowNumber, 'found': e.found,
+                                 'expected': e.expected, 'excerpt': e.excerpt}
+                                for e in errors]
+            retval['errorCount'] = len(errors)
+        if invalid:
+            msg = '{0} rows had values that are not allowed. Please check the file.'
+            messages.append(msg.format(len(invalid)))
+            messages.extend([self.invalid_row_message(e) for e in invalid])
+            retval['errors'].extend([{'row': e.rowNumber, 'fields': e.errors,
+                                      'excerpt': e.excerpt} for e in invalid])
+            retval['errorCount'] += len(invalid)
+            retval['invalid'] = {e.rowNumber: e.errors for e in invalid}
+            retval['invalidCount'] = len(invalid)
+        retval['status'] = -3 if errors else -6
+        retval['message'] = messages
+        if profiles is not None:
+            retval['profiles'] = profiles
+        if dedup is not None:
+            retval.update(dedup.status())
+        return retval
+
+    @staticmethod
+    def invalid_row_message(e):
+        problems = '; '.join('{0}: {1}'.format(col, msg) for col, msg in sorted(e.errors.items()))
+        retval = 'Row {0}: {1}'.format(e.rowNumber, problems)
+        return retval
+
+    @staticmethod
+    def no_rows_status():
+        msg = 'No rows were found in the CSV file. '\
+              'Please check that  you selected the correct CSV file.'
+        retval = {'status': -4,
+                  'message': [msg, 'no-rows']}
+        return retval
+
+    def too_many_rows_status(self):
+        msg = 'The file has too many rows: the maximum is {0}. Please split the file up.'
+        retval = {'status': -7,
+                  'message': [msg.format(self.maxRows), 'too-many-rows']}
+        return retval
+
+    def stream_profiles(self, reader, cols, compact=False, errors=None, cacheKey=None,
+                        validator=None, invalid=None, dedup=None):
+        '''Write the profiles to the response in chunks
+
+:param reader: The CSV reader, after the header has been read.
+:param list cols: The column identifiers.
+:param bool compact: If ``True`` the compact JSON format is used.
+:param RowErrors errors: Where to collect the bad rows. If ``None`` the
+                         streaming stops at the first bad row.
+:param cacheKey: The key to cache the response with. The chunks are kept
+                 while the response is small enough to be cached.
+:param RowValidator validator: The check for the values in each row.
+:param RowErrors invalid: Where to collect the rows with bad values.
+:param Deduplicator dedup: The check for duplicate rows. The rows that were
+                           dropped are reported at the end of the compact
+                           format.
+:returns: An empty string if the profiles were streamed, or the JSON for
+          the error status if there was a problem with the first row.
+
+Only one chunk of rows is held in memory at a time. Problems found before
+the first byte is written are returned as normal. After that a problem
+with a row is written as the final item of the list.'''
+        rows = self.checked_rows(self.iter_values(reader), cols, errors, validator, invalid,
+                                 dedup)
+        try:
+            firstRow = next(rows)
+        except StopIteration:
+            m = self.row_errors_status(errors, invalid=invalid, dedup=dedup) \
+                if (errors or invalid) else self.no_rows_status()
             retval = to_json(m)
-        assert retval, 'No retval'
+        except ColumnCountError as e:
+            retval = to_json(self.column_count_status(e))
+        except TooManyRowsError:
+            retval = to_json(self.too_many_rows_status())
+        else:
+            response = self.request.response
+            response.setHeader(b'Content-Type', b'application/json')
+            response.setHeader(b'Server-Timing', self.timings.server_timing())
+            self.timings.decisions['streamed'] = True
+            allRows = self.rows_with_tail(firstRow, rows, errors, invalid, dedup)
+            extra = dedup.status if dedup is not None else None
+            kept = [] if cacheKey is not None else None
+            keptSize = 0
+            # The chunks are compressed as they are written, if the client
+            # accepts gzip and there are enough of them.
+            writer = GzipWriter(response, accepts_gzip(self.request), self.gzipThreshold,
+                                self.gzipLevel)
+            with self.timings.phase('stream'):
+                for chunk in iter_rows_json(reader.cols, allRows, compact, extra):
+                    b = chunk.encode('utf-8')
+                    writer.write(b)
+                    if kept is not None:
+                        keptSize += len(b)
+                        if keptSize <= self.cache.maxEntryBytes:
+                            kept.append(b)
+                        else:
+                            kept = None  # Too big to cache
+                writer.close()
+            self.timings.decisions['gzip'] = writer.compressed
+            if kept is not None:
+                self.cache.set(cacheKey, b''.join(kept))
+            retval = ''
         return retval
 
+    def rows_with_tail(self, firstRow, rows, errors=None, invalid=None, dedup=None):
+        yield firstRow
+        try:
+            for row in rows:
+                yield row
+        except ColumnCountError as e:
+            yield StreamTail(self.column_count_status(e))
+        except TooManyRowsError:
+            yield StreamTail(self.too_many_rows_status())
+        else:
+            if errors or invalid:
+                yield StreamTail(self.row_errors_status(errors, invalid=invalid, dedup=dedup))
+
     def process_failure(self, action, data, errors):
+        self.request.response.setHeader(b'Vary', b'Accept-Encoding')
         retval = self.build_error_response(action, data, errors)
         return retval
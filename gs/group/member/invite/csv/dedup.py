@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from hashlib import md5
+from logging import getLogger
+from struct import unpack
+from .error import RowErrors
+log = getLogger('gs.group.member.invite.csv.dedup')
+
+
+def normalise_email(email):
+    '''Normalise an email address, so copies of the same address match
+
+:param str email: The email address.
+:returns: The address in lower case, without any white space.'''
+    retval = ''.join(email.split()).lower()
+    return retval
+
+
+def email_key(email):
+    '''The key for an email address in the set of seen addresses
+
+:param str email: The email address.
+:returns: The first 64 bits of the MD5 of the normalised address.
+:rtype: int
+
+An integer is much smaller than the address, and 64 bits are enough for
+the chance of two addresses in one file sharing a key to be negligible.'''
+    retval = unpack(b'<q', md5(normalise_email(email).encode('utf-8')).digest()[:8])[0]
+    return retval
+
+
+class Deduplicator(object):
+    '''Find the rows that repeat an earlier email address
+
+:param int index: The index of the ``email`` column.
+:param int limit: The maximum number of row numbers to report. Every
+                  duplicate is counted.
+:param int maxKeys: The maximum number of addresses to remember. After that
+                    the later rows are not checked.
+
+The first row with an address is kept, and the later copies are
+dropped. The number of each row that is kept is recorded as well, so the
+rows that are kept can be matched to the rows in the file. Each row is
+checked in constant time, so the file is checked in linear time.'''
+    maxKeys = 1000000
+
+    def __init__(self, index, limit, maxKeys=None):
+        self.index = index
+        if maxKeys is not None:
+            self.maxKeys = maxKeys
+        self.seen = set()
+        self.duplicates = RowErrors(limit)
+        self.kept = []
+        self.full = False
+
+    def __call__(self, rowNumber, row):
+        '''Is the row a duplicate?
+
+:param int rowNumber: The number of the row, which is recorded in the
+                      ``duplicates`` or the ``kept`` rows.
+:param row: The values in the row.
+:rtype: bool'''
+        email = row[self.index]
+        retval = False
+        if email:
+            key = email_key(email)
+            if key in self.seen:
+                self.duplicates.append(rowNumber)
+                retval = True
+            elif len(self.seen) < self.maxKeys:
+                self.seen.add(key)
+            elif not self.full:
+                self.full = True
+                log.warning('Only checking the first %d addresses for duplicates',
+                            self.maxKeys)
+        if not retval:
+            self.kept.append(rowNumber)
+        return retval
+
+    def status(self):
+        '''The dropped rows, for adding to the response
+
+:returns: The row numbers of the ``duplicates`` (up to the limit), the
+          ``duplicateCount``, and the ``rowNumbers`` of the rows that were
+          kept.
+:rtype: dict'''
+        retval = {'duplicates': self.duplicates.errors,
+                  'duplicateCount': len(self.duplicates),
+                  'rowNumbers': self.kept, }
+        return retval
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from codecs import (BOM_UTF8, BOM_UTF16_BE, BOM_UTF16_LE, BOM_UTF32_BE, BOM_UTF32_LE,
+                    getincrementaldecoder)
+from collections import namedtuple
+from chardet.universaldetector import UniversalDetector
+
+#: The byte-order marks, with the UTF-32 marks before the UTF-16 marks
+#: because the UTF-32 little-endian mark starts with the UTF-16 one. The
+#: codecs skip the mark when decoding.
+BOMS = ((BOM_UTF32_LE, 'utf-32'),
+        (BOM_UTF32_BE, 'utf-32'),
+        (BOM_UTF8, 'utf-8-sig'),
+        (BOM_UTF16_LE, 'utf-16'),
+        (BOM_UTF16_BE, 'utf-16'))
+
+#: All the ASCII bytes, for deleting with :meth:`bytes.translate`
+ASCII_BYTES = bytes(bytearray(range(128)))
+
+#: The result of guessing the encoding
+#:
+#: ``encoding``
+#:     The name of the encoding.
+#: ``method``
+#:     What made the decision: ``given``, ``bom``, ``ascii``, ``utf-8``,
+#:     ``chardet`` or ``default``.
+#: ``confidence``
+#:     How sure the decision is, from ``0.0`` to ``1.0``.
+EncodingGuess = namedtuple('EncodingGuess', ['encoding', 'method', 'confidence'])
+
+
+class EncodingDetector(object):
+    '''Guess the encoding of a CSV file, trying the cheapest tests first
+
+:param int sampleSize: The number of bytes to feed :mod:`chardet` first.
+:param float threshold: The confidence that :mod:`chardet` must have in its
+                        guess for it to be used.
+:param int maxSampleSize: The most bytes to feed :mod:`chardet`.
+
+The tests are, in order,
+
+#. Looking for a byte-order mark,
+#. Checking if the file is all ASCII,
+#. Checking if the file is valid UTF-8, and
+#. Feeding a sample, from the first byte that is not ASCII, to
+   :mod:`chardet`.
+
+The time :mod:`chardet` takes grows with the sample, so the sample starts
+small and is only made larger (up to the :attr:`maxSampleSize`) while the
+confidence is below the :attr:`threshold`. If all of these fail then the
+:attr:`defaultEncoding` is used.'''
+    sampleSize = 4 * 1024
+    maxSampleSize = 64 * 1024
+    threshold = 0.2
+    defaultEncoding = 'utf-8'
+    #: The size of the blocks checked for ASCII
+    blockSize = 1024 * 1024
+
+    def __init__(self, sampleSize=None, threshold=None, maxSampleSize=None):
+        if sampleSize is not None:
+            self.sampleSize = sampleSize
+        if threshold is not None:
+            self.threshold = threshold
+        if maxSampleSize is not None:
+            self.maxSampleSize = maxSampleSize
+
+    def detect(self, buf):
+        '''Guess the encoding of a buffer
+
+:param buf: The bytes of the CSV file.
+:returns: The guess.
+:rtype: EncodingGuess'''
+        sample = buf[:self.sampleSize]
+        retval = self.from_bom(sample)
+        if retval is None:
+            start = self.first_non_ascii(buf)
+            if start is None:
+                retval = EncodingGuess('ascii', 'ascii', 1.0)
+            else:
+                # The bytes before the first non-ASCII byte are valid in
+                # every encoding we guess, so only the rest is examined.
+                retval = (self.from_utf8(buf, start, self.blockSize)
+                          or self.from_chardet(buf, start)
+                          or EncodingGuess(self.defaultEncoding, 'default', 0.0))
+        return retval
+
+    @staticmethod
+    def from_bom(sample):
+        retval = None
+        for bom, encoding in BOMS:
+            if sample.startswith(bom):
+                retval = EncodingGuess(encoding, 'bom', 1.0)
+                break
+        return retval
+
+    def first_non_ascii(self, buf):
+        '''The offset of the first byte that is not ASCII
+
+:returns: The offset, or ``None`` if the file is all ASCII.
+
+The whole buffer is checked, because a file that is ASCII at the start may
+not be at the end. Deleting the ASCII bytes is done in C, a block at a time,
+and the non-ASCII file will normally stop at the first block.'''
+        retval = None
+        for start in range(0, len(buf), self.blockSize):
+            block = buf[start:start + self.blockSize]
+            if block.translate(None, ASCII_BYTES):
+                retval = start + len(block) - len(block.lstrip(ASCII_BYTES))
+                break
+        return retval
+
+    @staticmethod
+    def from_utf8(buf, start=0, blockSize=1024 * 1024):
+        '''Check that the buffer, from the start, is valid UTF-8
+
+The buffer is decoded a block at a time, so a file that is only valid UTF-8
+at the start is not taken for UTF-8. A block may end part way through a
+character, which the incremental decoder carries over to the next block.'''
+        decoder = getincrementaldecoder('utf-8')()
+        size = len(buf)
+        try:
+            for i in range(start, size, blockSize):
+                decoder.decode(buf[i:i + blockSize], (i + blockSize) >= size)
+        except UnicodeDecodeError:
+            retval = None
+        else:
+            retval = EncodingGuess('utf-8', 'utf-8', 1.0)
+        return retval
+
+    def from_chardet(self, buf, start=0):
+        '''Ask :mod:`chardet`, with samples from the start that grow four-fold
+
+:returns: The guess, or ``None`` if even the largest sample was not enough.'''
+        retval = None
+        size = self.sampleSize
+        while retval is None:
+            detector = UniversalDetector()
+            detector.feed(buf[start:start + size])
+            detector.close()
+            encoding = detector.result['encoding']
+            confidence = detector.result['confidence']
+            if encoding and (confidence >= self.threshold):
+                retval = EncodingGuess(encoding, 'chardet', confidence)
+            elif (size >= self.maxSampleSize) or ((start + size) >= len(buf)):
+                break
+            size = min(size * 4, self.maxSampleSize)
+        return retval
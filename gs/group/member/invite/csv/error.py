@@ -24,3 +24,69 @@ class ProfileNotFound(Exception):
 
 class RequiredColumnNotFound(AttributeError):
     pass
+
+
+class ColumnCountError(ValueError):
+    '''A row in the CSV file has the wrong number of columns'''
+    def __init__(self, rowNumber, found, expected, excerpt=''):
+        m = 'Row {0} had {1} columns, rather than {2}.'
+        super(ColumnCountError, self).__init__(m.format(rowNumber, found, expected))
+        self.rowNumber = rowNumber
+        self.found = found
+        self.expected = expected
+        self.excerpt = excerpt
+
+
+class TooManyRowsError(ValueError):
+    '''A CSV file has more rows than the maximum'''
+    def __init__(self, maxRows):
+        m = 'The file has more than {0} rows.'
+        super(TooManyRowsError, self).__init__(m.format(maxRows))
+        self.maxRows = maxRows
+
+
+class InvalidRowError(ValueError):
+    '''A row in the CSV file has values that the profile fields reject'''
+    def __init__(self, rowNumber, errors, excerpt=''):
+        m = 'Row {0} had problems with {1}.'
+        super(InvalidRowError, self).__init__(m.format(rowNumber, ', '.join(sorted(errors))))
+        self.rowNumber = rowNumber
+        self.errors = errors
+        self.excerpt = excerpt
+
+
+class RowErrors(object):
+    '''Collect the problems with the rows in a CSV file
+
+:param int limit: The maximum number of problems to keep.
+
+Every problem is counted, but only the first ``limit`` are kept, so a file
+where every row is wrong does not use more memory than a good one.'''
+    def __init__(self, limit):
+        self.limit = limit
+        self.errors = []
+        self.count = 0
+
+    def append(self, error):
+        self.count += 1
+        if len(self.errors) < self.limit:
+            self.errors.append(error)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.errors)
+
+
+class CompressionError(ValueError):
+    '''A compressed upload could not be decompressed
+
+:param str reason: ``too-large``, ``compression-ratio``, ``zip-entries`` or
+                   ``bad-archive``.'''
+    def __init__(self, reason, error=None):
+        m = 'Could not decompress the file ({0}{1}).'
+        super(CompressionError, self).__init__(m.format(reason, ': {0}'.format(error)
+                                                        if error else ''))
+        self.reason = reason
+        self.error = error
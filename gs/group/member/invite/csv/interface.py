@@ -13,8 +13,14 @@
 #
 ############################################################################
 from __future__ import absolute_import, unicode_literals
+from mmap import mmap
 from zope.interface.interface import Interface
-from zope.schema import Bytes, Choice, List, ValidationError
+from zope.schema import Bool, Bytes, Choice, Int, List, Text, TextLine, ValidationError
+from .staging import valid_upload_id
+
+#: The JSON formats that the parser can return
+FORMAT_OBJECTS = 'objects'
+FORMAT_COLUMNS = 'columns'
 
 
 class RequiredAttributeMissingError(ValidationError):
@@ -36,9 +42,16 @@ class RequiredAttributeMissingError(ValidationError):
         return str(self)
 
 
+class CSVFile(Bytes):
+    """The bytes of an uploaded file, or a memory map of a large file.
+
+See :func:`.upload.read_upload`."""
+    _type = (bytes, mmap)
+
+
 class ICsv(Interface):
     """Schema for parsing a CSV file."""
-    csv = Bytes(
+    csv = CSVFile(
         title='CSV File',
         description='The CSV file to be processed.',
         required=True)
@@ -51,3 +64,137 @@ class ICsv(Interface):
                           vocabulary='ProfileAttributes'),
         unique=True,
         required=True)
+
+    stream = Bool(
+        title='Stream',
+        description='Write the profiles to the response in chunks, rather '
+                    'than building the entire JSON object in memory.',
+        default=False,
+        required=False)
+
+    format = Choice(
+        title='Format',
+        description='The format of the JSON that is returned: a list of '
+                    'objects, or the columns and a list of rows.',
+        values=(FORMAT_OBJECTS, FORMAT_COLUMNS),
+        default=FORMAT_OBJECTS,
+        required=False)
+
+    allErrors = Bool(
+        title='All errors',
+        description='Parse the entire file, and report every row with the '
+                    'wrong number of columns, rather than stopping at the '
+                    'first.',
+        default=False,
+        required=False)
+
+    validate = Bool(
+        title='Validate',
+        description='Check every value against the profile fields, and '
+                    'report all the rows with problems before anyone is '
+                    'invited.',
+        default=False,
+        required=False)
+
+    dedupe = Bool(
+        title='Remove duplicates',
+        description='Only keep the first row for each email address, '
+                    'ignoring case and white space.',
+        default=False,
+        required=False)
+
+
+class ICsvChunk(ICsv):
+    """Schema for uploading a CSV file in chunks, and parsing it once the
+last chunk has been received."""
+    uploadId = TextLine(
+        title='Upload identifier',
+        description='The identifier for the upload, picked by the browser: '
+                    'eight to 64 letters, digits, hyphens and underscores.',
+        constraint=valid_upload_id,
+        required=True)
+
+    offset = Int(
+        title='Offset',
+        description='The offset of the start of the chunk in the file.',
+        min=0,
+        required=True)
+
+    total = Int(
+        title='Total',
+        description='The size of the entire file, in bytes.',
+        min=0,
+        required=True)
+
+    csv = CSVFile(
+        title='Chunk',
+        description='The chunk of the CSV file, which starts at the offset. '
+                    'If it is missing the number of bytes that have been '
+                    'received is returned.',
+        required=False)
+
+
+class IParseTimingHook(Interface):
+    """A hook that is given the timings each time a CSV file is parsed.
+
+Register a named utility that provides this interface to send the timings
+to a metrics system."""
+
+    def __call__(timings):
+        """Record the timings
+
+:param timings: The :class:`.timing.ParseTimings` for the parse."""
+
+
+class IBatchInvite(Interface):
+    """Schema for inviting several people at once."""
+    rows = Text(
+        title='Rows',
+        description='The profile data for the people to invite, as a JSON '
+                    'list of objects.',
+        required=True)
+
+    subject = TextLine(
+        title='Subject',
+        description='The subject of the invitation.',
+        required=True)
+
+    message = Text(
+        title='Message',
+        description='The message in the invitation.',
+        required=True)
+
+    fromAddr = TextLine(
+        title='From',
+        description='The email address that the invitation is from.',
+        required=True)
+
+    delivery = TextLine(
+        title='Delivery',
+        description='The delivery setting for the new members.',
+        required=True)
+
+
+class IInviteJobStatus(Interface):
+    """Schema for checking on a background invitation job."""
+    jobId = TextLine(
+        title='Job identifier',
+        description='The identifier of the job, as returned when the job was '
+                    'submitted.',
+        required=True)
+
+    start = Int(
+        title='Start',
+        description='The index of the first row to return the result for.',
+        default=0,
+        min=0,
+        required=False)
+
+
+class IResolveRows(Interface):
+    """Schema for finding the existing people before inviting."""
+    emails = Text(
+        title='Email addresses',
+        description='The email address from each row, as a JSON list of '
+                    'strings.',
+        required=True)
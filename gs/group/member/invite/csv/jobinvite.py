@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from io import BytesIO
+from json import dumps as to_json
+from AccessControl import getSecurityManager
+from AccessControl.SecurityManagement import newSecurityManager, noSecurityManager
+import transaction
+from ZPublisher.BaseRequest import RequestContainer
+from ZPublisher.HTTPRequest import HTTPRequest
+from ZPublisher.HTTPResponse import HTTPResponse
+from zope.cachedescriptors.property import Lazy
+from zope.formlib import form as formlib
+from gs.content.form.api.json import GroupEndpoint
+from .batchinvite import BatchInvite, RowInviter
+from .checkpoint import Checkpoint, run_id
+from .interface import IInviteJobStatus
+from .jobs import jobQueue
+from .limits import max_rows
+from .queries import CheckpointQuery
+
+#: The parts of the environment of the request that submitted a job that are
+#: copied to the requests that invite each person, so the links in the
+#: invitations are to the same site.
+ENVIRON_KEYS = ('SERVER_NAME', 'SERVER_PORT', 'SERVER_PROTOCOL', 'SCRIPT_NAME', 'HTTP_HOST',
+                'HTTPS', 'wsgi.url_scheme', 'HTTP_X_FORWARDED_HOST', 'HTTP_X_FORWARDED_PROTO')
+
+
+def request_environ(request):
+    '''The parts of the environment of a request that are needed by a new request'''
+    retval = dict((k, request.environ[k]) for k in ENVIRON_KEYS if k in request.environ)
+    retval['REQUEST_METHOD'] = 'GET'
+    return retval
+
+
+class ThreadRowInviter(object):
+    '''Invite one person from a worker thread
+
+:param db: The ZODB database.
+:param str groupPath: The physical path to the group.
+:param str userId: The identifier of the administrator that submitted the job.
+:param str subject: The subject of the invitation.
+:param str message: The message in the invitation.
+:param str fromAddr: The address the invitation is from.
+:param str delivery: The delivery setting for the new member.
+:param dict environ: The environment for the new requests (see
+                     :func:`request_environ`).
+
+The objects from the request that submitted the job cannot be used once that
+request has finished, so each row is invited with a new connection to the
+database, and a new request, as the administrator that submitted the
+job. Each row is committed on its own.'''
+    def __init__(self, db, groupPath, userId, subject, message, fromAddr, delivery,
+                 environ=None):
+        self.db = db
+        self.groupPath = groupPath
+        self.userId = userId
+        self.subject = subject
+        self.message = message
+        self.fromAddr = fromAddr
+        self.delivery = delivery
+        self.environ = environ or {}
+
+    def new_request(self):
+        '''A request from the publisher, without a client'''
+        response = HTTPResponse(stdout=BytesIO())
+        retval = HTTPRequest(BytesIO(), dict(self.environ), response)
+        return retval
+
+    def __call__(self, profile):
+        connection = self.db.open()
+        request = self.new_request()
+        try:
+            app = connection.root()['Application'].__of__(RequestContainer(REQUEST=request))
+            group = app.unrestrictedTraverse(self.groupPath)
+            acl_users = group.acl_users
+            user = acl_users.getUserById(self.userId).__of__(acl_users)
+            newSecurityManager(request, user)
+            inviter = RowInviter(group, request)
+            retval = inviter.invite(profile, self.subject, self.message, self.fromAddr,
+                                    self.delivery)
+            transaction.commit()
+        except Exception:
+            transaction.abort()
+            raise
+        finally:
+            noSecurityManager()
+            request.close()
+            connection.close()
+        return retval
+
+
+class SubmitInviteJob(BatchInvite):
+    '''Invite the people from a CSV file in the background
+
+The rows are checked in the same way as the batch inviter, and then
+submitted to the job queue, rather than being invited during the
+request. The response is the progress of the new job, including the
+``jobId``.
+
+The identifier of the job is the identifier of the run (see
+:func:`.checkpoint.run_id`), so sending the same rows again returns the
+job if it is still running, resumes the run from its checkpoint if it
+stopped part way, or starts it again if every row is complete.'''
+    label = 'POST rows of profile data to this URL to invite the people in the background.'
+    queue = jobQueue
+
+    @Lazy
+    def maxRows(self):
+        '''The maximum number of rows that can be sent in one job, which is the
+maximum number of rows in a file (see :func:`.limits.max_rows`)'''
+        retval = max_rows(self.context)
+        return retval
+
+    @Lazy
+    def groupPath(self):
+        retval = '/'.join(self.context.getPhysicalPath())
+        return retval
+
+    @Lazy
+    def checkpoints(self):
+        retval = CheckpointQuery()
+        return retval
+
+    def process_rows(self, profiles, data):
+        userId = getSecurityManager().getUser().getId()
+        invite = ThreadRowInviter(self.context._p_jar.db(), self.groupPath, userId,
+                                  data['subject'], data['message'], data['fromAddr'],
+                                  data['delivery'], request_environ(self.request))
+        runId = run_id(self.groupPath, profiles)
+        checkpoint = Checkpoint.load(self.checkpoints, runId, self.groupPath, len(profiles))
+        job = self.queue.submit(profiles, invite, self.groupPath, runId, checkpoint)
+        retval = to_json(job.to_dict())
+        return retval
+
+
+class InviteJobStatus(GroupEndpoint):
+    '''The progress of a background invitation job'''
+    label = 'POST the job identifier to this URL to get the progress of the job.'
+    queue = jobQueue
+
+    def __init__(self, group, request):
+        super(InviteJobStatus, self).__init__(group, request)
+
+    @Lazy
+    def form_fields(self):
+        retval = formlib.Fields(IInviteJobStatus, render_context=False)
+        assert retval
+        return retval
+
+    @Lazy
+    def groupPath(self):
+        retval = '/'.join(self.context.getPhysicalPath())
+        return retval
+
+    @formlib.action(label='Submit', prefix='', failure='process_failure')
+    def process_success(self, action, data):
+        return self.actual_process(data)
+
+    def actual_process(self, data):
+        job = self.queue.get(data['jobId'])
+        # A job from another group is treated the same as a job that does
+        # not exist.
+        if (job is None) or (job.owner != self.groupPath):
+            m = {'status': -2, 'message': ['No such job: {0}'.format(data['jobId'])]}
+        else:
+            m = job.to_dict(data.get('start') or 0)
+        retval = to_json(m)
+        return retval
+
+    def process_failure(self, action, data, errors):
+        retval = self.build_error_response(action, data, errors)
+        return retval
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from collections import OrderedDict
+from logging import getLogger
+from Queue import Queue
+from threading import Lock, Thread
+from time import time
+from uuid import uuid4
+from .metrics import record_invite
+log = getLogger('gs.group.member.invite.csv.jobs')
+
+#: The state of a job that is waiting for a worker
+QUEUED = 'queued'
+#: The state of a job where some of the rows have been processed
+RUNNING = 'running'
+#: The state of a job where all of the rows have been processed
+FINISHED = 'finished'
+
+#: The status of a row that could not be invited because of an error
+PROBLEM = -1
+#: The statuses of the rows where someone was invited
+SUCCEEDED = (1, 2)
+#: The statuses of the rows where the person was already a member
+IGNORED = (3, )
+
+
+class InviteJob(object):
+    '''The rows of a CSV file that are being invited in the background
+
+:param str jobId: The identifier for the job.
+:param list rows: The profile data, one dictionary per row.
+:param invite: The callable that invites the person in one row. It is
+               called with the profile, and returns the result as a
+               dictionary with a ``status`` and a ``message``.
+:param str owner: The identifier of the group that the job belongs to.
+:param checkpoint: The :class:`.checkpoint.Checkpoint` for the run. The rows
+                   that it records as complete are skipped, without calling
+                   ``invite``, and the outcome of every other row is
+                   recorded in it.
+
+The results are stored in the same order as the rows, no matter which order
+the workers finish the rows in.'''
+    def __init__(self, jobId, rows, invite, owner='', checkpoint=None):
+        self.jobId = jobId
+        self.rows = rows
+        self.invite = invite
+        self.owner = owner
+        self.checkpoint = checkpoint
+        self.total = len(rows)
+        self.results = [None] * self.total
+        self.done = self.succeeded = self.ignored = self.failed = self.skipped = 0
+        self.lock = Lock()
+
+    @property
+    def state(self):
+        if self.done == self.total:
+            retval = FINISHED
+        elif self.done:
+            retval = RUNNING
+        else:
+            retval = QUEUED
+        return retval
+
+    def run_row(self, i):
+        '''Invite the person in one row, and record the result
+
+:param int i: The index of the row.'''
+        profile = self.rows[i]
+        checkpoint = self.checkpoint
+        if (checkpoint is not None) and (i in checkpoint):
+            self.record(i, checkpoint.result(i, profile), skipped=True)
+        else:
+            t = time()
+            try:
+                result = self.invite(profile)
+            except Exception as e:
+                log.exception('Problem inviting %s', profile.get('email', ''))
+                result = {'status': PROBLEM,
+                          'message': ['Could not invite {0}: {1}'.format(
+                                      profile.get('email', ''), e)]}
+            record_invite(time() - t, result.get('status'))
+            if checkpoint is not None:
+                try:
+                    checkpoint.record(i, result.get('status'))
+                except Exception:
+                    # The row is done, so the job carries on; at worst the
+                    # row is invited again if the run is resumed.
+                    log.exception('Could not record the outcome of row %d', i)
+            self.record(i, result)
+
+    def record(self, i, result, skipped=False):
+        with self.lock:
+            self.results[i] = result
+            self.done += 1
+            if skipped:
+                self.skipped += 1
+            status = result.get('status')
+            if status in SUCCEEDED:
+                self.succeeded += 1
+            elif status in IGNORED:
+                self.ignored += 1
+            else:
+                self.failed += 1
+        # The profile is no longer needed once the row is done.
+        self.rows[i] = None
+
+    def results_from(self, start):
+        '''Get the results of the finished rows, in order
+
+:param int start: The index of the first row.
+:returns: The results from ``start`` up to, but not including, the first
+          row that has yet to be finished.
+:rtype: list'''
+        retval = []
+        with self.lock:
+            for result in self.results[start:]:
+                if result is None:
+                    break
+                retval.append(result)
+        return retval
+
+    def to_dict(self, start=0):
+        '''The progress of the job, for serialising as JSON
+
+:param int start: The index of the first result to include.'''
+        with self.lock:
+            retval = {'jobId': self.jobId, 'state': self.state, 'total': self.total,
+                      'done': self.done, 'succeeded': self.succeeded,
+                      'ignored': self.ignored, 'failed': self.failed,
+                      'skipped': self.skipped, }
+        retval['start'] = start
+        retval['results'] = self.results_from(start)
+        return retval
+
+
+class LocalJobQueue(object):
+    '''An in-process stand-in for a job queue, backed by a pool of threads
+
+:param int workers: The number of worker threads.
+:param int maxJobs: The number of jobs to remember. When there are more the
+                    oldest finished jobs are forgotten.
+
+The rows of every job go onto one queue, which the workers take from, so a
+large job cannot stop a smaller one that was submitted later from
+starting. The workers are daemon threads, started when the first job is
+submitted.'''
+    workers = 4
+    maxJobs = 100
+
+    def __init__(self, workers=None, maxJobs=None):
+        if workers is not None:
+            self.workers = workers
+        if maxJobs is not None:
+            self.maxJobs = maxJobs
+        self.tasks = Queue()
+        self.jobs = OrderedDict()
+        self.lock = Lock()
+        self.threads = []
+
+    def submit(self, rows, invite, owner='', jobId=None, checkpoint=None):
+        '''Submit the rows of a CSV file to be invited in the background
+
+:param list rows: The profile data, one dictionary per row.
+:param invite: The callable that invites the person in one row.
+:param str owner: The identifier of the group that the job belongs to.
+:param str jobId: The identifier for the job. If ``None`` a new identifier
+                  is made up.
+:param checkpoint: The checkpoint for the run, see :class:`InviteJob`.
+:returns: The new job, or the existing job with the same identifier if it
+          is yet to finish.
+:rtype: InviteJob'''
+        with self.lock:
+            retval = self.jobs.get(jobId)
+            isNew = (retval is None) or (retval.state == FINISHED)
+            if isNew:
+                retval = InviteJob(jobId or uuid4().hex, rows, invite, owner, checkpoint)
+                # Removed first so the new job is the newest in the order
+                self.jobs.pop(retval.jobId, None)
+                self.jobs[retval.jobId] = retval
+                self.forget_old_jobs()
+                self.start_workers()
+        if isNew:
+            for i in range(retval.total):
+                self.tasks.put((retval, i))
+        return retval
+
+    def get(self, jobId):
+        '''Get a job
+
+:param str jobId: The identifier of the job.
+:returns: The job, or ``None`` if it is unknown.'''
+        with self.lock:
+            retval = self.jobs.get(jobId)
+        return retval
+
+    def forget_old_jobs(self):
+        excess = len(self.jobs) - self.maxJobs
+        for jobId in [j.jobId for j in self.jobs.values() if j.state == FINISHED][:excess]:
+            del self.jobs[jobId]
+
+    def start_workers(self):
+        while len(self.threads) < self.workers:
+            t = Thread(target=self.work, name='invite-csv-{0}'.format(len(self.threads)))
+            t.daemon = True
+            t.start()
+            self.threads.append(t)
+
+    def work(self):
+        while True:
+            job, i = self.tasks.get()
+            try:
+                job.run_row(i)
+            finally:
+                self.tasks.task_done()
+
+    def join(self):
+        '''Wait for all the submitted rows to be processed'''
+        self.tasks.join()
+
+
+#: The queue that the invitation jobs are submitted to
+jobQueue = LocalJobQueue()
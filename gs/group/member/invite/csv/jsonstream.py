@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import JSONEncoder
+
+#: The number of items that are encoded before a chunk is yielded
+CHUNK_SIZE = 256
+
+
+def iter_json_list(items, chunkSize=CHUNK_SIZE, encoder=None):
+    '''Incrementally encode an iterable as a JSON list
+
+:param items: The items to encode.
+:param int chunkSize: The number of items to put in each chunk.
+:param encoder: The JSON encoder to use. If ``None`` a default
+                :class:`json.JSONEncoder` is used.
+:returns: The JSON list, as a series of strings.
+
+The concatenation of the chunks is the same as encoding the entire list with
+the encoder, but only ``chunkSize`` items are held in memory at once. If an
+item is a :class:`StreamTail` then its value is written as the final item
+of the list, and iteration stops.'''
+    if encoder is None:
+        encoder = JSONEncoder()
+    chunk = ['[']
+    first = True
+    for item in items:
+        tail = isinstance(item, StreamTail)
+        if tail:
+            item = item.value
+        s = encoder.encode(item)
+        chunk.append(s if first else encoder.item_separator + s)
+        first = False
+        if tail:
+            break
+        if len(chunk) >= chunkSize:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append(']')
+    yield ''.join(chunk)
+
+
+class StreamTail(object):
+    '''A final item for :func:`iter_json_list`
+
+:param value: The item to write at the end of the list.
+
+Once the first chunk has been sent it is too late to change the status of
+the response, so an error is written as the final item in the list.'''
+    def __init__(self, value):
+        self.value = value
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from numbers import Integral
+
+#: The maximum number of rows in a CSV file, not counting the header, if the
+#: site does not set its own
+MAX_ROWS = 100000
+#: The property of the ``GlobalConfiguration`` of a site that sets the
+#: maximum number of rows
+MAX_ROWS_PROPERTY = 'inviteCSVMaxRows'
+
+
+def max_rows(context):
+    '''The maximum number of rows in a CSV file, for a site
+
+:param context: The site, or a group in the site.
+:returns: The ``inviteCSVMaxRows`` property of the ``GlobalConfiguration``
+          of the site, or :const:`MAX_ROWS` if it is not set.
+:rtype: int
+
+The parser, the look-up of the existing members, and the background job
+all get the limit from here, so they agree on how large a file can be.'''
+    retval = MAX_ROWS
+    site_root = context.site_root()
+    config = getattr(site_root, 'GlobalConfiguration', None) if site_root else None
+    if config is not None:
+        value = config.getProperty(MAX_ROWS_PROPERTY, None)
+        if isinstance(value, basestring) and value.strip().isdigit():
+            value = int(value)  # A string property
+        if isinstance(value, Integral) and (value > 0):
+            retval = int(value)
+    return retval
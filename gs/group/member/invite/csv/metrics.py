@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from bisect import bisect_left
+from threading import Lock, local
+from time import time
+from zope.interface import implementer
+from .interface import IParseTimingHook
+
+#: The upper bounds of the buckets of the latency histograms, in seconds.
+#: Anything slower goes in one last bucket.
+BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 60, 120)
+#: The percentiles that are reported for each histogram
+PERCENTILES = (50, 90, 99)
+#: The number of minutes of rates that are kept
+MINUTES = 15
+
+
+class Shard(object):
+    '''The metrics recorded by one thread
+
+Only the thread that owns the shard writes to it, so it needs no lock.'''
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.minutes = {}
+
+    def incr(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        h = self.histograms.get(name)
+        if h is None:
+            # The count in each bucket, then the total and the maximum
+            h = self.histograms[name] = [0] * (len(BUCKETS) + 1) + [0.0, 0.0]
+        h[bisect_left(BUCKETS, value)] += 1
+        h[-2] += value
+        if value > h[-1]:
+            h[-1] = value
+
+    def tick(self, name, minute, n=1):
+        m = self.minutes.get(name)
+        if m is None:
+            m = self.minutes[name] = {}
+        if minute not in m:
+            for old in [k for k in m if k <= (minute - MINUTES)]:
+                del m[old]
+        m[minute] = m.get(minute, 0) + n
+
+
+def percentiles(h):
+    '''The percentiles of a histogram
+
+:param list h: The count in each bucket, then the total and the maximum.
+:returns: The ``count``, ``mean`` and ``max``, and the upper bound of the
+          bucket that each of the :const:`PERCENTILES` is in.
+:rtype: dict'''
+    counts = h[:-2]
+    count = sum(counts)
+    retval = {'count': count, 'mean': (h[-2] / count) if count else 0.0, 'max': h[-1]}
+    for p in PERCENTILES:
+        rank = count * p / 100.0
+        seen = 0
+        value = 0.0
+        for i, c in enumerate(counts):
+            seen += c
+            if c and (seen >= rank):
+                value = BUCKETS[i] if i < len(BUCKETS) else h[-1]
+                break
+        retval['p{0}'.format(p)] = value
+    return retval
+
+
+class Metrics(object):
+    '''Counters, histograms and rates, kept in the process
+
+Each thread records its metrics in its own :class:`Shard`, so recording a
+metric is a few dictionary operations, without a lock. The shards are
+merged when the metrics are read (see :meth:`snapshot`).'''
+    #: The clock, which is replaced in the tests
+    clock = staticmethod(time)
+
+    def __init__(self):
+        self.local = local()
+        self.shards = []
+        self.lock = Lock()
+        self.started = self.clock()
+
+    @property
+    def shard(self):
+        '''The shard for the current thread'''
+        try:
+            retval = self.local.shard
+        except AttributeError:
+            retval = self.local.shard = Shard()
+            with self.lock:  # Only once per thread
+                self.shards.append(retval)
+        return retval
+
+    def incr(self, name, n=1):
+        '''Add to a counter'''
+        self.shard.incr(name, n)
+
+    def observe(self, name, value):
+        '''Add a value, such as a latency in seconds, to a histogram'''
+        self.shard.observe(name, value)
+
+    def tick(self, name, n=1):
+        '''Count an event in the current minute, for a rate'''
+        self.shard.tick(name, int(self.clock() // 60), n)
+
+    def snapshot(self):
+        '''Merge the metrics from all the threads
+
+:returns: The ``counters``, the ``latency`` percentiles for each histogram
+          (see :func:`percentiles`), the ``rates`` per minute, and the
+          ``uptime`` in seconds.
+:rtype: dict'''
+        with self.lock:
+            shards = list(self.shards)
+        counters = {}
+        histograms = {}
+        minutes = {}
+        # The shards are copied before they are read, because their threads
+        # may be writing to them. (Copying a dictionary or list holds the
+        # GIL.)
+        for shard in shards:
+            for name, n in shard.counters.copy().items():
+                counters[name] = counters.get(name, 0) + n
+            for name, h in shard.histograms.copy().items():
+                h = list(h)
+                merged = histograms.get(name)
+                if merged is None:
+                    histograms[name] = h
+                else:
+                    histograms[name] = [a + b for a, b in zip(merged[:-1], h[:-1])] \
+                        + [max(merged[-1], h[-1])]
+            for name, m in shard.minutes.copy().items():
+                merged = minutes.setdefault(name, {})
+                for minute, n in m.copy().items():
+                    merged[minute] = merged.get(minute, 0) + n
+        now = self.clock()
+        minute = int(now // 60)
+        rates = {}
+        for name, m in minutes.items():
+            recent = sum(n for k, n in m.items() if (minute - MINUTES) < k < minute)
+            rates[name] = {'lastMinute': m.get(minute - 1, 0),
+                           'average': recent / float(MINUTES - 1), }
+        retval = {'counters': counters,
+                  'latency': dict((name, percentiles(h)) for name, h in histograms.items()),
+                  'rates': rates,
+                  'uptime': now - self.started, }
+        return retval
+
+
+#: The metrics for the package
+metrics = Metrics()
+
+
+def invite_outcome(status):
+    '''The name of the counter for the status of an invitation'''
+    retval = 'status{0}'.format(status) if status in (1, 2, 3) else 'problem'
+    return retval
+
+
+def record_invite(seconds, status, m=None):
+    '''Record the time taken to invite one person, and the outcome
+
+:param float seconds: The time taken.
+:param int status: The status of the invitation.
+:param Metrics m: The metrics, or ``None`` for :data:`metrics`.'''
+    m = metrics if m is None else m
+    m.incr('invites')
+    m.incr(invite_outcome(status))
+    m.observe('invite', seconds)
+    m.tick('invites')
+
+
+@implementer(IParseTimingHook)
+class ParseMetrics(object):
+    '''Record the uploads that are parsed, as a parse-timing hook
+
+:param Metrics m: The metrics, or ``None`` for :data:`metrics`.'''
+    def __init__(self, m=None):
+        self.metrics = metrics if m is None else m
+
+    def __call__(self, timings):
+        m = self.metrics
+        m.incr('uploadsParsed')
+        m.incr('bytesParsed', timings.bytesIn)
+        m.incr('rowsParsed', timings.rowsIn or 0)
+        if timings.decisions.get('cached'):
+            m.incr('uploadsCached')
+        if timings.total is not None:
+            m.observe('parse', timings.total)
+
+
+#: The hook that is registered as a utility
+parseMetrics = ParseMetrics()
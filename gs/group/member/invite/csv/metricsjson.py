@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import dumps as to_json
+from .cache import parseCache
+from .metrics import metrics
+
+
+class InviteMetrics(object):
+    '''The metrics for parsing and inviting, for this process, as JSON
+
+A ``GET`` of this page returns the ``uploads`` (the counters for the files
+that were parsed, and the parse latency), the ``invites`` (the counters for
+the outcome of each invitation, the invite latency, and the invitations per
+minute), and the counters for the ``parseCache``. The latency is in
+seconds.'''
+    metrics = metrics
+    cache = parseCache
+
+    def __init__(self, context, request):
+        self.context = context
+        self.request = request
+
+    def get_metrics(self):
+        s = self.metrics.snapshot()
+        counters = s['counters']
+        uploads = dict((k, counters.get(k, 0))
+                       for k in ('uploadsParsed', 'uploadsCached', 'rowsParsed', 'bytesParsed'))
+        uploads['latency'] = s['latency'].get('parse')
+        invites = {'total': counters.get('invites', 0),
+                   'outcomes': dict((k, counters.get(k, 0))
+                                    for k in ('status1', 'status2', 'status3', 'problem')),
+                   'latency': s['latency'].get('invite'),
+                   'perMinute': s['rates'].get('invites', {'lastMinute': 0, 'average': 0.0}), }
+        retval = {'uploads': uploads, 'invites': invites, 'parseCache': self.cache.stats(),
+                  'uptime': s['uptime'], }
+        return retval
+
+    def __call__(self):
+        self.request.response.setHeader(b'Content-Type', b'application/json')
+        self.request.response.setHeader(b'Cache-Control', b'no-cache')
+        retval = to_json(self.get_metrics())
+        return retval
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from csv import get_dialect, reader as csv_reader
+from itertools import chain
+from logging import getLogger
+from multiprocessing import Pool, cpu_count
+from threading import Lock
+from .unicodereader import decode_row, iter_lines
+log = getLogger('gs.group.member.invite.csv.parallel')
+
+#: The attributes of a CSV dialect, which are sent to the worker processes
+#: rather than the dialect (which may not be picklable)
+DIALECT_PARAMS = ('delimiter', 'doublequote', 'escapechar', 'lineterminator', 'quotechar',
+                  'quoting', 'skipinitialspace', 'strict')
+
+#: The line that is added to the end of each chunk, to check that the chunk
+#: ended at the end of a record
+SENTINEL = b'gs.group.member.invite.csv: end of chunk'
+
+
+def dialect_params(dialect):
+    '''The attributes of a CSV dialect, as a dictionary
+
+:param dialect: The dialect, or the name of a dialect.
+:rtype: dict'''
+    d = get_dialect(dialect) if isinstance(dialect, basestring) else dialect
+    retval = dict((p, getattr(d, p)) for p in DIALECT_PARAMS if hasattr(d, p))
+    return retval
+
+
+def split_records(buf, chunkSize, quotechar=b'"'):
+    '''Find the offsets that split a buffer into chunks of whole records
+
+:param buf: The bytes of the CSV file, or a memory map of the file.
+:param int chunkSize: The smallest size of a chunk.
+:param bytes quotechar: The character that quotes a field, or ``None``.
+:returns: The offset of the start of each chunk, and the end of the buffer.
+:rtype: list
+
+A chunk ends at the first line-feed after ``chunkSize`` bytes where the
+number of quote-characters in the chunk is even, so a line-feed in a quoted
+field does not split a record. The quote-characters are counted a block at a
+time, in C. If no line-feed is found within another ``chunkSize`` bytes then
+the rest of the buffer is one chunk.
+
+This is a guess: a quote-character in the middle of an unquoted field is not
+a quote at all. See :func:`parse_chunk` for how the guess is checked.'''
+    size = len(buf)
+    retval = [0]
+    start = 0
+    while (start + chunkSize) < size:
+        i = start + chunkSize
+        quotes = buf[start:i].count(quotechar) if quotechar else 0
+        limit = min(size, i + chunkSize)
+        end = None
+        while i < limit:
+            nl = buf.find(b'\n', i, limit)
+            if nl == -1:
+                break
+            if quotechar:
+                quotes += buf[i:nl].count(quotechar)
+            if not (quotes % 2):
+                end = nl + 1
+                break
+            i = nl + 1
+        if (end is None) or (end >= size):
+            break
+        retval.append(end)
+        start = end
+    retval.append(size)
+    return retval
+
+
+def parse_chunk(task):
+    '''Parse a chunk of a CSV file, in a worker process
+
+:param tuple task: The bytes of the chunk, the encoding, the dialect
+                   parameters, the number of columns, and whether this is the
+                   last chunk.
+:returns: ``True`` if the chunk ended at the end of a record, and the rows.
+:rtype: tuple
+
+The :const:`SENTINEL` line is added to the end of every chunk but the
+last. If the chunk ended at the end of a record the sentinel is parsed as a
+row of its own. If the chunk ended in the middle of a quoted field then the
+sentinel is swallowed by the field, and the chunk has to be parsed again by
+the caller.'''
+    chunk, encoding, params, length, last = task
+    lines = iter_lines(chunk)
+    if not last:
+        lines = chain(lines, [SENTINEL + b'\n'])
+    rows = [row for row in csv_reader(lines, **params) if row]  # Skip blank lines
+    ok = last or (bool(rows) and (rows.pop() == [SENTINEL]))
+    retval = (ok, [decode_row(row, encoding, length) for row in rows] if ok else [])
+    return retval
+
+
+def iter_rows(buf, start, encoding, params, length):
+    '''Parse the rest of a CSV file, in this process
+
+:param buf: The bytes of the CSV file, or a memory map of the file.
+:param int start: The offset of the start of a record.'''
+    for row in csv_reader(iter_lines(buf, start), **params):
+        if row:
+            yield decode_row(row, encoding, length)
+
+
+class ParallelParser(object):
+    '''Parse a large CSV file in a pool of worker processes
+
+:param int workers: The number of worker processes.
+:param int chunkSize: The number of bytes sent to a worker at a time.
+
+The file is split into chunks at the end of records (see
+:func:`split_records`), and each chunk is parsed by a worker. The rows are
+returned in the same order as the file, so they are the same as the rows
+from the :class:`.unicodereader.DecodingDictReader`. If a chunk turns out
+not to end at the end of a record then the rest of the file is parsed in
+this process.
+
+The file must be in an ASCII-compatible encoding, with the lines ending in
+line-feeds (see :meth:`.unicodereader.UnicodeDictReader.can_split_bytes`).'''
+    chunkSize = 1024 * 1024
+
+    def __init__(self, workers=None, chunkSize=None):
+        if workers is None:
+            try:
+                workers = cpu_count()
+            except NotImplementedError:
+                workers = 1
+        self.workers = workers
+        if chunkSize is not None:
+            self.chunkSize = chunkSize
+        self._pool = None
+        self.lock = Lock()
+
+    @property
+    def pool(self):
+        '''The pool of workers, which is started when it is first used'''
+        if self._pool is None:
+            with self.lock:
+                if self._pool is None:
+                    self._pool = Pool(self.workers)
+        return self._pool
+
+    def close(self):
+        with self.lock:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool.join()
+                self._pool = None
+
+    def iter_values(self, buf, encoding, dialect, length):
+        '''Iterate the rows of a CSV file, including the header, as tuples
+
+:param buf: The bytes of the CSV file, or a memory map of the file.
+:param str encoding: The encoding of the file.
+:param dialect: The CSV dialect.
+:param int length: The number of columns.'''
+        params = dialect_params(dialect)
+        offsets = split_records(buf, self.chunkSize, params.get('quotechar'))
+        size = len(buf)
+        # The chunks are copied out of the buffer as the workers need them.
+        tasks = ((buf[s:e], encoding, params, length, e == size)
+                 for s, e in zip(offsets, offsets[1:]))
+        for i, (ok, rows) in enumerate(self.pool.imap(parse_chunk, tasks)):
+            if not ok:
+                log.info('Chunk %d did not end at the end of a record; parsing the rest of '
+                         'the file in one process', i)
+                for row in iter_rows(buf, offsets[i], encoding, params, length):
+                    yield row
+                break
+            for row in rows:
+                yield row
+
+
+#: The parser that is shared by the requests
+parallelParser = ParallelParser()
@@ -13,6 +13,7 @@
 #
 ############################################################################
 from __future__ import absolute_import, unicode_literals
+from threading import Lock
 from zope.app.apidoc.interface import getFieldsInOrder
 from zope.cachedescriptors.property import Lazy
 from zope.interface.common.mapping import IEnumerableMapping
@@ -24,6 +25,60 @@ from Products.XWFCore.odict import ODict
 from .error import GlobalConfigError, ProfileNotFound
 
 
+class ProfileSchema(object):
+    '''The profile attributes from a profile interface, worked out once
+
+:param schema: The profile interface.
+
+The properties, the vocabulary terms, and which properties are required are
+the same for every group that uses the interface, so they are built once
+and shared (see :func:`get_profile_schema`). They must not be changed.'''
+    def __init__(self, schema):
+        self.schema = schema
+        self.properties = ODict()
+        self.properties['email'] = EmailAddress(
+            title='Email',
+            description='The email address of the new member')
+        for name, field in getFieldsInOrder(schema):
+            self.properties[unicode(name)] = field
+        assert self.properties
+        #: The vocabulary terms, in order
+        self.terms = tuple(SimpleTerm(p, p, f.title) for p, f in self.properties.items())
+        #: The vocabulary terms, by token
+        self.termsByToken = {t.token: t for t in self.terms}
+        #: The terms for the required properties, in order
+        self.required = tuple(t for t in self.terms if self.properties[t.token].required)
+        #: The terms for the optional properties, in order
+        self.optional = tuple(t for t in self.terms
+                              if not self.properties[t.token].required)
+
+
+#: The profile schemas, by the name of the profile interface
+profileSchemaCache = {}
+profileSchemaLock = Lock()
+
+
+def get_profile_schema(schemaName):
+    '''Get the profile attributes for a profile interface
+
+:param str schemaName: The name of the interface in
+                       :mod:`Products.GSProfile.interfaces`.
+:returns: The profile attributes, from the cache if possible.
+:rtype: ProfileSchema
+
+The schema is rebuilt if the interface with the name has been replaced. A
+site that changes its ``profileInterface`` gets the schema for the new name.'''
+    schema = getattr(profileSchemas, schemaName)
+    retval = profileSchemaCache.get(schemaName)
+    if (retval is None) or (retval.schema is not schema):
+        with profileSchemaLock:
+            retval = profileSchemaCache.get(schemaName)
+            if (retval is None) or (retval.schema is not schema):
+                retval = ProfileSchema(schema)
+                profileSchemaCache[schemaName] = retval
+    return retval
+
+
 class ProfileList(object):
     __used_for__ = IEnumerableMapping
 
@@ -32,22 +87,30 @@ class ProfileList(object):
             raise ValueError('There is no context')
         self.context = context
 
+    @Lazy
+    def profileSchema(self):
+        retval = get_profile_schema(self.profileSchemaName)
+        return retval
+
     @Lazy
     def properties(self):
-        retval = ODict()
-        retval['email'] = EmailAddress(
-            title='Email',
-            description='The email address of the new member')
-        ifs = getFieldsInOrder(self.schema)
-        for interface in ifs:
-            key = unicode(interface[0])
-            retval[key] = interface[1]
+        retval = self.profileSchema.properties
         assert isinstance(retval, ODict)
         assert retval
         return retval
 
+    @property
+    def required(self):
+        'The terms for the required properties'
+        return self.profileSchema.required
+
+    @property
+    def optional(self):
+        'The terms for the optional properties'
+        return self.profileSchema.optional
+
     def property_to_token(self, p):
-        retval = SimpleTerm(p, p, self.properties[p].title)
+        retval = self.profileSchema.termsByToken[p]
         return retval
 
     @Lazy
@@ -71,14 +134,11 @@ class ProfileList(object):
 
     @Lazy
     def schema(self):
-        return getattr(profileSchemas, self.profileSchemaName)
+        return self.profileSchema.schema
 
     def __iter__(self):
         """See zope.schema.interfaces.IIterableVocabulary"""
-        for p in list(self.properties.keys()):
-            retval = self.property_to_token(p)
-            assert retval
-            yield retval
+        return iter(self.profileSchema.terms)
 
     def __len__(self):
         """See zope.schema.interfaces.IIterableVocabulary"""
@@ -100,9 +160,8 @@ class ProfileList(object):
 
     def getTermByToken(self, token):
         """See zope.schema.interfaces.IVocabularyTokenized"""
-        for p in self.properties.keys():
-            if p == token:
-                retval = self.property_to_token(p)
-                assert retval
-                return retval
-        raise LookupError(token)
+        try:
+            retval = self.profileSchema.termsByToken[token]
+        except (KeyError, TypeError):
+            raise LookupError(token)
+        return retval
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+import sqlalchemy as sa
+import transaction
+from zope.sqlalchemy import mark_changed
+from gs.database import getTable, getSession
+
+
+class CheckpointQuery(object):
+    '''Store the checkpoints for the runs in the ``invite_csv_run`` table'''
+    def __init__(self):
+        self.runTable = getTable('invite_csv_run')
+
+    def load(self, runId):
+        '''Get the checkpoint for a run
+
+:param str runId: The identifier for the run.
+:returns: The ``outcomes`` and ``last_row`` for the run, or ``None`` if there
+          is no checkpoint.
+:rtype: dict'''
+        rt = self.runTable
+        s = sa.select([rt.c.outcomes, rt.c.last_row])
+        s.append_whereclause(rt.c.run_id == runId)
+
+        session = getSession()
+        r = session.execute(s).fetchone()
+        retval = None
+        if r:
+            retval = {'outcomes': r['outcomes'], 'last_row': r['last_row']}
+        return retval
+
+    def create(self, runId, owner, outcomes):
+        '''Record the start of a run
+
+:param str runId: The identifier for the run.
+:param str owner: The path to the group.
+:param str outcomes: The outcome of each row.
+
+This is called from a worker thread, before the first outcome is recorded
+(see :meth:`.checkpoint.Checkpoint.save`), so the change is committed in
+the transaction of the worker thread, like :meth:`set_outcome`.'''
+        i = self.runTable.insert()
+        with transaction.manager:
+            session = getSession()
+            session.execute(i, params={'run_id': runId, 'owner': owner, 'outcomes': outcomes})
+            mark_changed(session)
+
+    def restart(self, runId, outcomes):
+        '''Start a run that has finished again
+
+:param str runId: The identifier for the run.
+:param str outcomes: The outcome of each row.
+
+Like :meth:`create` this is called from a worker thread, and the change is
+committed in the transaction of the worker thread.'''
+        rt = self.runTable
+        u = rt.update(rt.c.run_id == runId).values(
+            outcomes=outcomes, last_row=-1, started=sa.func.now(), updated=sa.func.now())
+        with transaction.manager:
+            session = getSession()
+            session.execute(u)
+            mark_changed(session)
+
+    def set_outcome(self, runId, i, outcome):
+        '''Record the outcome of one row
+
+:param str runId: The identifier for the run.
+:param int i: The index of the row.
+:param str outcome: The outcome of the row, as one character.
+
+This is called from the worker threads after the row has been committed,
+so the change is committed in its own transaction. (The transaction manager
+is per-thread, so this must not be called from a request: it would commit
+the transaction of the request part way through.) The character is
+replaced in the database, rather than writing all the outcomes, so the
+workers do not overwrite each other.'''
+        rt = self.runTable
+        u = rt.update(rt.c.run_id == runId).values(
+            outcomes=(sa.func.substr(rt.c.outcomes, 1, i) + outcome
+                      + sa.func.substr(rt.c.outcomes, i + 2)),
+            last_row=sa.func.greatest(rt.c.last_row, i),
+            updated=sa.func.now())
+        with transaction.manager:
+            session = getSession()
+            session.execute(u)
+            mark_changed(session)
+
+
+class UserEmailQuery(object):
+    '''Look up the people on the site by email address'''
+    def __init__(self):
+        self.emailTable = getTable('user_email')
+
+    def user_ids(self, addresses):
+        '''Get the people with some email addresses
+
+:param list addresses: The email addresses, in lower case.
+:returns: The user identifiers, by email address in lower case.
+:rtype: dict
+
+All the addresses are looked up with one query.'''
+        retval = {}
+        if addresses:
+            et = self.emailTable
+            s = sa.select([et.c.user_id, sa.func.lower(et.c.email).label('email')])
+            s.append_whereclause(sa.func.lower(et.c.email).in_(addresses))
+
+            session = getSession()
+            r = session.execute(s)
+            retval = dict((row['email'], row['user_id']) for row in r)
+        return retval
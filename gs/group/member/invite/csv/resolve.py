@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import dumps as to_json, loads
+from zope.cachedescriptors.property import Lazy
+from zope.formlib import form as formlib
+from gs.content.form.api.json import GroupEndpoint
+from gs.group.member.base import get_group_userids
+from .dedup import normalise_email
+from .interface import IResolveRows
+from .limits import max_rows
+from .queries import UserEmailQuery
+
+#: The person in the row does not have a profile on the site
+NEW_USER = 'new'
+#: The person has a profile, but is not a member of the group
+EXISTING_USER = 'user'
+#: The person is already a member of the group
+EXISTING_MEMBER = 'member'
+
+
+class GroupDirectory(object):
+    '''Look up the people on the site, and the members of a group
+
+:param context: The group.
+
+The people are looked up by email address in batches, rather than one
+address at a time, and the members of the group are looked up once.'''
+    def __init__(self, context):
+        self.context = context
+
+    @Lazy
+    def query(self):
+        retval = UserEmailQuery()
+        return retval
+
+    def user_ids(self, addresses):
+        '''Get the people with some email addresses
+
+:param list addresses: The normalised email addresses.
+:returns: The user identifiers, by normalised email address. The addresses
+          that no one has are missing.
+:rtype: dict'''
+        retval = self.query.user_ids(addresses)
+        return retval
+
+    def member_ids(self):
+        '''Get the members of the group
+
+:returns: The user identifiers of the members.
+:rtype: set'''
+        retval = set(get_group_userids(self.context, self.context.getId()))
+        return retval
+
+
+class LocalDirectory(object):
+    '''A directory of people that is held in memory, for testing
+
+:param dict users: The user identifiers, by email address.
+:param members: The user identifiers of the members of the group.
+
+The number of calls to :meth:`user_ids` is counted in ``lookups``.'''
+    def __init__(self, users=None, members=()):
+        self.users = dict((normalise_email(k), v) for k, v in (users or {}).items())
+        self.members = set(members)
+        self.lookups = 0
+
+    def user_ids(self, addresses):
+        self.lookups += 1
+        retval = dict((a, self.users[a]) for a in addresses if a in self.users)
+        return retval
+
+    def member_ids(self):
+        return set(self.members)
+
+
+class Resolver(object):
+    '''Work out who in a list of email addresses is new, who has a profile,
+and who is already a member of the group
+
+:param directory: The people on the site, such as a :class:`GroupDirectory`.
+:param int batchSize: The number of addresses to look up at once.'''
+    batchSize = 1000
+
+    def __init__(self, directory, batchSize=None):
+        self.directory = directory
+        if batchSize is not None:
+            self.batchSize = batchSize
+
+    def user_ids(self, addresses):
+        '''Look up the people with some addresses, one batch at a time'''
+        unique = sorted(set(addresses))
+        retval = {}
+        for i in range(0, len(unique), self.batchSize):
+            retval.update(self.directory.user_ids(unique[i:i + self.batchSize]))
+        return retval
+
+    def resolve(self, emails):
+        '''Tag each email address
+
+:param list emails: The email address from each row.
+:returns: The tag for each row (:const:`NEW_USER`, :const:`EXISTING_USER`,
+          or :const:`EXISTING_MEMBER`) and the user identifier for each row
+          (``None`` for a new user), in the same order as the addresses.
+:rtype: tuple'''
+        addresses = [normalise_email(e or '') for e in emails]
+        userIds = self.user_ids([a for a in addresses if a])
+        memberIds = self.directory.member_ids() if userIds else set()
+        tags = []
+        ids = []
+        for a in addresses:
+            userId = userIds.get(a)
+            if userId is None:
+                tags.append(NEW_USER)
+            elif userId in memberIds:
+                tags.append(EXISTING_MEMBER)
+            else:
+                tags.append(EXISTING_USER)
+            ids.append(userId)
+        retval = (tags, ids)
+        return retval
+
+
+class ResolveRows(GroupEndpoint):
+    '''Tag the email addresses from a CSV file before anyone is invited
+
+The response has the tag for each address, in the same order as the
+addresses, so the inviter can skip the people that are already members.'''
+    label = 'POST a list of email addresses to this URL to find the existing people.'
+
+    def __init__(self, group, request):
+        super(ResolveRows, self).__init__(group, request)
+
+    @Lazy
+    def maxRows(self):
+        '''The maximum number of addresses that can be sent in one request, which
+is the maximum number of rows in a file (see :func:`.limits.max_rows`)'''
+        retval = max_rows(self.context)
+        return retval
+
+    @Lazy
+    def form_fields(self):
+        retval = formlib.Fields(IResolveRows, render_context=False)
+        assert retval
+        return retval
+
+    @Lazy
+    def resolver(self):
+        retval = Resolver(GroupDirectory(self.context))
+        return retval
+
+    @formlib.action(label='Submit', prefix='', failure='process_failure')
+    def process_success(self, action, data):
+        return self.actual_process(data)
+
+    def actual_process(self, data):
+        try:
+            emails = loads(data['emails'])
+        except ValueError as e:
+            m = {'status': -2, 'message': ['The addresses are not valid JSON.', str(e)]}
+        else:
+            if ((not isinstance(emails, list))
+                    or not all(isinstance(e, basestring) for e in emails)):
+                m = {'status': -2, 'message': ['The addresses are not a list of strings.']}
+            elif len(emails) > self.maxRows:
+                msg = 'Too many addresses: {0} were sent, but the maximum is {1}.'
+                m = {'status': -3, 'message': [msg.format(len(emails), self.maxRows)]}
+            else:
+                tags, userIds = self.resolver.resolve(emails)
+                m = {'tags': tags, 'userIds': userIds,
+                     'counts': dict((t, tags.count(t))
+                                    for t in (NEW_USER, EXISTING_USER, EXISTING_MEMBER))}
+        retval = to_json(m)
+        return retval
+
+    def process_failure(self, action, data, errors):
+        retval = self.build_error_response(action, data, errors)
+        return retval
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import JSONEncoder
+from .jsonstream import iter_json_list, StreamTail
+
+#: The separators for the compact JSON format, without the spaces
+COMPACT_SEPARATORS = (',', ':')
+
+
+def iter_rows_json(columns, rows, compact=False, extra=None):
+    '''Incrementally encode rows of profile data as JSON
+
+:param list columns: The profile-attribute identifiers.
+:param rows: The rows, each a tuple of values in the same order as the
+             columns. The last item may be a :class:`.jsonstream.StreamTail`.
+:param bool compact: If ``True`` then the compact format is used.
+:param extra: A callable that returns a dictionary of other members to add
+              to the compact format, after the rows. It is called once all
+              the rows have been encoded.
+:returns: The JSON, as a series of strings.
+
+The normal format is a list of objects, one per profile. The compact format
+is an object with the ``columns`` as a list, and the ``rows`` as a list of
+lists, without the spaces after the separators::
+
+    {"columns":["fn","email"],"rows":[["Member","member@example.com"]]}
+'''
+    if compact:
+        encoder = JSONEncoder(separators=COMPACT_SEPARATORS)
+        yield '{"columns":' + encoder.encode(list(columns)) + ',"rows":'
+        for chunk in iter_json_list(rows, encoder=encoder):
+            yield chunk
+        if extra is not None:
+            for k, v in sorted(extra().items()):
+                yield ',' + encoder.encode(k) + ':' + encoder.encode(v)
+        yield '}'
+    else:
+        profiles = (r if isinstance(r, StreamTail) else dict(zip(columns, r)) for r in rows)
+        for chunk in iter_json_list(profiles):
+            yield chunk
+
+
+class ProfileRows(object):
+    '''A compact list of profiles
+
+:param list columns: The profile-attribute identifiers, in the same order as
+                     the values in each row.
+
+Each row is stored as a tuple of values, and every row shares the one list
+of columns, rather than each profile being a dictionary with its own
+keys. Iterating the rows produces the dictionaries, one at a time, so they
+only exist at the point the profiles are serialised.'''
+    __slots__ = ('columns', 'rows')
+
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+        self.rows = []
+
+    def append(self, values):
+        '''Add a row
+
+:param values: The values in the row, in the same order as the columns.'''
+        if len(values) != len(self.columns):
+            m = 'Expected {0} values, got {1}'
+            raise ValueError(m.format(len(self.columns), len(values)))
+        self.rows.append(tuple(values))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        retval = dict(zip(self.columns, self.rows[i]))
+        return retval
+
+    def __iter__(self):
+        columns = self.columns
+        for row in self.rows:
+            yield dict(zip(columns, row))
+
+    def to_data(self, compact=False, extra=None):
+        '''Get the rows as data that can be serialised as JSON
+
+:param bool compact: If ``True`` the compact format is used.
+:param dict extra: Other members to add to the compact format.
+:returns: The rows, in the same format as :meth:`to_json`.'''
+        if compact:
+            retval = {'columns': list(self.columns), 'rows': self.rows}
+            retval.update(extra or {})
+        else:
+            retval = list(self)
+        return retval
+
+    def to_json(self, compact=False, extra=None):
+        '''Serialise the rows as JSON
+
+:param bool compact: If ``True`` the compact format is used, otherwise the rows
+                     are a list of objects.
+:param dict extra: Other members to add to the compact format.
+:returns: The JSON. See :func:`iter_rows_json` for the formats.'''
+        extraMembers = (lambda: extra) if extra else None
+        retval = ''.join(iter_rows_json(self.columns, self.rows, compact, extraMembers))
+        return retval
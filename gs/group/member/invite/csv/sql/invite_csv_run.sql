@@ -0,0 +1,21 @@
+SET CLIENT_ENCODING = 'UTF8';
+SET CLIENT_MIN_MESSAGES = WARNING;
+
+CREATE TABLE invite_csv_run (
+    run_id               TEXT                        PRIMARY KEY,
+    owner                TEXT                        NOT NULL,
+    outcomes             TEXT                        NOT NULL,
+    last_row             INTEGER                     NOT NULL DEFAULT -1,
+    started              TIMESTAMP WITH TIME ZONE    NOT NULL DEFAULT NOW(),
+    updated              TIMESTAMP WITH TIME ZONE    NOT NULL DEFAULT NOW()
+);
+
+-- RUN_ID is the SHA-1 of the path to the group and the rows of the CSV,
+--    so uploading the same file to the same group gives the same run.
+--    Once every row is complete the run is started again, from the
+--    beginning, if the same file is uploaded.
+-- OWNER is the path to the group.
+-- OUTCOMES has one character per row: "-" if the row is yet to be
+--    invited, "1" or "2" if the person was invited, "3" if the person
+--    was already a member, and "x" if there was a problem.
+-- LAST_ROW is the index of the last row to be committed.
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from errno import EEXIST, ENOENT
+from fcntl import flock, LOCK_EX, LOCK_UN
+from hashlib import sha1
+from logging import getLogger
+import os
+from re import compile as re_compile
+from tempfile import gettempdir
+from time import time
+log = getLogger('gs.group.member.invite.csv.staging')
+
+#: The identifiers that the browser can give an upload
+UPLOAD_ID = re_compile(r'^[A-Za-z0-9_-]{8,64}$')
+#: The number of seconds an upload is kept after the last chunk was written
+MAX_AGE = 6 * 60 * 60
+
+
+def valid_upload_id(uploadId):
+    retval = bool(UPLOAD_ID.match(uploadId))
+    return retval
+
+
+class ChunkOffsetError(ValueError):
+    '''A chunk starts after the end of the bytes that have been received'''
+    def __init__(self, offset, received):
+        m = 'The chunk starts at {0}, but only {1} bytes have been received.'
+        super(ChunkOffsetError, self).__init__(m.format(offset, received))
+        self.offset = offset
+        self.received = received
+
+
+class UploadStaging(object):
+    '''The files that are being uploaded in chunks
+
+:param str directory: The directory that holds the files, or ``None`` for a
+                      directory in the temporary directory. Every Zope
+                      instance that answers the requests must share it.
+:param int maxAge: The number of seconds to keep a file for, after the last
+                   chunk was written to it.
+
+Each file is keyed by an owner (the group or site that it is uploaded to)
+and an identifier that the browser picks, so one file is uploaded to
+one place. A chunk is appended while the file is locked, so the chunks from
+two requests are never interleaved.'''
+    def __init__(self, directory=None, maxAge=MAX_AGE):
+        if directory is None:
+            directory = os.path.join(gettempdir(), 'gs-group-member-invite-csv-uploads')
+        self.directory = directory
+        self.maxAge = maxAge
+
+    def path(self, owner, uploadId):
+        '''The path to the file for an upload'''
+        key = sha1('{0}\0{1}'.format(owner, uploadId).encode('utf-8')).hexdigest()
+        retval = os.path.join(self.directory, key)
+        return retval
+
+    def received(self, owner, uploadId):
+        '''The number of bytes of an upload that have been received'''
+        try:
+            retval = os.path.getsize(self.path(owner, uploadId))
+        except OSError as e:
+            if e.errno != ENOENT:
+                raise
+            retval = 0
+        return retval
+
+    def append(self, owner, uploadId, offset, chunk):
+        '''Add a chunk to the end of an upload
+
+:param str owner: The path to the group or site.
+:param str uploadId: The identifier that the browser gave the upload.
+:param int offset: The offset of the start of the chunk in the file.
+:param bytes chunk: The chunk.
+:returns: The number of bytes of the upload that have been received.
+:raises ChunkOffsetError: The chunk starts after the end of the upload.
+
+The part of a chunk that has already been received (because the response
+to a request was lost, and the request was sent again) is skipped.'''
+        self.make_directory()
+        with open(self.path(owner, uploadId), 'ab') as f:
+            flock(f, LOCK_EX)
+            try:
+                f.seek(0, 2)
+                received = f.tell()
+                if offset > received:
+                    raise ChunkOffsetError(offset, received)
+                data = chunk[received - offset:]
+                if data:
+                    f.write(data)
+                    f.flush()
+                retval = received + len(data)
+            finally:
+                flock(f, LOCK_UN)
+        return retval
+
+    def open(self, owner, uploadId):
+        '''Open an upload, to read it'''
+        retval = open(self.path(owner, uploadId), 'rb')
+        return retval
+
+    def make_directory(self):
+        try:
+            os.makedirs(self.directory, 0o700)
+        except OSError as e:
+            if e.errno != EEXIST:
+                raise
+
+    def clean(self, now=None):
+        '''Remove the uploads that have not been written to for :attr:`maxAge`
+
+:returns: The number of uploads that were removed.'''
+        now = time() if now is None else now
+        retval = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError as e:
+            if e.errno != ENOENT:
+                raise
+            names = []
+        for name in names:
+            p = os.path.join(self.directory, name)
+            try:
+                if (now - os.path.getmtime(p)) > self.maxAge:
+                    os.unlink(p)
+                    retval += 1
+            except OSError:  # Removed by another process
+                pass
+        if retval:
+            log.info('Removed %d old uploads from %s', retval, self.directory)
+        return retval
+
+
+#: The uploads that are shared by the requests
+uploadStaging = UploadStaging()
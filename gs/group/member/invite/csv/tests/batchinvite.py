@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import dumps as to_json, loads
+from mock import MagicMock, patch
+from unittest import TestCase
+from gs.group.member.invite.csv.batchinvite import (BatchInvite, RowInviter, PROBLEM)
+
+
+class TestBatchInvite(TestCase):
+    'Test inviting several people at once'
+
+    def setUp(self):
+        self.data = {'subject': 'Invitation', 'message': 'Please join',
+                     'fromAddr': 'admin@example.com', 'delivery': 'email'}
+
+    def batch_invite(self, inviteResults):
+        retval = BatchInvite(MagicMock(), MagicMock())
+        retval.inviter = MagicMock()
+        retval.inviter.invite.side_effect = inviteResults
+        return retval
+
+    def test_results(self):
+        'Test that there is a result for each row, in order'
+        profiles = [{'email': 'a@example.com'}, {'email': 'b@example.com'}]
+        self.data['rows'] = to_json(profiles)
+        results = [{'status': 1, 'message': ['a']}, {'status': 3, 'message': ['b']}]
+        batchInvite = self.batch_invite(results)
+
+        r = loads(batchInvite.actual_process(self.data))
+
+        self.assertEqual(results, r)
+        args = batchInvite.inviter.invite.call_args_list[1][0]
+        self.assertEqual(({'email': 'b@example.com'}, 'Invitation', 'Please join',
+                          'admin@example.com', 'email'), args)
+
+    @patch('gs.group.member.invite.csv.batchinvite.transaction')
+    def test_problem(self, mockTransaction):
+        'Test that a problem with one row does not stop the others'
+        profiles = [{'email': 'a@example.com'}, {'email': 'b@example.com'}]
+        self.data['rows'] = to_json(profiles)
+        batchInvite = self.batch_invite([ValueError('Oops'), {'status': 1, 'message': ['b']}])
+
+        r = loads(batchInvite.actual_process(self.data))
+
+        self.assertEqual(PROBLEM, r[0]['status'])
+        self.assertEqual(1, r[1]['status'])
+        savepoint = mockTransaction.savepoint.return_value
+        self.assertEqual(1, savepoint.rollback.call_count)
+
+    def test_bad_json(self):
+        'Test that rows that are not JSON are an error'
+        self.data['rows'] = '[{'
+        r = loads(self.batch_invite([]).actual_process(self.data))
+        self.assertEqual(-2, r['status'])
+
+    def test_too_many(self):
+        'Test that too many rows are an error'
+        self.data['rows'] = to_json([{'email': 'a@example.com'}] * 3)
+        batchInvite = self.batch_invite([])
+        batchInvite.maxRows = 2
+
+        r = loads(batchInvite.actual_process(self.data))
+
+        self.assertEqual(-3, r['status'])
+        self.assertFalse(batchInvite.inviter.invite.called)
+
+
+class TestRowInviter(TestCase):
+    'Test inviting one row using the single-invitation page'
+
+    @patch('gs.group.member.invite.csv.batchinvite.getMultiAdapter')
+    def test_invite(self, mockGetMultiAdapter):
+        'Test that the form is set for the page, and then put back'
+        mockRequest = MagicMock()
+        mockRequest.form = {'rows': '[]'}
+        seen = {}
+
+        def page():
+            seen.update(mockRequest.form)
+            return '{"status": 2, "message": ["Invited"]}'
+        mockGetMultiAdapter.return_value = page
+        inviter = RowInviter(MagicMock(), mockRequest)
+
+        r = inviter.invite({'email': 'a@example.com', 'fn': 'A'}, 'Invitation',
+                           'Please join', 'admin@example.com', 'web')
+
+        self.assertEqual(2, r['status'])
+        self.assertEqual('a@example.com', seen['toAddr'])
+        self.assertNotIn('email', seen)
+        self.assertEqual('web', seen['delivery'])
+        self.assertEqual({'rows': '[]'}, mockRequest.form)
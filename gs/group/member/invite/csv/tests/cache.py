@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from unittest import TestCase
+from gs.group.member.invite.csv.cache import ParseCache, parse_key
+
+
+class TestParseCache(TestCase):
+    'Test the cache of the responses from the parser'
+
+    def setUp(self):
+        self.now = 1000.0
+        self.cache = ParseCache(maxBytes=10, maxEntries=3, maxAge=60)
+        self.cache.clock = lambda: self.now
+
+    def test_key(self):
+        'Test that the key depends on the content, columns and options'
+        k = parse_key(b'a,b', ['fn', 'email'], True)
+        self.assertEqual(k, parse_key(b'a,b', ['fn', 'email'], True))
+        self.assertNotEqual(k, parse_key(b'a,c', ['fn', 'email'], True))
+        self.assertNotEqual(k, parse_key(b'a,b', ['email', 'fn'], True))
+        self.assertNotEqual(k, parse_key(b'a,b', ['fn', 'email'], False))
+
+    def test_hit_miss(self):
+        'Test the hit and miss counters'
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.set('a', b'1')
+        self.assertEqual(b'1', self.cache.get('a'))
+
+        s = self.cache.stats()
+        self.assertEqual(1, s['hits'])
+        self.assertEqual(1, s['misses'])
+        self.assertEqual(1, s['entries'])
+        self.assertEqual(1, s['size'])
+
+    def test_lru_entries(self):
+        'Test that the least recently used response is evicted'
+        for k in 'abc':
+            self.cache.set(k, b'1')
+        self.cache.get('a')
+        self.cache.set('d', b'1')
+
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(b'1', self.cache.get('a'))
+        self.assertEqual(1, self.cache.stats()['evictions'])
+
+    def test_size(self):
+        'Test that responses are evicted to keep the cache small enough'
+        self.cache.set('a', b'12345')
+        self.cache.set('b', b'123456')
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(6, self.cache.stats()['size'])
+
+    def test_too_big(self):
+        'Test that a response that is too big is not cached'
+        self.cache.maxEntryBytes = 4
+        self.assertFalse(self.cache.set('a', b'12345'))
+        self.assertIsNone(self.cache.get('a'))
+
+    def test_age(self):
+        'Test that an old response is dropped'
+        self.cache.set('a', b'1')
+        self.now += 61
+
+        self.assertIsNone(self.cache.get('a'))
+        s = self.cache.stats()
+        self.assertEqual(0, s['entries'])
+        self.assertEqual(0, s['size'])
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from unittest import TestCase
+from gs.group.member.invite.csv.checkpoint import (Checkpoint, LocalCheckpointStore, run_id)
+from gs.group.member.invite.csv.jobs import InviteJob
+
+
+class TestCheckpoint(TestCase):
+    'Test recording how far a run has got'
+
+    def setUp(self):
+        self.store = LocalCheckpointStore()
+        self.rows = [{'email': 'a@example.com'}, {'email': 'b@example.com'},
+                     {'email': 'c@example.com'}]
+
+    def test_run_id(self):
+        'Test that the same rows in the same group are the same run'
+        self.assertEqual(run_id('/g', self.rows), run_id('/g', list(self.rows)))
+        self.assertNotEqual(run_id('/g', self.rows), run_id('/h', self.rows))
+        self.assertNotEqual(run_id('/g', self.rows), run_id('/g', self.rows[:2]))
+
+    def test_new(self):
+        'Test that a new run is pending, and is stored with the first outcome'
+        checkpoint = Checkpoint.load(self.store, 'r', '/g', 3)
+
+        self.assertEqual(0, checkpoint.completed)
+        self.assertNotIn(0, checkpoint)
+        self.assertNotIn('r', self.store.runs)
+        checkpoint.record(1, 2)
+        self.assertEqual('-2-', self.store.runs['r']['outcomes'])
+        self.assertEqual('/g', self.store.runs['r']['owner'])
+
+    def test_record(self):
+        'Test that the outcomes are stored, and failures are not complete'
+        checkpoint = Checkpoint.load(self.store, 'r', '/g', 3)
+        checkpoint.record(2, 3)
+        checkpoint.record(0, -4)
+
+        self.assertIn(2, checkpoint)
+        self.assertNotIn(0, checkpoint)
+        self.assertEqual('x-3', self.store.runs['r']['outcomes'])
+        self.assertEqual(2, self.store.runs['r']['last_row'])
+
+    def test_resume(self):
+        'Test that resuming a run skips the completed rows'
+        first = Checkpoint.load(self.store, 'r', '/g', 3)
+        first.record(0, 2)
+        first.record(1, -1)
+        invited = []
+
+        def invite(profile):
+            invited.append(profile['email'])
+            return {'status': 2, 'message': [profile['email']]}
+        checkpoint = Checkpoint.load(self.store, 'r', '/g', 3)
+        job = InviteJob('r', list(self.rows), invite, checkpoint=checkpoint)
+        for i in range(3):
+            job.run_row(i)
+
+        self.assertEqual(['b@example.com', 'c@example.com'], invited)
+        self.assertEqual(1, job.skipped)
+        self.assertEqual(3, job.succeeded)
+        self.assertEqual(2, job.results[0]['status'])
+        self.assertEqual('222', self.store.runs['r']['outcomes'])
+
+    def test_restart_finished(self):
+        'Test that a run where every row is complete is started again'
+        first = Checkpoint.load(self.store, 'r', '/g', 3)
+        for i in range(3):
+            first.record(i, 2)
+        self.assertTrue(first.finished)
+        checkpoint = Checkpoint.load(self.store, 'r', '/g', 3)
+
+        self.assertEqual(0, checkpoint.completed)
+        self.assertEqual('222', self.store.runs['r']['outcomes'])
+        checkpoint.record(1, -4)
+        self.assertEqual('-x-', self.store.runs['r']['outcomes'])
+        self.assertEqual(1, self.store.runs['r']['last_row'])
+
+    def test_wrong_length(self):
+        'Test that a checkpoint for a different number of rows is an error'
+        with self.assertRaises(ValueError):
+            Checkpoint('r', 2, '---')
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import loads
+import os
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+from unittest import TestCase
+from mock import MagicMock
+from gs.group.member.invite.csv.cache import ParseCache
+from gs.group.member.invite.csv.chunked import ChunkedCSV2JSON
+from gs.group.member.invite.csv.staging import (
+    ChunkOffsetError, UploadStaging, valid_upload_id)
+
+
+class TestChunkedUpload(TestCase):
+    'Test uploading a CSV file in chunks'
+    csv = b'Name,Email\nA,a@example.com\nB,b@example.com\n'
+    uploadId = 'a1b2c3d4e5f6'
+
+    def setUp(self):
+        self.directory = mkdtemp()
+        self.staging = UploadStaging(self.directory)
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def chunked(self, context=None):
+        if context is None:
+            context = MagicMock()
+            context.getPhysicalPath.return_value = ('', 'groups', 'example')
+        retval = ChunkedCSV2JSON(context, MagicMock())
+        retval.staging = self.staging
+        retval.cache = ParseCache(maxEntryBytes=0)
+        return retval
+
+    def send(self, offset, chunk, context=None):
+        data = {'uploadId': self.uploadId, 'offset': offset, 'total': len(self.csv),
+                'csv': chunk, 'columns': ['fn', 'email']}
+        retval = loads(self.chunked(context).actual_process(data))
+        return retval
+
+    def test_valid_upload_id(self):
+        self.assertTrue(valid_upload_id(self.uploadId))
+        self.assertFalse(valid_upload_id('short'))
+        self.assertFalse(valid_upload_id('../../etc/passwd'))
+
+    def test_append(self):
+        'Test that the chunks are appended, and a chunk sent again is trimmed'
+        self.assertEqual(0, self.staging.received('/g', self.uploadId))
+        self.assertEqual(4, self.staging.append('/g', self.uploadId, 0, b'Name'))
+        self.assertEqual(11, self.staging.append('/g', self.uploadId, 2, b'me,Email\n'))
+        self.assertEqual(11, self.staging.append('/g', self.uploadId, 4, b',Email\n'))
+        self.assertRaises(ChunkOffsetError, self.staging.append, '/g', self.uploadId, 12, b'A')
+        with self.staging.open('/g', self.uploadId) as f:
+            self.assertEqual(b'Name,Email\n', f.read())
+
+    def test_owner(self):
+        'Test that the same upload identifier in two places are different uploads'
+        self.staging.append('/a', self.uploadId, 0, b'Name')
+        self.assertEqual(0, self.staging.received('/b', self.uploadId))
+
+    def test_clean(self):
+        'Test that the old uploads are removed'
+        self.staging.append('/g', self.uploadId, 0, b'Name')
+        self.assertEqual(0, self.staging.clean())
+        self.assertEqual(1, self.staging.clean(time() + self.staging.maxAge + 1))
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_upload(self):
+        'Test that the file is parsed when the last chunk arrives'
+        r = self.send(0, self.csv[:20])
+        self.assertEqual({'uploadId': self.uploadId, 'received': 20, 'total': len(self.csv)},
+                         r)
+
+        r = self.send(20, self.csv[20:])
+        self.assertEqual([{'fn': 'A', 'email': 'a@example.com'},
+                          {'fn': 'B', 'email': 'b@example.com'}], r)
+        self.assertEqual(len(self.csv), self.staging.received('/groups/example', self.uploadId))
+
+    def test_response_lost(self):
+        'Test that a query after the last chunk was parsed returns the parsed file again'
+        self.send(0, self.csv[:20])
+        expected = self.send(20, self.csv[20:])
+        # The response to the last chunk is lost, so the browser asks again
+        r = self.send(0, None)
+
+        self.assertEqual(expected, r)
+        self.assertEqual(expected, self.send(20, self.csv[20:]))
+
+    def test_response_lost_cached(self):
+        'Test that a query after the last chunk was parsed is answered from the cache'
+        chunked = self.chunked()
+        chunked.cache = ParseCache()
+        data = {'uploadId': self.uploadId, 'offset': 0, 'total': len(self.csv),
+                'csv': self.csv, 'columns': ['fn', 'email']}
+        expected = chunked.actual_process(dict(data))
+
+        again = self.chunked()
+        again.cache = chunked.cache
+        data['csv'] = None
+        r = again.actual_process(data)
+
+        self.assertEqual(expected, r)
+        self.assertTrue(again.timings.decisions['cached'])
+
+    def test_resume(self):
+        'Test that a query, without a chunk, returns the number of bytes received'
+        self.send(0, self.csv[:20])
+        r = self.send(0, None)
+
+        self.assertEqual(20, r['received'])
+        self.assertNotIn('status', r)
+
+    def test_gap(self):
+        'Test that a chunk after the end of the upload is rejected'
+        self.send(0, self.csv[:10])
+        r = self.send(20, self.csv[20:30])
+
+        self.assertEqual(-9, r['status'])
+        self.assertEqual('offset', r['message'][1])
+        self.assertEqual(10, r['received'])
+
+    def test_too_long(self):
+        'Test that a chunk past the end of the file is rejected'
+        r = self.send(len(self.csv) - 2, b'Too long')
+
+        self.assertEqual(-9, r['status'])
+        self.assertEqual('too-long', r['message'][1])
+
+    def test_too_large(self):
+        'Test that a file that is too large is rejected before any chunks are kept'
+        chunked = self.chunked()
+        chunked.maxBytes = 10
+        r = loads(chunked.actual_process({'uploadId': self.uploadId, 'offset': 0,
+                                          'total': len(self.csv), 'csv': self.csv[:5],
+                                          'columns': ['fn', 'email']}))
+
+        self.assertEqual(-7, r['status'])
+        self.assertEqual(0, self.staging.received('/groups/example', self.uploadId))
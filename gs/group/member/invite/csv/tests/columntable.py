@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from unittest import TestCase
+from zope.interface import Interface
+from zope.schema import TextLine
+from gs.group.member.invite.csv.columntable import (ColumnTable, get_column_table)
+from gs.group.member.invite.csv.profilelist import ProfileSchema
+
+
+class ITestProfile(Interface):
+    fn = TextLine(title='Name', required=True)
+    org = TextLine(title='Organisation', required=True)
+    tz = TextLine(title='Timezone', required=False)
+
+
+class TestColumnTable(TestCase):
+    'Test the table of columns on the Invite by CSV page'
+
+    def setUp(self):
+        self.profileSchema = ProfileSchema(ITestProfile)
+
+    def test_required(self):
+        'Test the required columns'
+        table = ColumnTable(self.profileSchema)
+
+        self.assertEqual(['email', 'fn', 'org'], [c.token for c in table.required])
+        self.assertEqual(['A', 'B', 'C'], [c.label for c in table.required])
+        self.assertEqual('a.person@example.com', table.required[0].example)
+        self.assertTrue(table.required[0].exampleIsCode)
+        self.assertEqual('Example Organisation', table.required[2].example)
+        self.assertEqual('col-eg org', table.required[2].exampleClass)
+
+    def test_menu(self):
+        'Test the menu of optional columns'
+        table = ColumnTable(self.profileSchema)
+        self.assertEqual([('tz', 'Timezone')], list(table.menu))
+
+    def test_html(self):
+        'Test that the table is rendered once'
+        table = ColumnTable(self.profileSchema)
+        html = table.html
+
+        self.assertIn('<code class="email">a.person@example.com</code>', html)
+        self.assertIn('<td class="col-eg fn">A. Person</td>', html)
+        self.assertIn('<a href="#" id="tz">Timezone</a>', html)
+        self.assertIn('colspan="3"', html)
+        self.assertIs(html, table.html)
+
+    def test_cached(self):
+        'Test that the table is built once per profile schema'
+        self.assertIs(get_column_table(self.profileSchema),
+                      get_column_table(self.profileSchema))
+        self.assertIsNot(get_column_table(self.profileSchema),
+                         get_column_table(ProfileSchema(ITestProfile)))
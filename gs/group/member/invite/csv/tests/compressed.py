@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from gzip import GzipFile
+from io import BytesIO
+from json import loads
+from mmap import mmap
+from unittest import TestCase
+from zipfile import ZipFile, ZIP_DEFLATED
+from mock import MagicMock
+from gs.group.member.invite.csv.cache import ParseCache
+from gs.group.member.invite.csv.compressed import (
+    GzipWriter, accepts_gzip, compression, decompress)
+from gs.group.member.invite.csv.csv2json import CSV2JSON
+from gs.group.member.invite.csv.error import CompressionError
+
+
+def gunzipped(data):
+    return GzipFile(fileobj=BytesIO(data)).read()
+
+
+def gzipped(data):
+    f = BytesIO()
+    with GzipFile(fileobj=f, mode='wb') as g:
+        g.write(data)
+    return f.getvalue()
+
+
+def zipped(*entries):
+    f = BytesIO()
+    z = ZipFile(f, 'w', ZIP_DEFLATED)
+    for name, data in entries:
+        z.writestr(name, data)
+    z.close()
+    return f.getvalue()
+
+
+class TestDecompress(TestCase):
+    'Test decompressing the gzip and zip uploads'
+    csv = b'Name,Email\nA,a@example.com\nB,b@example.com\n'
+
+    def test_compression(self):
+        self.assertEqual('gzip', compression(gzipped(self.csv)))
+        self.assertEqual('zip', compression(zipped(('a.csv', self.csv))))
+        self.assertIsNone(compression(self.csv))
+        self.assertIsNone(compression(b''))
+
+    def test_plain(self):
+        'Test that a file that is not compressed is left as it is'
+        self.assertIs(self.csv, decompress(self.csv, 1024))
+
+    def test_gzip(self):
+        r = decompress(gzipped(self.csv), 1024)
+        self.assertEqual(self.csv, r)
+
+    def test_gzip_members(self):
+        'Test that a gzip file with two members is decompressed as one file'
+        r = decompress(gzipped(self.csv) + gzipped(b'C,c@example.com\n'), 1024)
+        self.assertEqual(self.csv + b'C,c@example.com\n', r)
+
+    def test_gzip_mapped(self):
+        'Test that a large decompressed file is mapped'
+        data = self.csv * 1000
+        r = decompress(gzipped(data), len(data), threshold=1024)
+        self.assertIsInstance(r, mmap)
+        self.assertEqual(data, r[:])
+
+    def test_zip(self):
+        'Test that the one file in a zip file is decompressed'
+        r = decompress(zipped(('people.csv', self.csv), ('__MACOSX/._people.csv', b'fork')),
+                       1024)
+        self.assertEqual(self.csv, r)
+
+    def test_zip_entries(self):
+        'Test that a zip file with more than one file is rejected'
+        buf = zipped(('a.csv', self.csv), ('b.csv', self.csv))
+        with self.assertRaises(CompressionError) as cm:
+            decompress(buf, 1024)
+        self.assertEqual('zip-entries', cm.exception.reason)
+
+    def test_too_large(self):
+        with self.assertRaises(CompressionError) as cm:
+            decompress(gzipped(self.csv), 10)
+        self.assertEqual('too-large', cm.exception.reason)
+
+    def test_ratio(self):
+        'Test that a file that decompresses too well is rejected'
+        data = b'\0' * (4 * 1024 * 1024)
+        for buf in (gzipped(data), zipped(('bomb.csv', data))):
+            with self.assertRaises(CompressionError) as cm:
+                decompress(buf, len(data))
+            self.assertEqual('compression-ratio', cm.exception.reason)
+
+    def test_bad_archive(self):
+        with self.assertRaises(CompressionError) as cm:
+            decompress(gzipped(self.csv)[:20], 1024)
+        self.assertEqual('bad-archive', cm.exception.reason)
+
+    def test_parse(self):
+        'Test that the parser decompresses the file'
+        csv2json = CSV2JSON(MagicMock(), MagicMock())
+        csv2json.cache = ParseCache(maxEntryBytes=0)
+        r = loads(csv2json.actual_process({'columns': ['fn', 'email'],
+                                           'csv': gzipped(self.csv)}))
+
+        self.assertEqual([{'fn': 'A', 'email': 'a@example.com'},
+                          {'fn': 'B', 'email': 'b@example.com'}], r)
+        self.assertEqual('gzip', csv2json.timings.decisions['compression'])
+        self.assertIn('decompress', csv2json.timings.phases)
+
+    def test_parse_bad_archive(self):
+        csv2json = CSV2JSON(MagicMock(), MagicMock())
+        r = loads(csv2json.actual_process({'columns': ['fn', 'email'],
+                                           'csv': zipped(('a.csv', self.csv),
+                                                         ('b.csv', self.csv))}))
+
+        self.assertEqual(-8, r['status'])
+        self.assertEqual('zip-entries', r['message'][1])
+
+
+class TestGzipResponse(TestCase):
+    'Test compressing the responses from the parser'
+    csv = b'Name,Email\n' + b''.join(
+        'Person {0},p{0}@example.com\n'.format(i).encode('ascii') for i in range(500))
+
+    @staticmethod
+    def request(acceptEncoding='gzip, deflate'):
+        retval = MagicMock()
+        retval.getHeader.side_effect = \
+            lambda name, default=None: acceptEncoding if name == 'Accept-Encoding' else default
+        return retval
+
+    @staticmethod
+    def written(request):
+        retval = b''.join(c[0][0] for c in request.response.write.call_args_list)
+        return retval
+
+    def test_accepts_gzip(self):
+        self.assertTrue(accepts_gzip(self.request('gzip')))
+        self.assertTrue(accepts_gzip(self.request('deflate, GZIP;q=0.5')))
+        self.assertTrue(accepts_gzip(self.request('*')))
+        self.assertFalse(accepts_gzip(self.request('gzip;q=0, *')))
+        self.assertFalse(accepts_gzip(self.request('deflate')))
+        self.assertFalse(accepts_gzip(self.request(None)))
+
+    def test_writer_small(self):
+        'Test that a response below the threshold is written as it is'
+        request = self.request()
+        writer = GzipWriter(request.response, True, threshold=100)
+        writer.write(b'[1, ')
+        writer.write(b'2]')
+        writer.close()
+
+        self.assertFalse(writer.compressed)
+        self.assertEqual(b'[1, 2]', self.written(request))
+        request.response.setHeader.assert_called_once_with(b'Vary', b'Accept-Encoding')
+
+    def test_writer(self):
+        'Test that a response above the threshold is compressed as it is written'
+        request = self.request()
+        writer = GzipWriter(request.response, True, threshold=100)
+        chunks = [b'[' + b', '.join([b'"a row"'] * 20)] * 50 + [b']']
+        for chunk in chunks:
+            writer.write(chunk)
+        writer.close()
+
+        self.assertTrue(writer.compressed)
+        request.response.setHeader.assert_any_call(b'Content-Encoding', b'gzip')
+        request.response.setHeader.assert_any_call(b'Vary', b'Accept-Encoding')
+        self.assertGreater(request.response.write.call_count, 1)
+        self.assertEqual(b''.join(chunks), gunzipped(self.written(request)))
+
+    def test_parse(self):
+        'Test that a large response is compressed'
+        data = {'columns': ['fn', 'email'], 'csv': self.csv}
+        plainRequest = self.request(None)
+        expected = CSV2JSON(MagicMock(), plainRequest).actual_process(data)
+        # The uncompressed response still depends on the Accept-Encoding
+        plainRequest.response.setHeader.assert_any_call(b'Vary', b'Accept-Encoding')
+        headers = [c[0][0] for c in plainRequest.response.setHeader.call_args_list]
+        self.assertNotIn(b'Content-Encoding', headers)
+        request = self.request()
+        csv2json = CSV2JSON(MagicMock(), request)
+        csv2json.cache = ParseCache(maxEntryBytes=0)
+        r = csv2json.actual_process(data)
+
+        self.assertLess(len(r), len(expected) / 4)
+        self.assertEqual(expected, gunzipped(r))
+        request.response.setHeader.assert_any_call(b'Content-Encoding', b'gzip')
+        request.response.setHeader.assert_any_call(b'Vary', b'Accept-Encoding')
+        self.assertIn('gzip', csv2json.timings.phases)
+
+    def test_parse_small(self):
+        'Test that a response below the threshold is not compressed'
+        data = {'columns': ['fn', 'email'], 'csv': self.csv}
+        csv2json = CSV2JSON(MagicMock(), self.request())
+        csv2json.gzipThreshold = 1024 * 1024
+        r = loads(csv2json.actual_process(data))
+
+        self.assertEqual(500, len(r))
+        csv2json.request.response.setHeader.assert_any_call(b'Vary', b'Accept-Encoding')
+
+    def test_stream(self):
+        'Test that a streamed response is compressed'
+        data = {'columns': ['fn', 'email'], 'csv': self.csv}
+        expected = CSV2JSON(MagicMock(), self.request(None)).actual_process(data)
+        data['stream'] = True
+        request = self.request()
+        csv2json = CSV2JSON(MagicMock(), request)
+        csv2json.cache = ParseCache(maxEntryBytes=0)
+        r = csv2json.actual_process(data)
+
+        self.assertEqual('', r)
+        self.assertEqual(expected, gunzipped(self.written(request)))
+        self.assertTrue(csv2json.timings.decisions['gzip'])
@@ -13,14 +13,26 @@
 #
 ############################################################################
 from __future__ import absolute_import, unicode_literals
-from json import dumps as to_json
-from mock import MagicMock
+from json import dumps as to_json, loads
+from mock import MagicMock, patch
 from unittest import TestCase
+from zope.schema import TextLine
+from gs.group.member.invite.csv.cache import ParseCache
 from gs.group.member.invite.csv.csv2json import CSV2JSON
+from gs.group.member.invite.csv.upload import map_file
 from . import test_data
 
 
 class TestCSV2JSON(TestCase):
+    def setUp(self):
+        # Nothing is small enough to be cached, so every test parses the file
+        self.cache = ParseCache(maxEntryBytes=0)
+        self.cachePatch = patch.object(CSV2JSON, 'cache', self.cache)
+        self.cachePatch.start()
+
+    def tearDown(self):
+        self.cachePatch.stop()
+
     def test_content_type_missmatch(self):
         'Test that we error when given an image, rather than a CSV'
         data = {}
@@ -96,3 +108,402 @@ M\xc3\xa9mb\xc3\xa9r \xf0\x9f\x98\x84,member@example.com,28'''
              "Email": "dirk@example.com"}]
         expected = to_json(e)
         self.assertEqual(expected, r)
+
+    def test_stream(self):
+        'Test that the streamed profiles are the same as the normal ones'
+        data = {}
+        data['columns'] = ['Name', 'Email']
+        with test_data('test-utf-8.csv') as i:
+            data['csv'] = i.read()
+        expected = CSV2JSON(MagicMock(), MagicMock()).actual_process(data)
+        data['stream'] = True
+        mockRequest = MagicMock()
+
+        csv2json = CSV2JSON(MagicMock(), mockRequest)
+        r = csv2json.actual_process(data)
+
+        self.assertEqual('', r)
+        written = b''.join(c[0][0] for c in mockRequest.response.write.call_args_list)
+        self.assertEqual(expected, written.decode('utf-8'))
+
+    def test_stream_col_missmatch_first(self):
+        'Test that a status is returned if the first row is bad when streaming'
+        data = {}
+        data['columns'] = ['Name', 'Email']
+        data['csv'] = b'Name,Email\nMember,member@example.com,28\n'
+        data['stream'] = True
+        mockRequest = MagicMock()
+
+        csv2json = CSV2JSON(MagicMock(), mockRequest)
+        r = csv2json.actual_process(data)
+
+        self.assertIn('"status": -3', r)
+        self.assertFalse(mockRequest.response.write.called)
+
+    def test_stream_col_missmatch_later(self):
+        'Test that a later bad row is the last item when streaming'
+        data = {}
+        data['columns'] = ['Name', 'Email']
+        data['csv'] = b'Name,Email\nMember,member@example.com\n' \
+                      b'Another,another@example.com,28\n'
+        data['stream'] = True
+        mockRequest = MagicMock()
+
+        csv2json = CSV2JSON(MagicMock(), mockRequest)
+        csv2json.actual_process(data)
+
+        written = b''.join(c[0][0] for c in mockRequest.response.write.call_args_list)
+        self.assertTrue(written.endswith(b']'))
+        self.assertIn(b'"status": -3', written)
+
+    def test_compact(self):
+        'Test the compact format, with the columns and a list of rows'
+        data = {}
+        data['columns'] = ['Name', 'Email']
+        data['csv'] = b'Name,Email\nMember,member@example.com\n'
+        data['format'] = 'columns'
+
+        csv2json = CSV2JSON(MagicMock(), MagicMock())
+        r = csv2json.actual_process(data)
+
+        expected = '{"columns":["Name","Email"],"rows":[["Member","member@example.com"]]}'
+        self.assertEqual(expected, r)
+
+    def test_compact_accept(self):
+        'Test that the compact format can be asked for in the Accept header'
+        data = {}
+        data['columns'] = ['Name', 'Email']
+        data['csv'] = b'Name,Email\nMember,member@example.com\n'
+        mockRequest = MagicMock()
+        mockRequest.getHeader.return_value = 'application/json; format=columns'
+
+        csv2json = CSV2JSON(MagicMock(), mockRequest)
+        r = csv2json.actual_process(data)
+
+        self.assertTrue(r.startswith('{"columns":'))
+
+    def test_compact_stream(self):
+        'Test that the streamed compact format is the same as the normal one'
+        data = {}
+        data['columns'] = ['Name', 'Email']
+        with test_data('test-utf-8.csv') as i:
+            data['csv'] = i.read()
+        data['format'] = 'columns'
+        expected = CSV2JSON(MagicMock(), MagicMock()).actual_process(data)
+        data['stream'] = True
+        mockRequest = MagicMock()
+
+        csv2json = CSV2JSON(MagicMock(), mockRequest)
+        csv2json.actual_process(data)
+
+        written = b''.join(c[0][0] for c in mockRequest.response.write.call_args_list)
+        self.assertEqual(expected, written.decode('utf-8'))
+
+    def test_all_errors(self):
+        'Test that every bad row is reported, along with the good rows'
+        data = {}
+        data['columns'] = ['Name', 'Email']
+        data['csv'] = b'Name,Email\nMember,member@example.com,28\n' \
+                      b'Another,another@example.com\nThird,third@example.com,3,4\n'
+        data['allErrors'] = True
+
+        csv2json = CSV2JSON(MagicMock(), MagicMock())
+        r = loads(csv2json.actual_process(data))
+
+        self.assertEqual(-3, r['status'])
+        self.assertEqual(2, r['errorCount'])
+        self.assertEqual([1, 3], [e['row'] for e in r['errors']])
+        self.assertEqual(4, r['errors'][1]['found'])
+        self.assertEqual('Third,third@example.com,3,4', r['errors'][1]['excerpt'])
+        self.assertEqual([{'Name': 'Another', 'Email': 'another@example.com'}],
+                         r['profiles'])
+
+    def test_all_errors_limit(self):
+        'Test that only the first few bad rows are reported'
+        data = {}
+        data['columns'] = ['Name', 'Email']
+        data['csv'] = b'Name,Email\n' + b'Member,member@example.com,28\n' * 10
+        data['allErrors'] = True
+
+        csv2json = CSV2JSON(MagicMock(), MagicMock())
+        csv2json.maxErrors = 3
+        r = loads(csv2json.actual_process(data))
+
+        self.assertEqual(10, r['errorCount'])
+        self.assertEqual(3, len(r['errors']))
+
+    def test_all_errors_stream(self):
+        'Test that every bad row is reported at the end of the stream'
+        data = {}
+        data['columns'] = ['Name', 'Email']
+        data['csv'] = b'Name,Email\nMember,member@example.com,28\n' \
+                      b'Another,another@example.com\nThird,third@example.com,3\n'
+        data['allErrors'] = True
+        data['stream'] = True
+        mockRequest = MagicMock()
+
+        csv2json = CSV2JSON(MagicMock(), mockRequest)
+        csv2json.actual_process(data)
+
+        written = b''.join(c[0][0] for c in mockRequest.response.write.call_args_list)
+        r = loads(written.decode('utf-8'))
+        self.assertEqual({'Name': 'Another', 'Email': 'another@example.com'}, r[0])
+        self.assertEqual(-3, r[-1]['status'])
+        self.assertEqual(2, r[-1]['errorCount'])
+
+    def test_cache(self):
+        'Test that the same file is answered from the cache'
+        self.cache.maxEntryBytes = 1024
+        data = {'columns': ['Name', 'Email']}
+        with test_data('test-utf-8.csv') as i:
+            data['csv'] = i.read()
+        expected = CSV2JSON(MagicMock(), MagicMock()).actual_process(data)
+
+        csv2json = CSV2JSON(MagicMock(), MagicMock())
+        csv2json.parse = MagicMock()
+        r = csv2json.actual_process(data)
+
+        self.assertEqual(expected, r)
+        self.assertFalse(csv2json.parse.called)
+        self.assertEqual(1, self.cache.stats()['hits'])
+        data['columns'] = ['Email', 'Name']
+        r = CSV2JSON(MagicMock(), MagicMock()).actual_process(data)
+        self.assertNotEqual(expected, r)
+
+    def test_cache_stream(self):
+        'Test that a streamed response is cached'
+        self.cache.maxEntryBytes = 1024
+        data = {'columns': ['Name', 'Email'], 'stream': True}
+        with test_data('test-utf-8.csv') as i:
+            data['csv'] = i.read()
+        mockRequest = MagicMock()
+        CSV2JSON(MagicMock(), mockRequest).actual_process(data)
+        written = b''.join(c[0][0] for c in mockRequest.response.write.call_args_list)
+
+        r = CSV2JSON(MagicMock(), MagicMock()).actual_process(data)
+
+        self.assertEqual(written, r)
+        self.assertEqual(1, self.cache.stats()['hits'])
+
+    def test_cache_stream_then_plain(self):
+        'Test that a streamed response is not returned to a client that did not stream'
+        self.cache.maxEntryBytes = 1024
+        data = {'columns': ['Name', 'Email'], 'stream': True}
+        data['csv'] = b'Name,Email\nMember,member@example.com\nAnother,another@example.com,28\n'
+        CSV2JSON(MagicMock(), MagicMock()).actual_process(data)
+        del data['stream']
+
+        r = loads(CSV2JSON(MagicMock(), MagicMock()).actual_process(data))
+
+        self.assertEqual(-3, r['status'])
+        self.assertEqual(0, self.cache.stats()['hits'])
+        data['stream'] = True
+        r = loads(CSV2JSON(MagicMock(), MagicMock()).actual_process(data))
+        self.assertEqual(-3, r[-1]['status'])
+        self.assertEqual(1, self.cache.stats()['hits'])
+
+    def test_cache_stream_too_big(self):
+        'Test that a streamed response that is too big is not cached'
+        self.cache.maxEntryBytes = 16
+        data = {'columns': ['Name', 'Email'], 'stream': True}
+        with test_data('test-utf-8.csv') as i:
+            data['csv'] = i.read()
+        CSV2JSON(MagicMock(), MagicMock()).actual_process(data)
+
+        self.assertEqual(0, self.cache.stats()['entries'])
+
+    @staticmethod
+    def validating_csv2json(request=None):
+        retval = CSV2JSON(MagicMock(), request or MagicMock())
+        retval.profileList = MagicMock()
+        retval.profileList.properties = {
+            'Name': TextLine(title='Name', required=True),
+            'Email': TextLine(title='Email', constraint=lambda v: '@' in v, required=True)}
+        return retval
+
+    def test_validate(self):
+        'Test that every row with bad values is reported, with the good rows'
+        data = {'columns': ['Name', 'Email'], 'validate': True}
+        data['csv'] = b'Name,Email\nA,a@example.com\nB,not an address\n,c@example.com\n'
+
+        r = loads(self.validating_csv2json().actual_process(data))
+
+        self.assertEqual(-6, r['status'])
+        self.assertEqual(2, r['invalidCount'])
+        self.assertEqual(['2', '3'], sorted(r['invalid']))
+        self.assertIn('Email', r['invalid']['2'])
+        self.assertIn('Name', r['invalid']['3'])
+        self.assertEqual([{'Name': 'A', 'Email': 'a@example.com'}], r['profiles'])
+        self.assertEqual(3, len(r['message']))
+
+    def test_validate_fine(self):
+        'Test that a file with good values is returned as normal'
+        data = {'columns': ['Name', 'Email'], 'validate': True}
+        data['csv'] = b'Name,Email\nA,a@example.com\n'
+
+        r = loads(self.validating_csv2json().actual_process(data))
+
+        self.assertEqual([{'Name': 'A', 'Email': 'a@example.com'}], r)
+
+    def test_validate_stream(self):
+        'Test that the rows with bad values are the last item when streaming'
+        data = {'columns': ['Name', 'Email'], 'validate': True, 'stream': True}
+        data['csv'] = b'Name,Email\nA,a@example.com\nB,not an address\n'
+        mockRequest = MagicMock()
+
+        self.validating_csv2json(mockRequest).actual_process(data)
+
+        written = b''.join(c[0][0] for c in mockRequest.response.write.call_args_list)
+        r = loads(written.decode('utf-8'))
+        self.assertEqual({'Name': 'A', 'Email': 'a@example.com'}, r[0])
+        self.assertEqual(-6, r[-1]['status'])
+        self.assertEqual(['2'], list(r[-1]['invalid']))
+
+    def test_validate_cache(self):
+        'Test that the checked responses are cached for each site and profile schema'
+        self.cache.maxEntryBytes = 1024
+        data = {'columns': ['Name', 'Email'], 'validate': True}
+        data['csv'] = b'Name,Email\nA,a@example.com\n'
+        csv2json = self.validating_csv2json()
+        csv2json.context.getPhysicalPath.return_value = ('', 'example')
+        csv2json.profileList.profileSchemaName = 'IGSCoreProfile'
+        key = csv2json.validation_key(data)
+
+        self.assertEqual(('IGSCoreProfile', '/example'), key)
+        csv2json.context.getPhysicalPath.return_value = ('', 'other')
+        self.assertNotEqual(key, csv2json.validation_key(data))
+        csv2json.profileList.profileSchemaName = 'IOtherProfile'
+        self.assertNotEqual(key, csv2json.validation_key(data))
+        self.assertIsNone(csv2json.validation_key({}))
+
+    def test_dedupe(self):
+        'Test that the rows that repeat an address are dropped and reported'
+        data = {'columns': ['fn', 'email'], 'dedupe': True, 'format': 'columns'}
+        data['csv'] = b'Name,Email\nA,a@example.com\nB,b@example.com\nC, A@Example.com\n'
+
+        r = loads(CSV2JSON(MagicMock(), MagicMock()).actual_process(data))
+
+        self.assertEqual([['A', 'a@example.com'], ['B', 'b@example.com']], r['rows'])
+        self.assertEqual([3], r['duplicates'])
+        self.assertEqual(1, r['duplicateCount'])
+        self.assertEqual([1, 2], r['rowNumbers'])
+
+    def test_dedupe_row_numbers(self):
+        'Test that the kept rows after a duplicate have the numbers of their rows in the file'
+        data = {'columns': ['fn', 'email'], 'dedupe': True, 'format': 'columns'}
+        data['csv'] = b'Name,Email\nA,a@example.com\nB,a@example.com\nC,c@example.com\n'
+
+        r = loads(CSV2JSON(MagicMock(), MagicMock()).actual_process(data))
+
+        self.assertEqual([['A', 'a@example.com'], ['C', 'c@example.com']], r['rows'])
+        self.assertEqual([1, 3], r['rowNumbers'])
+
+    def test_dedupe_objects(self):
+        'Test that the list of objects is not de-duplicated, as it cannot report the duplicates'
+        data = {'columns': ['fn', 'email'], 'dedupe': True}
+        data['csv'] = b'Name,Email\nA,a@example.com\nB,a@example.com\n'
+
+        r = loads(CSV2JSON(MagicMock(), MagicMock()).actual_process(data))
+
+        self.assertEqual(['A', 'B'], [p['fn'] for p in r])
+
+    def test_dedupe_stream(self):
+        'Test that the dropped rows are at the end of the streamed compact format'
+        data = {'columns': ['fn', 'email'], 'dedupe': True, 'format': 'columns',
+                'stream': True}
+        data['csv'] = b'Name,Email\nA,a@example.com\nB,a@example.com\n'
+        mockRequest = MagicMock()
+
+        CSV2JSON(MagicMock(), mockRequest).actual_process(data)
+
+        written = b''.join(c[0][0] for c in mockRequest.response.write.call_args_list)
+        r = loads(written.decode('utf-8'))
+        self.assertEqual([['A', 'a@example.com']], r['rows'])
+        self.assertEqual([2], r['duplicates'])
+        self.assertEqual([1], r['rowNumbers'])
+
+    def test_mapped(self):
+        'Test that a memory-mapped file is parsed the same as the bytes'
+        data = {'columns': ['Name', 'Email']}
+        with test_data('test-utf-8.csv') as i:
+            data['csv'] = i.read()
+        expected = CSV2JSON(MagicMock(), MagicMock()).actual_process(data)
+        with test_data('test-utf-8.csv') as i:
+            data['csv'] = map_file(i)
+            r = CSV2JSON(MagicMock(), MagicMock()).actual_process(data)
+
+        self.assertEqual(expected, r)
+        self.assertRaises(ValueError, data['csv'].size)  # Closed
+
+    def test_latin1_late(self):
+        'Test a file that is ASCII for more than the sample, and then ISO 8859'
+        data = {'columns': ['Name', 'Email'],
+                'csv': b'Name,Email\n' + b'Member,member@example.com\n' * 5000
+                + b'M\xe9mb\xe9r,member@example.com\n'}
+        r = loads(CSV2JSON(MagicMock(), MagicMock()).actual_process(data))
+
+        self.assertEqual(5001, len(r))
+        self.assertEqual('M\xe9mb\xe9r', r[-1]['Name'])
+
+    def test_too_large(self):
+        'Test that a file with too many bytes is rejected before it is parsed'
+        data = {'columns': ['Name', 'Email'], 'csv': b'Name,Email\nA,a@example.com\n'}
+        csv2json = CSV2JSON(MagicMock(), MagicMock())
+        csv2json.maxBytes = 10
+        csv2json.parse = MagicMock()
+        r = loads(csv2json.actual_process(data))
+
+        self.assertEqual(-7, r['status'])
+        self.assertEqual('too-large', r['message'][1])
+        self.assertFalse(csv2json.parse.called)
+
+    def test_too_many_rows(self):
+        'Test that a file with too many rows is rejected'
+        data = {'columns': ['Name', 'Email'],
+                'csv': b'Name,Email\nA,a@example.com\nB,b@example.com'}
+        csv2json = CSV2JSON(MagicMock(), MagicMock())
+        csv2json.maxRows = 1
+        r = loads(csv2json.actual_process(data))
+        self.assertEqual(-7, r['status'])
+        self.assertEqual('too-many-rows', r['message'][1])
+
+        csv2json.maxRows = 2
+        r = loads(csv2json.actual_process(data))
+        self.assertEqual(2, len(r))
+
+    def test_too_many_rows_stream(self):
+        'Test that too many rows is the last item when streaming'
+        data = {'columns': ['Name', 'Email'], 'stream': True,
+                'csv': b'Name,Email\nA,a@example.com\nB,b@example.com\n'}
+        mockRequest = MagicMock()
+        csv2json = CSV2JSON(MagicMock(), mockRequest)
+        csv2json.maxRows = 1
+        csv2json.actual_process(data)
+
+        written = b''.join(c[0][0] for c in mockRequest.response.write.call_args_list)
+        r = loads(written.decode('utf-8'))
+        self.assertEqual({'Name': 'A', 'Email': 'a@example.com'}, r[0])
+        self.assertEqual('too-many-rows', r[-1]['message'][1])
+
+    def test_too_many_lines(self):
+        'Test that a file with far too many lines is rejected before it is parsed'
+        data = {'columns': ['Name', 'Email'], 'csv': b'Name,Email\n' + b'A,a@example.com\n' * 9}
+        csv2json = CSV2JSON(MagicMock(), MagicMock())
+        csv2json.maxRows = 1
+        csv2json.parse = MagicMock()
+        r = loads(csv2json.actual_process(data))
+
+        self.assertEqual(-7, r['status'])
+        self.assertEqual('too-many-lines', r['message'][1])
+        self.assertFalse(csv2json.parse.called)
+
+    def test_multi_line_cells(self):
+        'Test that cells with more than one line are not counted as extra rows'
+        data = {'columns': ['Name', 'Address'],
+                'csv': b'Name,Address\nA,"1 High St\nTown\nCounty"\nB,"2 Low Rd\nCity"\n'}
+        csv2json = CSV2JSON(MagicMock(), MagicMock())
+        csv2json.maxRows = 2
+        r = loads(csv2json.actual_process(data))
+
+        self.assertEqual(2, len(r))
+        self.assertEqual('1 High St\nTown\nCounty', r[0]['Address'])
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from unittest import TestCase
+from gs.group.member.invite.csv.dedup import Deduplicator, email_key, normalise_email
+
+
+class TestDeduplicator(TestCase):
+    'Test finding the rows that repeat an email address'
+
+    def test_normalise(self):
+        'Test that case and white space are ignored'
+        self.assertEqual('a.person@example.com', normalise_email(' A.Person@Example.COM\t'))
+        self.assertEqual(email_key('a@example.com'), email_key('A@EXAMPLE.com '))
+        self.assertNotEqual(email_key('a@example.com'), email_key('b@example.com'))
+
+    def test_first_kept(self):
+        'Test that the first row is kept, and the later copies dropped'
+        dedup = Deduplicator(1, 10)
+        rows = [('A', 'a@example.com'), ('B', 'b@example.com'),
+                ('A again', ' A@example.com'), ('B again', 'B@EXAMPLE.COM')]
+        kept = [r for i, r in enumerate(rows, 1) if not dedup(i, r)]
+
+        self.assertEqual(rows[:2], kept)
+        self.assertEqual({'duplicates': [3, 4], 'duplicateCount': 2, 'rowNumbers': [1, 2]},
+                         dedup.status())
+
+    def test_empty(self):
+        'Test that rows without an address are not duplicates'
+        dedup = Deduplicator(0, 10)
+        self.assertFalse(dedup(1, ('', )))
+        self.assertFalse(dedup(2, ('', )))
+
+    def test_limit(self):
+        'Test that every duplicate is counted, but only some are listed'
+        dedup = Deduplicator(0, 2)
+        for i in range(5):
+            dedup(i, ('a@example.com', ))
+        status = dedup.status()
+        self.assertEqual([1, 2], status['duplicates'])
+        self.assertEqual(4, status['duplicateCount'])
+        self.assertEqual([0], status['rowNumbers'])
+
+    def test_max_keys(self):
+        'Test that the set of addresses is bounded'
+        dedup = Deduplicator(0, 10, maxKeys=1)
+        dedup(1, ('a@example.com', ))
+        dedup(2, ('b@example.com', ))
+
+        self.assertEqual(1, len(dedup.seen))
+        self.assertTrue(dedup(3, ('a@example.com', )))
+        self.assertFalse(dedup(4, ('b@example.com', )))
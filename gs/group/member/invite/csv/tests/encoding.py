@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from codecs import BOM_UTF8
+from mock import patch
+from unittest import TestCase
+from gs.group.member.invite.csv.encoding import EncodingDetector
+from . import test_data
+
+
+class TestEncodingDetector(TestCase):
+    'Test the layered encoding detector'
+
+    def assert_guess(self, encoding, method, guess):
+        self.assertEqual(encoding, guess.encoding)
+        self.assertEqual(method, guess.method)
+
+    def test_bom_utf8(self):
+        'Test that the UTF-8 byte-order mark is found'
+        r = EncodingDetector().detect(BOM_UTF8 + 'Mémbér'.encode('utf-8'))
+        self.assert_guess('utf-8-sig', 'bom', r)
+
+    def test_bom_utf16(self):
+        'Test that the UTF-16 byte-order mark is found'
+        r = EncodingDetector().detect('Mémbér'.encode('utf-16'))
+        self.assert_guess('utf-16', 'bom', r)
+
+    def test_ascii(self):
+        'Test that an ASCII file is found without chardet'
+        r = EncodingDetector().detect(b'Member,member@example.com\n')
+        self.assert_guess('ascii', 'ascii', r)
+
+    def test_ascii_start(self):
+        'Test that a file that is only ASCII at the start is not ASCII'
+        d = EncodingDetector(sampleSize=16)
+        d.blockSize = 16
+        r = d.detect(b'Member,member@example.com\n' * 4 + 'Mémbér'.encode('utf-8'))
+        self.assert_guess('utf-8', 'utf-8', r)
+
+    def test_latin1_late(self):
+        'Test that a file that is ASCII past the sample, then ISO 8859, is not UTF-8'
+        d = EncodingDetector(sampleSize=16)
+        d.blockSize = 16
+        r = d.detect(b'Member,member@example.com\n' * 4 + b'M\xe9mb\xe9r,member@example.com\n')
+        self.assertEqual('chardet', r.method)
+        self.assertTrue(r.encoding.startswith('ISO-8859'))
+
+    def test_utf8(self):
+        'Test that a valid UTF-8 file is found without chardet'
+        r = EncodingDetector().detect('Mémbér \U0001f604'.encode('utf-8'))
+        self.assert_guess('utf-8', 'utf-8', r)
+
+    def test_utf8_split(self):
+        'Test that a character split by the end of the sample is UTF-8'
+        r = EncodingDetector(sampleSize=2).detect('Mé'.encode('utf-8'))
+        self.assert_guess('utf-8', 'utf-8', r)
+
+    def test_chardet(self):
+        'Test that chardet guesses ISO 8859 files'
+        r = EncodingDetector().detect(b'M\xe9mb\xe9r')
+        self.assertEqual('chardet', r.method)
+        self.assertTrue(r.encoding.startswith('ISO-8859'))
+
+    def test_threshold(self):
+        'Test that the default is used when chardet is unsure'
+        r = EncodingDetector(threshold=1.0).detect(b'M\xe9mb\xe9r')
+        self.assert_guess('utf-8', 'default', r)
+
+    def test_image(self):
+        'Test that an image gets the default encoding'
+        with test_data('gs-logo-16x16.png') as img:
+            r = EncodingDetector().detect(img.read())
+        self.assert_guess('utf-8', 'default', r)
+
+    @patch('gs.group.member.invite.csv.encoding.UniversalDetector')
+    def test_chardet_widen(self, MockDetector):
+        'Test that the sample only grows while chardet is unsure'
+        detector = MockDetector.return_value
+        results = [{'encoding': 'ISO-8859-1', 'confidence': 0.1},
+                   {'encoding': 'ISO-8859-1', 'confidence': 0.9}]
+        type(detector).result = property(lambda s: results[detector.feed.call_count - 1])
+        d = EncodingDetector(sampleSize=4, maxSampleSize=64)
+        r = d.detect(b'M\xe9mb\xe9r,member@example.com\n' * 4)
+
+        self.assertEqual(0.9, r.confidence)
+        self.assertEqual([4, 16], [len(c[0][0]) for c in detector.feed.call_args_list])
+
+    @patch('gs.group.member.invite.csv.encoding.UniversalDetector')
+    def test_chardet_widest(self, MockDetector):
+        'Test that the sample stops growing at the maximum'
+        MockDetector.return_value.result = {'encoding': None, 'confidence': 0.0}
+        d = EncodingDetector(sampleSize=4, maxSampleSize=64)
+        r = d.detect(b'M\xe9mb\xe9r,member@example.com\n' * 4)
+
+        self.assert_guess('utf-8', 'default', r)
+        feeds = MockDetector.return_value.feed.call_args_list
+        self.assertEqual([4, 16, 64], [len(c[0][0]) for c in feeds])
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import dumps as to_json, loads
+from mock import MagicMock, patch
+from unittest import TestCase
+import sqlalchemy as sa
+import transaction
+from gs.group.member.invite.csv.checkpoint import LocalCheckpointStore
+from gs.group.member.invite.csv.jobinvite import (
+    InviteJobStatus, SubmitInviteJob, request_environ)
+from gs.group.member.invite.csv.jobs import FINISHED, LocalJobQueue
+from gs.group.member.invite.csv.queries import CheckpointQuery
+
+
+class TestInviteJobEndpoints(TestCase):
+    'Test submitting a background invitation job, and checking on it'
+
+    def setUp(self):
+        self.data = {'subject': 'Invitation', 'message': 'Please join',
+                     'fromAddr': 'admin@example.com', 'delivery': 'email',
+                     'rows': to_json([{'email': 'a@example.com'}, {'email': 'b@example.com'}])}
+        self.queue = LocalJobQueue(workers=2)
+        self.store = LocalCheckpointStore()
+        self.group = MagicMock()
+        self.group.getPhysicalPath.return_value = ('', 'groupserver', 'groups', 'example')
+
+    def endpoint(self, cls):
+        retval = cls(self.group, MagicMock())
+        retval.queue = self.queue
+        retval.checkpoints = self.store
+        return retval
+
+    @patch('gs.group.member.invite.csv.jobinvite.getSecurityManager')
+    @patch('gs.group.member.invite.csv.jobinvite.ThreadRowInviter')
+    def submit(self, mockInviter, mockGetSecurityManager, status=2):
+        mockInviter.return_value = lambda p: {'status': status, 'message': [p['email']]}
+        retval = loads(self.endpoint(SubmitInviteJob).actual_process(self.data))
+        self.queue.join()
+        return retval
+
+    def test_submit(self):
+        'Test that the rows are submitted as a job'
+        r = self.submit()
+
+        self.assertIn('jobId', r)
+        self.assertEqual(2, r['total'])
+        job = self.queue.get(r['jobId'])
+        self.assertEqual('/groupserver/groups/example', job.owner)
+
+    def test_submit_again(self):
+        'Test that sending the same rows again resumes the run'
+        first = self.submit(status=-4)
+        r = self.submit()
+
+        self.assertEqual(first['jobId'], r['jobId'])
+        self.assertEqual(0, self.queue.get(r['jobId']).skipped)
+        self.assertEqual('22', self.store.runs[r['jobId']]['outcomes'])
+
+    def test_submit_after_finished(self):
+        'Test that sending the same rows after the run has finished starts it again'
+        first = self.submit()
+        r = self.submit(status=-4)
+
+        self.assertEqual(first['jobId'], r['jobId'])
+        self.assertEqual(0, self.queue.get(r['jobId']).skipped)
+        self.assertEqual('xx', self.store.runs[r['jobId']]['outcomes'])
+
+    @patch('gs.group.member.invite.csv.queries.mark_changed')
+    @patch('gs.group.member.invite.csv.queries.getSession')
+    @patch('gs.group.member.invite.csv.queries.getTable')
+    def test_submit_transaction(self, mockGetTable, mockGetSession, mockMarkChanged):
+        'Test that storing the run leaves the transaction of the request alone'
+        mockGetTable.return_value = sa.Table(
+            'invite_csv_run', sa.MetaData(), sa.Column('run_id', sa.Text),
+            sa.Column('owner', sa.Text), sa.Column('outcomes', sa.Text),
+            sa.Column('last_row', sa.Integer), sa.Column('started', sa.DateTime),
+            sa.Column('updated', sa.DateTime))
+        session = mockGetSession.return_value
+        session.execute.return_value.fetchone.return_value = None  # A new run
+        self.store = CheckpointQuery()
+        dataManager = MagicMock()
+        dataManager.sortKey.return_value = 'request'
+        transaction.begin()
+        try:
+            transaction.get().join(dataManager)
+            self.submit()
+            self.assertEqual(4, session.execute.call_count)  # Load, create, two outcomes
+            transaction.commit()
+        finally:
+            transaction.abort()
+
+        self.assertTrue(dataManager.tpc_finish.called)
+        self.assertFalse(dataManager.abort.called)
+
+    def test_submit_bad_rows(self):
+        'Test that the rows are checked before the job is submitted'
+        self.data['rows'] = '{}'
+        r = self.submit()
+        self.assertEqual(-2, r['status'])
+        self.assertEqual({}, dict(self.queue.jobs))
+
+    def test_status(self):
+        'Test the progress of a finished job'
+        jobId = self.submit()['jobId']
+
+        r = loads(self.endpoint(InviteJobStatus).actual_process({'jobId': jobId, 'start': 1}))
+
+        self.assertEqual(FINISHED, r['state'])
+        self.assertEqual(2, r['succeeded'])
+        self.assertEqual(['b@example.com'], [x['message'][0] for x in r['results']])
+
+    def test_status_other_group(self):
+        'Test that a job from another group cannot be seen'
+        jobId = self.submit()['jobId']
+        self.group.getPhysicalPath.return_value = ('', 'groupserver', 'groups', 'other')
+
+        r = loads(self.endpoint(InviteJobStatus).actual_process({'jobId': jobId}))
+
+        self.assertEqual(-2, r['status'])
+
+    def test_request_environ(self):
+        'Test that the new requests are for the same site as the request that submitted the job'
+        request = MagicMock()
+        request.environ = {'SERVER_NAME': 'groups.example.com', 'SERVER_PORT': '443',
+                           'HTTP_COOKIE': 'secret', 'wsgi.input': object()}
+        r = request_environ(request)
+
+        self.assertEqual({'SERVER_NAME': 'groups.example.com', 'SERVER_PORT': '443',
+                          'REQUEST_METHOD': 'GET'}, r)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from threading import Event
+from unittest import TestCase
+from gs.group.member.invite.csv.jobs import (FINISHED, InviteJob, LocalJobQueue, PROBLEM,
+                                             QUEUED, RUNNING)
+
+
+class TestInviteJob(TestCase):
+    'Test the state of a background invitation job'
+
+    def setUp(self):
+        self.rows = [{'email': 'a@example.com'}, {'email': 'b@example.com'},
+                     {'email': 'c@example.com'}]
+
+    def test_counts(self):
+        'Test that the rows are counted by their status'
+        statuses = {'a@example.com': 1, 'b@example.com': 3, 'c@example.com': -4}
+        job = InviteJob('j', self.rows, lambda p: {'status': statuses[p['email']],
+                                                   'message': [p['email']]})
+        self.assertEqual(QUEUED, job.state)
+        job.run_row(0)
+        self.assertEqual(RUNNING, job.state)
+        job.run_row(1)
+        job.run_row(2)
+
+        r = job.to_dict()
+        self.assertEqual(FINISHED, r['state'])
+        self.assertEqual(3, r['total'])
+        self.assertEqual(3, r['done'])
+        self.assertEqual(1, r['succeeded'])
+        self.assertEqual(1, r['ignored'])
+        self.assertEqual(1, r['failed'])
+
+    def test_problem(self):
+        'Test that an exception is recorded as a failed row'
+        def invite(profile):
+            raise ValueError('Oops')
+        job = InviteJob('j', self.rows, invite)
+        job.run_row(1)
+
+        self.assertEqual(1, job.failed)
+        self.assertEqual(PROBLEM, job.results[1]['status'])
+
+    def test_results_in_order(self):
+        'Test that the results stop at the first row that is not done'
+        job = InviteJob('j', self.rows, lambda p: {'status': 1, 'message': [p['email']]})
+        job.run_row(0)
+        job.run_row(2)
+
+        r = job.to_dict()
+        self.assertEqual(['a@example.com'], [x['message'][0] for x in r['results']])
+        job.run_row(1)
+        r = job.to_dict(1)
+        self.assertEqual(1, r['start'])
+        self.assertEqual(['b@example.com', 'c@example.com'],
+                         [x['message'][0] for x in r['results']])
+
+
+class TestLocalJobQueue(TestCase):
+    'Test the in-process job queue'
+
+    def test_submit(self):
+        'Test that every row of a job is invited by the workers'
+        queue = LocalJobQueue(workers=3)
+        rows = [{'email': '{0}@example.com'.format(i)} for i in range(20)]
+        job = queue.submit(rows, lambda p: {'status': 2, 'message': [p['email']]}, 'g')
+        queue.join()
+
+        self.assertIs(job, queue.get(job.jobId))
+        self.assertEqual(FINISHED, job.state)
+        self.assertEqual(20, job.succeeded)
+        self.assertEqual('19@example.com', job.results[19]['message'][0])
+        self.assertEqual('g', job.owner)
+
+    def test_get_missing(self):
+        'Test that an unknown job is None'
+        self.assertIsNone(LocalJobQueue().get('missing'))
+
+    def test_forget(self):
+        'Test that the oldest finished jobs are forgotten'
+        queue = LocalJobQueue(workers=1, maxJobs=1)
+        first = queue.submit([{}], lambda p: {'status': 1, 'message': ['']})
+        queue.join()
+        event = Event()
+
+        def invite(profile):
+            event.wait()
+            return {'status': 1, 'message': ['']}
+        second = queue.submit([{}], invite)
+        third = queue.submit([{}], invite)
+        event.set()
+        queue.join()
+
+        self.assertIsNone(queue.get(first.jobId))
+        self.assertIs(second, queue.get(second.jobId))
+        self.assertIs(third, queue.get(third.jobId))
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import dumps as to_json
+from unittest import TestCase
+from gs.group.member.invite.csv.jsonstream import (iter_json_list, StreamTail)
+
+
+class TestIterJSONList(TestCase):
+    'Test the incremental JSON encoder'
+
+    def setUp(self):
+        self.items = [{'name': 'Member {0}'.format(i),
+                       'email': 'member{0}@example.com'.format(i)}
+                      for i in range(10)]
+
+    def test_empty(self):
+        'Test that an empty list is encoded'
+        r = ''.join(iter_json_list([]))
+        self.assertEqual('[]', r)
+
+    def test_same_as_dumps(self):
+        'Test that the chunks join to the same JSON as json.dumps'
+        r = ''.join(iter_json_list(self.items, chunkSize=3))
+        self.assertEqual(to_json(self.items), r)
+
+    def test_chunks(self):
+        'Test that the list is split into chunks'
+        r = list(iter_json_list(iter(self.items), chunkSize=3))
+        self.assertEqual(4, len(r))
+        self.assertTrue(r[0].startswith('['))
+        self.assertTrue(r[-1].endswith(']'))
+
+    def test_tail(self):
+        'Test that a tail is the last item in the list'
+        items = self.items[:2] + [StreamTail({'status': -3})] + self.items[2:]
+        r = ''.join(iter_json_list(items))
+        expected = to_json(self.items[:2] + [{'status': -3}])
+        self.assertEqual(expected, r)
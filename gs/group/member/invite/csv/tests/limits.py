@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from mock import MagicMock
+from unittest import TestCase
+from gs.group.member.invite.csv.limits import MAX_ROWS, max_rows
+
+
+class TestMaxRows(TestCase):
+    'Test the maximum number of rows for a site'
+
+    @staticmethod
+    def context(value):
+        retval = MagicMock()
+        config = retval.site_root.return_value.GlobalConfiguration
+        config.getProperty.return_value = value
+        return retval
+
+    def test_default(self):
+        'Test the default is used when the site does not set the limit'
+        self.assertEqual(MAX_ROWS, max_rows(self.context(None)))
+
+    def test_site(self):
+        'Test the limit is read from the site configuration'
+        context = self.context(250000)
+        r = max_rows(context)
+
+        self.assertEqual(250000, r)
+        config = context.site_root.return_value.GlobalConfiguration
+        config.getProperty.assert_called_once_with('inviteCSVMaxRows', None)
+
+    def test_string(self):
+        'Test the limit is read from a string property'
+        self.assertEqual(250, max_rows(self.context(' 250 ')))
+
+    def test_invalid(self):
+        'Test the default is used when the limit is not a positive number'
+        for value in (0, -1, 'many', ''):
+            self.assertEqual(MAX_ROWS, max_rows(self.context(value)))
+
+    def test_no_config(self):
+        'Test the default is used when the site has no configuration'
+        context = MagicMock()
+        context.site_root.return_value = object()
+        self.assertEqual(MAX_ROWS, max_rows(context))
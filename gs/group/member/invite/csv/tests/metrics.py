@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import loads
+from mock import MagicMock, patch
+from threading import Thread
+from unittest import TestCase
+from gs.group.member.invite.csv.cache import ParseCache
+from gs.group.member.invite.csv.jobs import InviteJob
+from gs.group.member.invite.csv.metrics import Metrics, ParseMetrics, record_invite
+from gs.group.member.invite.csv.metricsjson import InviteMetrics
+from gs.group.member.invite.csv.timing import ParseTimings
+
+
+class TestMetrics(TestCase):
+    'Test the in-process metrics, and the page that shows them'
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.now = 6000.0
+        self.metrics.clock = lambda: self.now
+
+    def test_threads(self):
+        'Test that the counters from each thread are merged'
+        def count():
+            for i in range(1000):
+                self.metrics.incr('rows')
+            self.metrics.observe('parse', 0.5)
+        threads = [Thread(target=count) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        s = self.metrics.snapshot()
+
+        self.assertEqual(4, len(self.metrics.shards))
+        self.assertEqual(4000, s['counters']['rows'])
+        self.assertEqual(4, s['latency']['parse']['count'])
+
+    def test_percentiles(self):
+        'Test the percentiles of a histogram'
+        for i in range(89):
+            self.metrics.observe('invite', 0.015)
+        for i in range(10):
+            self.metrics.observe('invite', 0.3)
+        self.metrics.observe('invite', 300)
+        latency = self.metrics.snapshot()['latency']['invite']
+
+        self.assertEqual(100, latency['count'])
+        self.assertEqual(0.02, latency['p50'])
+        self.assertEqual(0.5, latency['p90'])
+        self.assertEqual(0.5, latency['p99'])
+        self.assertEqual(300, latency['max'])
+        self.assertAlmostEqual((89 * 0.015 + 3 + 300) / 100, latency['mean'])
+
+    def test_percentiles_slowest(self):
+        'Test that a percentile past the last bucket is the maximum'
+        self.metrics.observe('invite', 200)
+        self.metrics.observe('invite', 300)
+        latency = self.metrics.snapshot()['latency']['invite']
+
+        self.assertEqual(300, latency['p50'])
+
+    def test_rates(self):
+        'Test the events per minute'
+        self.metrics.tick('invites', 30)  # Minute 100
+        self.now += 60
+        self.metrics.tick('invites', 12)  # Minute 101
+        self.now += 60
+        self.metrics.tick('invites')  # Minute 102, which is not over
+        rates = self.metrics.snapshot()['rates']['invites']
+
+        self.assertEqual(12, rates['lastMinute'])
+        self.assertAlmostEqual(42 / 14.0, rates['average'])
+
+    def test_rates_pruned(self):
+        'Test that the old minutes are dropped'
+        self.metrics.tick('invites', 30)
+        self.now += 60 * 20
+        self.metrics.tick('invites')
+
+        self.assertEqual(1, len(self.metrics.shard.minutes['invites']))
+        self.assertEqual(0, self.metrics.snapshot()['rates']['invites']['average'])
+
+    def test_record_invite(self):
+        'Test that the outcome of an invitation is counted'
+        record_invite(0.1, 1, self.metrics)
+        record_invite(0.1, 3, self.metrics)
+        record_invite(0.2, -1, self.metrics)
+        counters = self.metrics.snapshot()['counters']
+
+        self.assertEqual(3, counters['invites'])
+        self.assertEqual(1, counters['status1'])
+        self.assertEqual(1, counters['status3'])
+        self.assertEqual(1, counters['problem'])
+        self.assertNotIn('status2', counters)
+
+    def test_parse_hook(self):
+        'Test that the parse-timing hook records the upload'
+        timings = ParseTimings()
+        timings.bytesIn = 100
+        timings.rowsIn = 3
+        timings.decisions['cached'] = True
+        timings.total = 0.25
+        ParseMetrics(self.metrics)(timings)
+        s = self.metrics.snapshot()
+
+        self.assertEqual(1, s['counters']['uploadsParsed'])
+        self.assertEqual(1, s['counters']['uploadsCached'])
+        self.assertEqual(3, s['counters']['rowsParsed'])
+        self.assertEqual(100, s['counters']['bytesParsed'])
+        self.assertEqual(0.5, s['latency']['parse']['p50'])
+
+    @patch('gs.group.member.invite.csv.jobs.record_invite')
+    def test_job(self, record):
+        'Test that the background jobs record each invitation'
+        job = InviteJob('a', [{'email': 'a@example.com'}, {'email': 'b@example.com'}],
+                        MagicMock(return_value={'status': 2, 'message': []}))
+        job.run_row(0)
+        job.run_row(1)
+
+        self.assertEqual(2, record.call_count)
+        self.assertEqual(2, record.call_args[0][1])
+
+    def test_page(self):
+        'Test the page that shows the metrics'
+        record_invite(0.1, 2, self.metrics)
+        request = MagicMock()
+        view = InviteMetrics(None, request)
+        view.metrics = self.metrics
+        view.cache = ParseCache()
+        r = loads(view())
+
+        self.assertEqual(1, r['invites']['total'])
+        self.assertEqual(1, r['invites']['outcomes']['status2'])
+        self.assertEqual(0, r['invites']['outcomes']['problem'])
+        self.assertEqual(0.1, r['invites']['latency']['p50'])
+        self.assertEqual(0, r['uploads']['uploadsParsed'])
+        self.assertIsNone(r['uploads']['latency'])
+        self.assertEqual(0, r['parseCache']['hits'])
+        request.response.setHeader.assert_any_call(b'Content-Type', b'application/json')
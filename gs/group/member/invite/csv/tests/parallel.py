@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import loads
+from mock import MagicMock, patch
+from unittest import TestCase
+from gs.group.member.invite.csv.cache import ParseCache
+from gs.group.member.invite.csv.csv2json import CSV2JSON
+from gs.group.member.invite.csv.parallel import ParallelParser, split_records
+from gs.group.member.invite.csv.unicodereader import UnicodeDictReader
+
+
+class TestParallelParser(TestCase):
+    'Test parsing a CSV file in chunks, in a pool of workers'
+    csv = (b'Name,Email\n'
+           b'"Person, the first",a@example.com\n'
+           b'"A person\nover two lines",b@example.com\n'
+           b'M\xc3\xa9mb\xc3\xa9r,c@example.com\n'
+           b'\n'
+           b'"Quoted ""quotes""",d@example.com\n'
+           b'Short\n'
+           b'"Another\n\nperson",e@example.com\n')
+
+    def setUp(self):
+        self.parser = ParallelParser(workers=2, chunkSize=40)
+
+    def tearDown(self):
+        self.parser.close()
+
+    def sequential(self, buf):
+        reader = UnicodeDictReader(buf, ['fn', 'email'])
+        retval = list(reader.iter_values())
+        return retval
+
+    def parallel(self, buf):
+        reader = UnicodeDictReader(buf, ['fn', 'email'])
+        retval = list(self.parser.iter_values(buf, reader.encoding, reader.dialect, 2))
+        return retval
+
+    def test_split(self):
+        'Test that the chunks end at the end of records'
+        offsets = split_records(self.csv, 40)
+
+        self.assertEqual(0, offsets[0])
+        self.assertEqual(len(self.csv), offsets[-1])
+        self.assertGreater(len(offsets), 3)
+        for o in offsets[1:-1]:
+            self.assertEqual(b'\n', self.csv[o - 1:o])
+            self.assertFalse(self.csv[:o].count(b'"') % 2)
+
+    def test_same(self):
+        'Test that the rows are the same as from the sequential parser'
+        self.assertEqual(self.sequential(self.csv), self.parallel(self.csv))
+
+    def test_stray_quote(self):
+        'Test that a quote in the middle of a field is parsed the same way'
+        # The stray quote makes the first chunk end inside the quoted field
+        # on the next line, so the rest is parsed again.
+        buf = (b'Name,Email\n'
+               b'A 5" screen,a@example.com\n'
+               b'"D\nperson",d@example.com\n'
+               b'B,b@example.com\n'
+               b'C,c@example.com\n')
+        self.parser.chunkSize = 20
+        self.assertEqual(40, split_records(buf, 20)[1])
+
+        self.assertEqual(self.sequential(buf), self.parallel(buf))
+
+    def test_csv2json(self):
+        'Test that the parser gives the same response, with the same row numbers'
+        data = {'columns': ['fn', 'email'], 'csv': self.csv + b'Too,many,columns\n',
+                'allErrors': True, 'format': 'columns'}
+        with patch.object(CSV2JSON, 'cache', ParseCache(maxEntryBytes=0)):
+            expected = CSV2JSON(MagicMock(), MagicMock()).actual_process(data)
+            csv2json = CSV2JSON(MagicMock(), MagicMock())
+            csv2json.parallelParser = self.parser
+            csv2json.parallelThreshold = 0
+            r = csv2json.actual_process(data)
+
+        self.assertEqual(expected, r)
+        self.assertEqual(7, loads(r)['errors'][0]['row'])
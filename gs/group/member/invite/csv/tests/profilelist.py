@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from mock import MagicMock, patch
+from unittest import TestCase
+from zope.interface import Interface
+from zope.schema import TextLine
+from gs.group.member.invite.csv import profilelist
+from gs.group.member.invite.csv.profilelist import (ProfileList, get_profile_schema,
+                                                    profileSchemaCache)
+
+
+class ITestProfile(Interface):
+    fn = TextLine(title='Name', required=True)
+    tz = TextLine(title='Timezone', required=False)
+
+
+class ITestOtherProfile(Interface):
+    nickname = TextLine(title='Nickname', required=False)
+
+
+class TestProfileList(TestCase):
+    'Test the vocabulary of profile attributes'
+
+    def setUp(self):
+        profileSchemaCache.clear()
+        self.schemasPatch = patch.multiple(profilelist.profileSchemas, create=True,
+                                           ITestProfile=ITestProfile,
+                                           ITestOtherProfile=ITestOtherProfile)
+        self.schemasPatch.start()
+
+    def tearDown(self):
+        self.schemasPatch.stop()
+        profileSchemaCache.clear()
+
+    @staticmethod
+    def profile_list(schemaName='ITestProfile'):
+        context = MagicMock()
+        config = context.site_root.return_value.GlobalConfiguration
+        config.getProperty.return_value = schemaName
+        retval = ProfileList(context)
+        return retval
+
+    def test_terms(self):
+        'Test that the terms are in order, with the email address first'
+        terms = list(self.profile_list())
+        self.assertEqual(['email', 'fn', 'tz'], [t.token for t in terms])
+        self.assertEqual('Name', terms[1].title)
+
+    def test_get_term_by_token(self):
+        'Test looking up a term'
+        profileList = self.profile_list()
+        self.assertEqual('Timezone', profileList.getTermByToken('tz').title)
+        self.assertEqual('tz', profileList.getTerm('tz').value)
+        with self.assertRaises(LookupError):
+            profileList.getTermByToken('nickname')
+
+    def test_partitions(self):
+        'Test the required and optional properties'
+        profileList = self.profile_list()
+        self.assertEqual(['email', 'fn'], [t.token for t in profileList.required])
+        self.assertEqual(['tz'], [t.token for t in profileList.optional])
+
+    def test_shared(self):
+        'Test that the schema is shared between the lists'
+        self.assertIs(self.profile_list().profileSchema,
+                      self.profile_list().profileSchema)
+        self.assertIs(self.profile_list().properties, self.profile_list().properties)
+
+    def test_profile_interface_changed(self):
+        'Test that a different profile interface gets a different schema'
+        self.profile_list()
+        terms = list(self.profile_list('ITestOtherProfile'))
+        self.assertEqual(['email', 'nickname'], [t.token for t in terms])
+
+    def test_interface_replaced(self):
+        'Test that the schema is rebuilt if the interface is replaced'
+        first = get_profile_schema('ITestProfile')
+        with patch.object(profilelist.profileSchemas, 'ITestProfile', ITestOtherProfile):
+            second = get_profile_schema('ITestProfile')
+        self.assertIsNot(first, second)
+        self.assertIn('nickname', second.properties)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import dumps as to_json, loads
+from mock import MagicMock
+from unittest import TestCase
+from gs.group.member.invite.csv.resolve import (
+    EXISTING_MEMBER, EXISTING_USER, NEW_USER, LocalDirectory, Resolver, ResolveRows)
+
+
+class TestResolver(TestCase):
+    'Test finding the existing people and members'
+
+    def setUp(self):
+        self.directory = LocalDirectory({'a@example.com': 'a', 'B@example.com': 'b'},
+                                        members=['b'])
+
+    def test_tags(self):
+        'Test that each row is tagged as a new user, existing user, or member'
+        tags, userIds = Resolver(self.directory).resolve(
+            ['a@example.com', ' b@EXAMPLE.com', 'c@example.com', ''])
+
+        self.assertEqual([EXISTING_USER, EXISTING_MEMBER, NEW_USER, NEW_USER], tags)
+        self.assertEqual(['a', 'b', None, None], userIds)
+
+    def test_batches(self):
+        'Test that the addresses are looked up in batches, once each'
+        emails = ['{0}@example.com'.format(i) for i in range(5)] * 2
+        Resolver(self.directory, batchSize=2).resolve(emails)
+        self.assertEqual(3, self.directory.lookups)
+
+    def test_no_users(self):
+        'Test that the members are not looked up if no one has a profile'
+        self.directory.member_ids = MagicMock()
+        tags, userIds = Resolver(self.directory).resolve(['c@example.com'])
+
+        self.assertEqual([NEW_USER], tags)
+        self.assertFalse(self.directory.member_ids.called)
+
+
+class TestResolveRows(TestCase):
+    'Test the endpoint that finds the existing people and members'
+
+    def process(self, emails):
+        endpoint = ResolveRows(MagicMock(), MagicMock())
+        endpoint.resolver = Resolver(LocalDirectory({'a@example.com': 'a'}, ['a']))
+        retval = loads(endpoint.actual_process({'emails': emails}))
+        return retval
+
+    def test_resolve(self):
+        'Test that the tags and the counts are returned'
+        r = self.process(to_json(['a@example.com', 'b@example.com']))
+
+        self.assertEqual([EXISTING_MEMBER, NEW_USER], r['tags'])
+        self.assertEqual(['a', None], r['userIds'])
+        self.assertEqual({NEW_USER: 1, EXISTING_USER: 0, EXISTING_MEMBER: 1}, r['counts'])
+
+    def test_not_json(self):
+        'Test that JSON that cannot be parsed is rejected'
+        r = self.process('[')
+        self.assertEqual(-2, r['status'])
+
+    def test_not_strings(self):
+        'Test that a list of something other than strings is rejected'
+        r = self.process(to_json([{'email': 'a@example.com'}]))
+        self.assertEqual(-2, r['status'])
+
+    def test_too_many(self):
+        'Test that too many addresses are rejected'
+        ResolveRows.maxRows, old = 1, ResolveRows.maxRows
+        try:
+            r = self.process(to_json(['a@example.com', 'b@example.com']))
+        finally:
+            ResolveRows.maxRows = old
+        self.assertEqual(-3, r['status'])
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from json import dumps as to_json, loads
+from unittest import TestCase
+from gs.group.member.invite.csv.rows import ProfileRows
+
+
+class TestProfileRows(TestCase):
+    'Test the compact list of profiles'
+
+    def setUp(self):
+        self.rows = ProfileRows(['name', 'email'])
+        self.rows.append(('Member', 'member@example.com'))
+        self.rows.append(('Mémbér', 'another@example.com'))
+
+    def test_len(self):
+        self.assertEqual(2, len(self.rows))
+
+    def test_getitem(self):
+        'Test that a row is returned as a dictionary'
+        expected = {'name': 'Mémbér', 'email': 'another@example.com'}
+        self.assertEqual(expected, self.rows[1])
+
+    def test_wrong_length(self):
+        'Test that a row with the wrong number of values is rejected'
+        with self.assertRaises(ValueError):
+            self.rows.append(('Member', 'member@example.com', '28'))
+
+    def test_to_json(self):
+        'Test that the JSON is the same as for a list of dictionaries'
+        expected = to_json(list(self.rows))
+        self.assertEqual(expected, self.rows.to_json())
+        self.assertIn('"email": "member@example.com"', self.rows.to_json())
+
+    def test_to_json_compact(self):
+        'Test the compact format'
+        expected = '{"columns":["name","email"],"rows":[["Member","member@example.com"],'\
+                   '["M\\u00e9mb\\u00e9r","another@example.com"]]}'
+        self.assertEqual(expected, self.rows.to_json(compact=True))
+
+    def test_to_json_compact_extra(self):
+        'Test that the extra members are added after the rows'
+        r = loads(self.rows.to_json(compact=True, extra={'duplicates': [3]}))
+        self.assertEqual([3], r['duplicates'])
+        self.assertEqual(2, len(r['rows']))
@@ -14,9 +14,38 @@
 ############################################################################
 from __future__ import absolute_import, unicode_literals
 from unittest import TestSuite, main as unittest_main
-from gs.group.member.invite.csv.tests.unicodereader import (TestGuessEncoding, TestUnicodeReader)
+from gs.group.member.invite.csv.tests.unicodereader import (
+    TestBufferRecoder, TestGuessEncoding, TestUnicodeReader, TestUnicodeReaderFallback,
+    TestUnicodeReaderNative)
+from gs.group.member.invite.csv.tests.batchinvite import (TestBatchInvite, TestRowInviter)
+from gs.group.member.invite.csv.tests.cache import (TestParseCache)
+from gs.group.member.invite.csv.tests.checkpoint import (TestCheckpoint)
+from gs.group.member.invite.csv.tests.chunked import (TestChunkedUpload)
+from gs.group.member.invite.csv.tests.columntable import (TestColumnTable)
+from gs.group.member.invite.csv.tests.compressed import (TestDecompress, TestGzipResponse)
 from gs.group.member.invite.csv.tests.csv2json import (TestCSV2JSON)
-testCases = (TestUnicodeReader, TestGuessEncoding, TestCSV2JSON)
+from gs.group.member.invite.csv.tests.dedup import (TestDeduplicator)
+from gs.group.member.invite.csv.tests.encoding import (TestEncodingDetector)
+from gs.group.member.invite.csv.tests.jobinvite import (TestInviteJobEndpoints)
+from gs.group.member.invite.csv.tests.jobs import (TestInviteJob, TestLocalJobQueue)
+from gs.group.member.invite.csv.tests.jsonstream import (TestIterJSONList)
+from gs.group.member.invite.csv.tests.limits import (TestMaxRows)
+from gs.group.member.invite.csv.tests.metrics import (TestMetrics)
+from gs.group.member.invite.csv.tests.parallel import (TestParallelParser)
+from gs.group.member.invite.csv.tests.profilelist import (TestProfileList)
+from gs.group.member.invite.csv.tests.resolve import (TestResolver, TestResolveRows)
+from gs.group.member.invite.csv.tests.rows import (TestProfileRows)
+from gs.group.member.invite.csv.tests.timing import (TestParseTimings)
+from gs.group.member.invite.csv.tests.upload import (TestUpload)
+from gs.group.member.invite.csv.tests.validation import (TestRowValidator)
+testCases = (TestUnicodeReader, TestGuessEncoding, TestCSV2JSON, TestIterJSONList,
+             TestBufferRecoder, TestEncodingDetector, TestUnicodeReaderNative,
+             TestUnicodeReaderFallback, TestProfileRows, TestBatchInvite, TestRowInviter,
+             TestInviteJob, TestLocalJobQueue, TestInviteJobEndpoints, TestCheckpoint,
+             TestParseCache, TestProfileList, TestColumnTable,
+             TestRowValidator, TestDeduplicator, TestResolver, TestResolveRows,
+             TestUpload, TestParallelParser, TestParseTimings, TestMetrics,
+             TestDecompress, TestGzipResponse, TestChunkedUpload, TestMaxRows)
 
 
 def load_tests(loader, tests, pattern):
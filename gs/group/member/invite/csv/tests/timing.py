@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from mock import MagicMock, patch
+from unittest import TestCase
+from zope.component import getGlobalSiteManager
+from gs.group.member.invite.csv.cache import ParseCache
+from gs.group.member.invite.csv.csv2json import CSV2JSON
+from gs.group.member.invite.csv.interface import IParseTimingHook
+from gs.group.member.invite.csv.timing import ParseTimings, report
+
+
+class FakeClock(object):
+    'A clock that moves on a second each time it is read'
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+class TestParseTimings(TestCase):
+    'Test recording the time taken by each phase of the parser'
+
+    def setUp(self):
+        self.clockPatch = patch.object(ParseTimings, 'clock', FakeClock())
+        self.clockPatch.start()
+
+    def tearDown(self):
+        self.clockPatch.stop()
+
+    def test_phases(self):
+        'Test that the phases are kept in order, and repeated phases are added'
+        timings = ParseTimings()
+        with timings.phase('encoding'):
+            pass
+        with timings.phase('rows'):
+            pass
+        with timings.phase('encoding'):
+            pass
+        timings.finish()
+
+        self.assertEqual(['encoding', 'rows'], list(timings.phases))
+        self.assertEqual(2.0, timings.phases['encoding'])
+        self.assertEqual(b'encoding;dur=2000.0, rows;dur=1000.0, total;dur=7000.0',
+                         timings.server_timing())
+
+    def test_hooks(self):
+        'Test that the hooks are called, and a broken hook is ignored'
+        timings = ParseTimings()
+        hook = MagicMock()
+        broken = MagicMock(side_effect=ValueError('Broken'))
+        gsm = getGlobalSiteManager()
+        gsm.registerUtility(hook, IParseTimingHook, 'hook')
+        gsm.registerUtility(broken, IParseTimingHook, 'broken')
+        try:
+            report(timings)
+        finally:
+            gsm.unregisterUtility(hook, IParseTimingHook, 'hook')
+            gsm.unregisterUtility(broken, IParseTimingHook, 'broken')
+
+        hook.assert_called_once_with(timings)
+        broken.assert_called_once_with(timings)
+
+    def test_csv2json(self):
+        'Test that the parser records the phases, the rows, and the decisions'
+        data = {'columns': ['fn', 'email'], 'csv': b'Name,Email\nA,a@example.com\n'}
+        request = MagicMock()
+        csv2json = CSV2JSON(MagicMock(), request)
+        with patch.object(CSV2JSON, 'cache', ParseCache(maxEntryBytes=0)):
+            csv2json.actual_process(data)
+
+        t = csv2json.timings
+        self.assertEqual(['limits', 'hash', 'encoding', 'dialect', 'rows', 'json'],
+                         list(t.phases))
+        self.assertEqual((27, 1, 1), (t.bytesIn, t.rowsIn, t.rowsOut))
+        self.assertEqual('ascii', t.decisions['encoding'])
+        self.assertFalse(t.decisions['cached'])
+        names = [c[0][0] for c in request.response.setHeader.call_args_list]
+        self.assertEqual([b'Vary', b'Server-Timing'], names)
+        request.response.setHeader.assert_called_with(b'Server-Timing', t.server_timing())
+
+    def test_csv2json_stream(self):
+        'Test that the header is written before a streamed response'
+        data = {'columns': ['fn', 'email'], 'csv': b'Name,Email\nA,a@example.com\n',
+                'stream': True}
+        request = MagicMock()
+        csv2json = CSV2JSON(MagicMock(), request)
+        with patch.object(CSV2JSON, 'cache', ParseCache(maxEntryBytes=0)):
+            csv2json.actual_process(data)
+
+        names = [c[0][0] for c in request.response.setHeader.call_args_list]
+        self.assertEqual([b'Vary', b'Content-Type', b'Server-Timing', b'Vary'], names)
+        self.assertIn('stream', csv2json.timings.phases)
@@ -15,7 +15,7 @@
 from __future__ import absolute_import, unicode_literals, print_function
 from io import BytesIO
 from unittest import TestCase
-from gs.group.member.invite.csv.unicodereader import UnicodeDictReader
+from gs.group.member.invite.csv.unicodereader import (BufferRecoder, UnicodeDictReader)
 from . import test_data
 
 
@@ -90,6 +90,12 @@ class TestGuessDialect(TestCase):
 
 class TestUnicodeReader(TestCase):
     'Test the UnicodeDictReader'
+    #: Use the native reader if the encoding allows it
+    native = None
+
+    def unicode_reader(self, *args, **kwargs):
+        retval = UnicodeDictReader(*args, native=self.native, **kwargs)
+        return retval
 
     @staticmethod
     def make_d(name, email):
@@ -120,7 +126,7 @@ class TestUnicodeReader(TestCase):
         '''Test a CSV where everything is quoted'''
         csv = BytesIO('''"Example Member","member@example.com"
 "Another Member","another@example.com"'''.encode('utf-8'))
-        u = UnicodeDictReader(csv, ['name', 'email'])
+        u = self.unicode_reader(csv, ['name', 'email'])
         l = list(u)
 
         self.assertEqual(2, len(l))
@@ -132,7 +138,7 @@ class TestUnicodeReader(TestCase):
         s = '''"Example Member"\t"member@example.com"
 "Another Member"\t"another@example.com"'''.encode('utf-8')
         csv = BytesIO(s)
-        u = UnicodeDictReader(csv, ['name', 'email'])
+        u = self.unicode_reader(csv, ['name', 'email'])
         l = list(u)
 
         self.assertEqual(2, len(l))
@@ -144,7 +150,7 @@ class TestUnicodeReader(TestCase):
         csv = BytesIO(b'''"Michael JasonSmith",mpj17@onlinegroups.net
 Member,member@example.com''')
 
-        u = UnicodeDictReader(csv, ['name', 'email'], encoding='ascii')
+        u = self.unicode_reader(csv, ['name', 'email'], encoding='ascii')
 
         l = list(u)
         self.assertEqual(2, len(l))
@@ -158,7 +164,7 @@ Member,member@example.com''')
         csv = BytesIO(b'''"Michael JasonSmith",mpj17@onlinegroups.net
 M\xe9mb\xe9r,member@example.com''')
 
-        u = UnicodeDictReader(csv, ['name', 'email'], encoding='latin-1')
+        u = self.unicode_reader(csv, ['name', 'email'], encoding='latin-1')
 
         l = list(u)
         self.assertEqual(2, len(l))
@@ -172,7 +178,7 @@ M\xe9mb\xe9r,member@example.com''')
         csv = BytesIO(b'''"Michael JasonSmith",mpj17@onlinegroups.net
 M\xc3\xa9mb\xc3\xa9r \xf0\x9f\x98\x84,member@example.com''')
 
-        u = UnicodeDictReader(csv, ['name', 'email'], encoding='utf-8')
+        u = self.unicode_reader(csv, ['name', 'email'], encoding='utf-8')
 
         l = list(u)
         self.assertEqual(2, len(l))
@@ -184,7 +190,7 @@ M\xc3\xa9mb\xc3\xa9r \xf0\x9f\x98\x84,member@example.com''')
     def test_tricky_csv(self):
         '''Do we successfully parse a tricky CSV file?'''
         with test_data('tricky.csv') as csv:
-            u = UnicodeDictReader(csv, ['email', 'name'])
+            u = self.unicode_reader(csv, ['email', 'name'])
             for i, row in enumerate(u):
                 self.assert_name_email(self.tricky_expected[i]['name'],
                                        self.tricky_expected[i]['email'], row)
@@ -192,7 +198,81 @@ M\xc3\xa9mb\xc3\xa9r \xf0\x9f\x98\x84,member@example.com''')
     def test_tricky_tsv(self):
         '''Do we successfully parse a tricky tab-seperated file?'''
         with test_data('tricky.tsv') as tsv:
-            u = UnicodeDictReader(tsv, ['email', 'name'])
+            u = self.unicode_reader(tsv, ['email', 'name'])
             for i, row in enumerate(u):
                 self.assert_name_email(self.tricky_expected[i]['name'],
                                        self.tricky_expected[i]['email'], row)
+
+    def test_bytes(self):
+        '''Ensure we read the bytes of a CSV, rather than a file'''
+        csv = b'''"Michael JasonSmith",mpj17@onlinegroups.net
+M\xc3\xa9mb\xc3\xa9r \xf0\x9f\x98\x84,member@example.com'''
+
+        u = self.unicode_reader(csv, ['name', 'email'], encoding='utf-8')
+
+        l = list(u)
+        self.assertEqual(2, len(l))
+        self.assert_name_email('Mémbér \U0001f604',
+                               'member@example.com', l[1])
+
+    def test_short_row(self):
+        '''Test that the missing values of a short row are None, like csv.DictReader'''
+        u = self.unicode_reader(b'Member\n', ['name', 'email'], encoding='ascii')
+        l = list(u)
+        self.assertEqual([{'name': 'Member', 'email': None}], l)
+
+    def test_long_row(self):
+        '''Test that the extra values of a long row are in a list, like csv.DictReader'''
+        u = self.unicode_reader(b'Member,member@example.com,28\n', ['name', 'email'],
+                                encoding='ascii')
+        l = list(u)
+        self.assertEqual(3, len(l[0]))
+        self.assertEqual(['28'], l[0][None])
+
+    def test_iter_values(self):
+        '''Test that the rows can be read as tuples, in column order'''
+        u = self.unicode_reader(b'Member,member@example.com,28\nAnother\n',
+                                ['name', 'email'], encoding='ascii')
+        l = list(u.iter_values())
+        self.assertEqual([('Member', 'member@example.com', '28'), ('Another', None)], l)
+
+
+class TestUnicodeReaderNative(TestUnicodeReader):
+    'Test the UnicodeDictReader, decoding each cell once'
+    native = True
+
+    def test_shared_keys(self):
+        '''Test that every row shares the same key objects'''
+        u = self.unicode_reader(b'A,a@example.com\nB,b@example.com\n', ['name', 'email'],
+                                encoding='ascii')
+        l = list(u)
+        k0 = sorted(l[0].keys())
+        k1 = sorted(l[1].keys())
+        self.assertTrue(all(a is b for a, b in zip(k0, k1)))
+
+
+class TestUnicodeReaderFallback(TestUnicodeReader):
+    'Test the UnicodeDictReader, recoding each line to UTF-8'
+    native = False
+
+
+class TestBufferRecoder(TestCase):
+    '''Test the recoding of a buffer into UTF-8 lines'''
+
+    def test_split_character(self):
+        '''Test a multi-byte character split across two blocks'''
+        buf = 'Mémbér\nmember@example.com\n'.encode('utf-8')
+        r = list(BufferRecoder(buf, 'utf-8', blockSize=2))
+        self.assertEqual(['Mémbér\n'.encode('utf-8'), b'member@example.com\n'], r)
+
+    def test_split_crlf(self):
+        '''Test a CR-LF line-ending split across two blocks'''
+        buf = b'Member\r\nmember@example.com'
+        r = list(BufferRecoder(buf, 'ascii', blockSize=7))
+        self.assertEqual([b'Member\r\n', b'member@example.com'], r)
+
+    def test_utf16(self):
+        '''Test a file where the line-ending is more than one byte'''
+        buf = 'Mémbér\nmember@example.com'.encode('utf-16')
+        r = list(BufferRecoder(buf, 'utf-16', blockSize=3))
+        self.assertEqual(['Mémbér\n'.encode('utf-8'), b'member@example.com'], r)
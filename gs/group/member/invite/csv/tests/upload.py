@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from io import BytesIO
+from mmap import mmap
+from tempfile import TemporaryFile
+from unittest import TestCase
+from mock import MagicMock
+from gs.group.member.invite.csv.interface import CSVFile
+from gs.group.member.invite.csv.unicodereader import UnicodeDictReader
+from gs.group.member.invite.csv.upload import (
+    MappedFileWidget, close_upload, count_lines, read_upload)
+
+
+class TestUpload(TestCase):
+    'Test reading and mapping the uploaded files'
+    csv = b'Name,Email\nA,a@example.com\nB,b@example.com\n'
+
+    def test_small(self):
+        'Test that a small file is read into memory'
+        r = read_upload(BytesIO(self.csv), threshold=1024)
+        self.assertIsInstance(r, bytes)
+        self.assertEqual(self.csv, r)
+
+    def test_on_disk(self):
+        'Test that a large file on disk is mapped, as it is'
+        f = TemporaryFile()
+        f.write(self.csv)
+        f.flush()
+        r = read_upload(f, threshold=8)
+
+        self.assertIsInstance(r, mmap)
+        self.assertEqual(self.csv, r[:])
+        close_upload(r)
+        self.assertRaises(ValueError, r.size)  # Closed
+
+    def test_spooled(self):
+        'Test that a large file in memory is spooled to disk, and mapped'
+        r = read_upload(BytesIO(self.csv), threshold=8)
+        self.assertIsInstance(r, mmap)
+        self.assertEqual(self.csv, r[:])
+
+    def test_reader(self):
+        'Test that the reader works over the map'
+        r = read_upload(BytesIO(self.csv), threshold=8)
+        reader = UnicodeDictReader(r, ['fn', 'email'])
+        rows = list(reader.iter_values())
+        self.assertEqual([('Name', 'Email'), ('A', 'a@example.com'),
+                          ('B', 'b@example.com')], rows)
+
+    def test_count_lines(self):
+        'Test counting the lines, with and without a final line-feed'
+        self.assertEqual(3, count_lines(self.csv, blockSize=4))
+        self.assertEqual(3, count_lines(self.csv.rstrip(), blockSize=4))
+        self.assertEqual(0, count_lines(b''))
+
+    def test_count_lines_limit(self):
+        'Test that the counting stops once there are too many lines'
+        r = count_lines(b'\n' * 100, limit=2, blockSize=4)
+        self.assertLess(r, 100)
+        self.assertGreater(r, 2)
+
+    def test_widget(self):
+        'Test that the widget maps the large uploads, and the field accepts them'
+        field = CSVFile(__name__='csv', title='CSV')
+        widget = MappedFileWidget(field, MagicMock())
+        widget.threshold = 8
+        r = widget._toFieldValue(BytesIO(self.csv))
+
+        self.assertIsInstance(r, mmap)
+        field.validate(r)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from collections import OrderedDict
+from unittest import TestCase
+from zope.schema import Int, TextLine
+from gs.group.member.invite.csv.validation import RowValidator
+
+
+def is_email(value):
+    return '@' in value
+
+
+def test_properties():
+    retval = OrderedDict()
+    retval['email'] = TextLine(title='Email', constraint=is_email, required=True)
+    retval['fn'] = TextLine(title='Name', required=True)
+    retval['age'] = Int(title='Age', required=False)
+    return retval
+
+
+class TestRowValidator(TestCase):
+    'Test checking the values in the rows against the profile fields'
+
+    def test_fine(self):
+        'Test that a fine row has no problems'
+        validator = RowValidator(test_properties(), ['email', 'fn', 'age'])
+        self.assertEqual({}, validator(('a@example.com', 'A Person', '42')))
+        self.assertEqual({}, validator(('a@example.com', 'A Person', '')))
+
+    def test_invalid(self):
+        'Test that every problem in a row is reported'
+        validator = RowValidator(test_properties(), ['email', 'fn', 'age'])
+        r = validator(('not an address', ' ', 'old'))
+        self.assertEqual(['age', 'email', 'fn'], sorted(r))
+        self.assertEqual('Required input is missing.', r['fn'])
+
+    def test_column_order(self):
+        'Test that the checks follow the order of the columns'
+        validator = RowValidator(test_properties(), ['fn', 'email'])
+        self.assertEqual({}, validator(('A Person', 'a@example.com')))
+        self.assertIn('email', validator(('a@example.com', 'A Person')))
+
+    def test_compiled_once(self):
+        'Test that there is one check per known column'
+        validator = RowValidator(test_properties(), ['email', 'unknown', 'fn'])
+        self.assertEqual([0, 2], [c[0] for c in validator.checks])
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from collections import OrderedDict
+from contextlib import contextmanager
+from json import dumps as to_json
+from logging import getLogger
+from time import time
+from zope.component import getUtilitiesFor
+from .interface import IParseTimingHook
+log = getLogger('gs.group.member.invite.csv.timing')
+
+
+class ParseTimings(object):
+    '''The time taken by each phase of parsing a CSV file
+
+The phases are recorded in the order they started, with the time in
+seconds. Alongside them are the number of bytes in, the number of rows read
+and kept, and the ``decisions`` that were made (such as the encoding).'''
+    #: The clock, which is replaced in the tests
+    clock = staticmethod(time)
+
+    def __init__(self):
+        self.started = self.clock()
+        self.phases = OrderedDict()
+        self.decisions = {}
+        self.bytesIn = 0
+        self.rowsIn = None
+        self.rowsOut = None
+        self.total = None
+
+    @contextmanager
+    def phase(self, name):
+        '''Time a phase. If a phase is timed more than once the times are added.'''
+        t = self.clock()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (self.clock() - t)
+
+    def finish(self):
+        '''Record the total time, from when the timings were created'''
+        self.total = self.clock() - self.started
+
+    def server_timing(self):
+        '''The timings as the value of a ``Server-Timing`` header
+
+:returns: Each phase, and the total if it is known, in milliseconds.
+:rtype: bytes'''
+        phases = list(self.phases.items())
+        if self.total is not None:
+            phases.append(('total', self.total))
+        retval = ', '.join('{0};dur={1:.1f}'.format(name, t * 1000)
+                           for name, t in phases).encode('ascii')
+        return retval
+
+    def to_dict(self):
+        retval = {'phases': self.phases, 'total': self.total, 'bytesIn': self.bytesIn,
+                  'rowsIn': self.rowsIn, 'rowsOut': self.rowsOut,
+                  'decisions': self.decisions, }
+        return retval
+
+
+def report(timings):
+    '''Log the timings, and pass them to the hooks
+
+:param ParseTimings timings: The timings for a parse.
+
+The timings are logged as one line of JSON. Then each named utility that
+provides :class:`.interface.IParseTimingHook` is called with the
+timings. A problem with a hook is logged, rather than stopping the response.'''
+    log.info('Parsed CSV %s', to_json(timings.to_dict(), sort_keys=True))
+    for name, hook in getUtilitiesFor(IParseTimingHook):
+        try:
+            hook(timings)
+        except Exception:
+            log.exception('Problem with the parse-timing hook "%s"', name)
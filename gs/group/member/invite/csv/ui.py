@@ -17,6 +17,7 @@ from zope.cachedescriptors.property import Lazy
 from gs.core import mailto
 from gs.group.base import GroupPage
 from gs.profile.email.base.emailuser import EmailUser
+from .columntable import get_column_table
 from .profilelist import ProfileList
 
 
@@ -31,14 +32,23 @@ class CSVUploadUI(GroupPage):
 
     @Lazy
     def optionalProperties(self):
-        retval = [p for p in self.profileList
-                  if not self.profileList.properties[p.token].required]
+        retval = self.profileList.optional
         return retval
 
     @Lazy
     def requiredProperties(self):
-        retval = [p for p in self.profileList
-                  if self.profileList.properties[p.token].required]
+        retval = self.profileList.required
+        return retval
+
+    @Lazy
+    def columnTable(self):
+        retval = get_column_table(self.profileList.profileSchema)
+        return retval
+
+    @Lazy
+    def columnTableHTML(self):
+        'The table of columns, which is rendered once per profile schema'
+        retval = self.columnTable.html
         return retval
 
     @Lazy
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 # <http://docs.python.org/2.7/library/csv.html#csv.DictReader>
 from __future__ import absolute_import, unicode_literals
-from codecs import getreader
-from csv import (DictReader, Sniffer, Error as CSVError)
-from chardet.universaldetector import UniversalDetector
+from codecs import getincrementaldecoder, getreader, lookup as lookup_codec
+from csv import (DictReader, Sniffer, Error as CSVError, reader as csv_reader)
+from mmap import mmap
 from gs.core import to_unicode_or_bust
+from .encoding import EncodingDetector, EncodingGuess
+from .timing import ParseTimings
 
 
 class UTF8Recoder(object):
@@ -21,49 +23,289 @@ class UTF8Recoder(object):
         return self.reader.next().encode("utf-8")
 
 
+class BufferRecoder(object):
+    """
+    Iterator that decodes a buffer, and yields the lines encoded as UTF-8
+
+    The buffer is decoded a block at a time, so only one block and one line
+    are copied out of the buffer at once.
+    """
+    #: The number of bytes to decode at a time
+    blockSize = 64 * 1024
+
+    def __init__(self, buf, encoding, blockSize=None):
+        self.buf = buf
+        self.encoding = encoding
+        if blockSize is not None:
+            self.blockSize = blockSize
+
+    def __iter__(self):
+        decoder = getincrementaldecoder(self.encoding)()
+        pending = ''
+        for start in range(0, len(self.buf), self.blockSize):
+            text = pending + decoder.decode(self.buf[start:start + self.blockSize])
+            lines = text.splitlines(True)
+            # The last line may be incomplete, or be a "\r" that is about to
+            # be followed by a "\n", so it is held back.
+            pending = lines.pop() if lines else ''
+            for line in lines:
+                yield line.encode('utf-8')
+        pending += decoder.decode(b'', True)
+        for line in pending.splitlines(True):
+            yield line.encode('utf-8')
+
+
+def iter_lines(buf, start=0, end=None):
+    """Iterate the lines in a buffer, keeping the line-endings
+
+:param buf: The bytes of the file, or a memory map of the file.
+:param int start: The offset of the first line.
+:param int end: The offset of the end of the last line, or ``None`` for the
+                end of the buffer."""
+    if end is None:
+        end = len(buf)
+    while start < end:
+        i = buf.find(b'\n', start, end)
+        stop = end if i == -1 else i + 1
+        yield buf[start:stop]
+        start = stop
+
+
+#: The prefixes of the names of the encodings where the bytes that make up the
+#: CSV syntax (quotes, delimiters, and line-endings) are never part of another
+#: character.
+ASCII_COMPATIBLE = ('utf-8', 'ascii', 'iso8859', 'cp125', 'koi8', 'mac-')
+
+
+def is_ascii_compatible(encoding):
+    '''Can a file in this encoding be split into cells before it is decoded?'''
+    try:
+        name = lookup_codec(encoding).name
+    except LookupError:
+        retval = False
+    else:
+        retval = name.startswith(ASCII_COMPATIBLE)
+    return retval
+
+
+def decode_row(row, encoding, length, restval=None):
+    '''Decode the cells in a row, and fill the missing values
+
+:param list row: The cells, as bytes.
+:param str encoding: The encoding of the file.
+:param int length: The number of columns. The missing values are filled
+                   with ``restval``, and any extra values are left on the
+                   end of the tuple.
+:rtype: tuple'''
+    values = [cell.decode(encoding) for cell in row]
+    missing = length - len(values)
+    if missing > 0:
+        values.extend([restval] * missing)
+    retval = tuple(values)
+    return retval
+
+
+class DecodingDictReader(object):
+    '''A :class:`csv.DictReader` work-alike that decodes each cell once
+
+:param buf: The bytes of the CSV file.
+:param list cols: The column-names of the CSV.
+:param str encoding: The encoding of the file, which must be ASCII compatible.
+:param dialect: The CSV dialect.
+
+The lines are split into cells while they are still bytes, and each cell is
+decoded straight to Unicode, rather than decoding the line, encoding it as
+UTF-8, and decoding each cell again. The keys are converted to Unicode once,
+and shared by every row.'''
+    def __init__(self, buf, cols, encoding, dialect, restkey=None, restval=None,
+                 **fmtparams):
+        self.keys = [to_unicode_or_bust(c) for c in cols]
+        self.encoding = encoding
+        self.restkey = restkey
+        self.restval = restval
+        self.reader = csv_reader(iter_lines(buf), dialect=dialect, **fmtparams)
+
+    def __iter__(self):
+        return self
+
+    def iter_values(self):
+        '''Iterate the remaining rows as tuples of values'''
+        while True:
+            try:
+                values = self.next_values()
+            except StopIteration:
+                break
+            yield values
+
+    def next_values(self):
+        '''Get the next row as a tuple of values, in the same order as the columns
+
+Missing values are filled with ``restval``, and any extra values are left on
+the end of the tuple.'''
+        row = self.reader.next()
+        while row == []:  # Skip blank lines, like csv.DictReader
+            row = self.reader.next()
+        retval = decode_row(row, self.encoding, len(self.keys), self.restval)
+        return retval
+
+    def next(self):
+        values = self.next_values()
+        retval = dict(zip(self.keys, values))
+        lk = len(self.keys)
+        if lk < len(values):
+            retval[self.restkey] = list(values[lk:])
+        return retval
+
+
 class UnicodeDictReader(object):
     '''A variant of the :class:`csv.DictReader` class that handles Unicode
 
-:param file f: The CSV file to process.
+:param file f: The CSV file to process, the bytes of the file, or a memory map of the file.
 :param list cols: The column-names of the CSV, as strings in a list.
 :param string dialect: The CSV dialect. If ``None`` then the dialect will be guessed.
 :param string encoding: The encoding of the file. If ``None`` the encoding will be guessed. If
-                        guessing fails then UTF-8 will be assumed.'''
-    def __init__(self, f, cols, dialect=None, encoding=None, **kwds):
-        e = self.guess_encoding(f) if encoding is None else encoding
-        d = self.guess_dialect(f) if dialect is None else dialect
-        f = UTF8Recoder(f, e)
-        self.reader = DictReader(f, cols, dialect=d, **kwds)
+                        guessing fails then UTF-8 will be assumed.
+:param EncodingDetector detector: The encoding detector to use. If ``None`` the default
+                                  detector is used.
+:param bool native: If ``True`` the :class:`DecodingDictReader` is used to decode each cell
+                    once. If ``False`` each line is recoded to UTF-8 before it is parsed. If
+                    ``None`` then the native reader is used if the encoding allows it.
+:param ParseTimings timings: Where to record the time taken to guess the encoding and the
+                             dialect, and the decisions that were made.
+
+The guess of the encoding (including how the guess was made) is stored in the
+:attr:`encodingGuess` attribute, and the bytes of the file in :attr:`buf`.'''
+    def __init__(self, f, cols, dialect=None, encoding=None, detector=None, native=None,
+                 timings=None, **kwds):
+        self.timings = ParseTimings() if timings is None else timings
+        # The file is read once, and the encoding, dialect and
+        # rows all come from the same buffer, rather than seeking back to
+        # the start of the file after each guess.
+        buf = self.buf = self.read_buffer(f)
+        with self.timings.phase('encoding'):
+            if encoding is None:
+                d = EncodingDetector() if detector is None else detector
+                self.encodingGuess = d.detect(buf)
+            else:
+                self.encodingGuess = EncodingGuess(encoding, 'given', 1.0)
+        self.encoding = self.encodingGuess.encoding
+        with self.timings.phase('dialect'):
+            self.dialect = self.detect_dialect(buf) if dialect is None else dialect
+        if native is None:
+            native = self.can_split_bytes(buf, self.encoding)
+        self.native = native
+        self.timings.decisions.update({
+            'encoding': self.encoding, 'encodingMethod': self.encodingGuess.method,
+            'encodingConfidence': self.encodingGuess.confidence,
+            'delimiter': getattr(self.dialect, 'delimiter', self.dialect), 'native': native, })
+        self.cols = [to_unicode_or_bust(c) for c in cols]
+        if native:
+            self.reader = DecodingDictReader(buf, cols, self.encoding, self.dialect, **kwds)
+        else:
+            lines = BufferRecoder(buf, self.encoding)
+            self.reader = DictReader(lines, cols, dialect=self.dialect, **kwds)
+
+    @staticmethod
+    def can_split_bytes(buf, encoding):
+        '''Can the cells be split out of the buffer before they are decoded?
+
+:param buf: The bytes of the CSV file.
+:param str encoding: The encoding of the file.
+:returns: ``True`` if the encoding is ASCII compatible, and the lines end
+          with a newline (rather than a bare carriage-return).'''
+        start = buf[:1024]
+        retval = (is_ascii_compatible(encoding)
+                  and ((b'\n' in start) or (b'\r' not in start)))
+        return retval
+
+    @staticmethod
+    def read_buffer(f):
+        '''Get the bytes of the CSV file, reading it at most once
+
+:param f: The CSV file, the bytes of the CSV file, or a memory map of the
+          CSV file.
+:returns: The bytes of the CSV file, or the memory map. A map is used as it
+          is, so the file is paged in as it is parsed rather than copied.'''
+        if isinstance(f, (bytes, mmap)):
+            retval = f
+        elif hasattr(f, 'getvalue'):
+            retval = f.getvalue()
+        else:
+            retval = f.read()
+        return retval
 
     @staticmethod
     def guess_encoding(f):
-        detector = UniversalDetector()
-        for line in f:
-            detector.feed(line)
-            if detector.done:
-                break
-        f.seek(0)  # The above read moves the file-cursor in the CSV file.
-        detector.close()
-        retval = detector.result['encoding'] if detector.result['encoding'] else 'utf-8'
+        try:
+            retval = UnicodeDictReader.detect_encoding(f.read())
+        finally:
+            f.seek(0)  # The above read moves the file-cursor in the CSV file.
+        return retval
+
+    @staticmethod
+    def detect_encoding(buf):
+        '''Guess the encoding of the CSV from a buffer
+
+:param buf: The bytes of the CSV file.
+:returns: The name of the encoding, or ``utf-8`` if guessing failed.
+
+See :class:`.encoding.EncodingDetector` for how the guess is made.'''
+        retval = EncodingDetector().detect(buf).encoding
         return retval
 
     @staticmethod
     def guess_dialect(f):
         # Taken from the Python standard docs, with thanks to Piers Goodhew <piers@u-h-p.com>
         # <https://docs.python.org/2/library/csv.html#csv.Sniffer>
+        try:
+            retval = UnicodeDictReader.detect_dialect(f.read(1024))
+        finally:
+            f.seek(0)  # The above f.read moves the file-cursor in the CSV file.
+        return retval
+
+    @staticmethod
+    def detect_dialect(buf):
+        '''Guess the CSV dialect from the start of a buffer
+
+:param buf: The bytes of the CSV file.
+:returns: The dialect, or ``excel`` if guessing failed.'''
         s = Sniffer()
         try:
-            retval = s.sniff(f.read(1024), [',', '\t', ])  # 1024 taken from the Python docs
+            retval = s.sniff(buf[:1024], [',', '\t', ])  # 1024 taken from the Python docs
         except CSVError:
             retval = 'excel'
-        finally:
-            f.seek(0)  # The above f.read moves the file-cursor in the CSV file.
         return retval
 
     def next(self):
         row = self.reader.next()
-        retval = {to_unicode_or_bust(k): to_unicode_or_bust(v) for k, v in row.items()}
+        if self.native:
+            retval = row
+        else:
+            retval = {to_unicode_or_bust(k): to_unicode_or_bust(v) for k, v in row.items()}
         return retval
 
     def __iter__(self):
         return self
+
+    def next_values(self):
+        '''Get the next row as a tuple of values, in the same order as the columns
+
+This avoids building a dictionary for each row. See
+:meth:`DecodingDictReader.next_values`.'''
+        if self.native:
+            retval = self.reader.next_values()
+        else:
+            row = self.next()
+            values = [row.get(k) for k in self.cols]
+            values.extend(row.get(None, []))
+            retval = tuple(values)
+        return retval
+
+    def iter_values(self):
+        '''Iterate the remaining rows as tuples of values'''
+        while True:
+            try:
+                values = self.next_values()
+            except StopIteration:
+                break
+            yield values
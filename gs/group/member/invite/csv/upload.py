@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from io import UnsupportedOperation
+from mmap import mmap, ACCESS_READ
+from tempfile import TemporaryFile
+from zope.formlib.interfaces import ConversionError
+from zope.formlib.textwidgets import FileWidget
+
+#: The size of the uploads that are mapped, rather than read into memory
+MAP_THRESHOLD = 1024 * 1024
+#: The number of bytes copied, or counted, at a time
+BLOCK_SIZE = 1024 * 1024
+
+
+def upload_size(f):
+    '''The size of an uploaded file, without reading it'''
+    f.seek(0, 2)
+    retval = f.tell()
+    f.seek(0)
+    return retval
+
+
+def spool(f, blockSize=BLOCK_SIZE):
+    '''Copy a file to a temporary file on disk, one block at a time
+
+:param f: The file to copy.
+:returns: The temporary file, which is deleted when it is closed.'''
+    retval = TemporaryFile(prefix='gs-group-member-invite-csv-')
+    f.seek(0)
+    block = f.read(blockSize)
+    while block:
+        retval.write(block)
+        block = f.read(blockSize)
+    retval.flush()
+    return retval
+
+
+def map_file(f):
+    '''Map a file into memory, read only
+
+:param f: The file, which must be on disk and must not be empty.
+:rtype: mmap
+:raises ValueError: The file is not on disk.'''
+    try:
+        fileno = f.fileno()
+    except (AttributeError, UnsupportedOperation) as e:
+        raise ValueError(e)
+    retval = mmap(fileno, 0, access=ACCESS_READ)
+    return retval
+
+
+def read_upload(f, threshold=MAP_THRESHOLD):
+    '''Get the bytes of an uploaded file, mapping the large files
+
+:param f: The uploaded file.
+:param int threshold: The size of the files that are mapped.
+:returns: The bytes of the file, or a memory map of the file if it is
+          larger than the threshold.
+
+Zope writes large uploads to a temporary file, which is mapped as it
+is. Other large files (such as a file held in memory) are spooled to a
+temporary file first. Either way the mapped file is paged in by the
+operating system as it is parsed, rather than being held in memory by each
+worker.'''
+    size = upload_size(f)
+    if size <= threshold:
+        retval = f.read()
+    else:
+        try:
+            retval = map_file(f)
+        except (ValueError, EnvironmentError):
+            retval = map_file(spool(f))
+    return retval
+
+
+def close_upload(buf):
+    '''Release the map of an uploaded file, if it was mapped'''
+    if isinstance(buf, mmap):
+        buf.close()
+
+
+def count_lines(buf, limit=None, blockSize=BLOCK_SIZE):
+    '''Count the lines in a buffer, without parsing it
+
+:param buf: The bytes of the file, or a memory map of the file.
+:param int limit: Stop counting once there are more lines than this.
+:param int blockSize: The number of bytes to count at a time.
+:returns: The number of lines, or a number larger than the limit.
+
+The line-feeds are counted a block at a time, in C, so this is much quicker
+than parsing the file. A cell that contains a line-feed is counted as two
+lines, so this is an upper bound on the number of rows.'''
+    retval = 0
+    size = len(buf)
+    for start in range(0, size, blockSize):
+        retval += buf[start:start + blockSize].count(b'\n')
+        if (limit is not None) and (retval > limit):
+            break
+    else:
+        if size and (buf[size - 1:size] != b'\n'):
+            retval += 1  # The last line does not end with a line-feed
+    return retval
+
+
+class MappedFileWidget(FileWidget):
+    '''A file widget that maps large uploads, rather than reading them
+
+See :func:`read_upload`.'''
+    threshold = MAP_THRESHOLD
+
+    def _toFieldValue(self, input):
+        if input is None or input == '':
+            return self.context.missing_value
+        if not (hasattr(input, 'seek') and hasattr(input, 'read')):
+            raise ConversionError('Form input is not a file object')
+        data = read_upload(input, self.threshold)
+        if len(data) or getattr(input, 'filename', ''):
+            return data
+        else:
+            return self.context.missing_value
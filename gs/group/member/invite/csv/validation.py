@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+############################################################################
+#
+# Copyright © 2026 OnlineGroups.net and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+############################################################################
+from __future__ import absolute_import, unicode_literals
+from zope.interface.exceptions import Invalid
+from zope.schema.interfaces import IFromUnicode
+
+
+def error_message(e):
+    '''A human-readable message for a validation error'''
+    doc = getattr(e, 'doc', None)
+    retval = doc() if callable(doc) else ''
+    if not retval:
+        retval = unicode(e) or e.__class__.__name__
+    return retval
+
+
+class RowValidator(object):
+    '''Check the values in the rows of a CSV file against the profile fields
+
+:param properties: The profile fields, by profile-attribute identifier, such
+                   as :attr:`.profilelist.ProfileList.properties`.
+:param list cols: The profile-attribute identifiers of the columns.
+:param context: The object to bind the fields to, for the fields that have
+                a vocabulary.
+
+The check for each column is worked out once, when the validator is
+created, rather than for each row. Calling the validator with the values
+from a row returns the problems with the row.'''
+    def __init__(self, properties, cols, context=None):
+        self.checks = [self.compile(i, col, properties[col].bind(context))
+                       for i, col in enumerate(cols) if col in properties]
+
+    @staticmethod
+    def compile(i, col, field):
+        '''Work out the check for one column
+
+:param int i: The index of the column.
+:param str col: The profile-attribute identifier.
+:param field: The bound field.
+:returns: The index, identifier, whether the value is required, and the
+          function that checks a value.'''
+        if IFromUnicode.providedBy(field):
+            # Converts the value to the right type (for an integer field, say)
+            # and validates it.
+            check = field.fromUnicode
+        else:
+            check = field.validate
+        retval = (i, col, field.required, check)
+        return retval
+
+    def __call__(self, values):
+        '''Check the values from a row
+
+:param values: The values in the row, in the same order as the columns.
+:returns: The message for each column that has a problem, by
+          profile-attribute identifier. It is empty if the row is fine.
+:rtype: dict'''
+        retval = {}
+        for i, col, required, check in self.checks:
+            value = values[i]
+            if (value is None) or (not value.strip()):
+                if required:
+                    retval[col] = 'Required input is missing.'
+                continue
+            try:
+                check(value.strip())
+            except (Invalid, ValueError) as e:
+                retval[col] = error_message(e)
+        return retval
@@ -54,23 +54,32 @@ setup(
     zip_safe=False,
     install_requires=[
         'setuptools',
+        'AccessControl',
         'chardet',
+        'SQLAlchemy',
+        'transaction',
         'zope.browserpage',
         'zope.app.apidoc',
         'zope.cachedescriptors',
+        'zope.component',
         'zope.contenttype',
         'zope.formlib',
         'zope.interface',
+        'zope.pagetemplate',
         'zope.schema',
+        'zope.sqlalchemy',
         'zope.viewlet',
         'gs.content.form.base',
         'gs.content.form.api.json',
+        'gs.database',
         'gs.group.base',
+        'gs.group.member.base',
         'gs.group.member.invite.json',
         'gs.help',
         'gs.profile.email.base',
         'Products.GSProfile',
         'Products.XWFCore',
+        'Zope2',
     ],
     test_suite="{0}.tests.test_all".format(name),
     tests_require=['mock', ],